@@ -5,13 +5,15 @@ from __future__ import annotations
 import logging
 
 import voluptuous as vol
-from aiohttp import web
-from homeassistant.components.http import HomeAssistantView
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
+from .catalogue import SungrowCatalogue
 from .const import DOMAIN
+from .session import async_release_session
+from .singleflight import async_remove_flights
+from .stats import async_remove_stats
 
 # TODO List the platforms that you want to support.
 # For your initial example we don't have sensors yet but usually:
@@ -37,12 +39,6 @@ CONFIG_SCHEMA = IterableSchema({}, extra=vol.ALLOW_EXTRA)
 _LOGGER = logging.getLogger(__name__)
 
 
-async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Set up the Sungrow iSolarCloud component."""
-    hass.http.register_view(SungrowAuthCallbackView())
-    return True
-
-
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Sungrow iSolarCloud from a config entry."""
 
@@ -53,6 +49,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Token refreshes also update the entry, so only reload when the options change
+    options = dict(entry.options)
+
+    async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        if entry.options != options:
+            await hass.config_entries.async_reload(entry.entry_id)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
     return True
 
 
@@ -60,38 +65,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
+        async_remove_stats(hass, entry.entry_id)
+        await async_release_session(hass, entry.entry_id)
 
     return unload_ok
 
 
-class SungrowAuthCallbackView(HomeAssistantView):
-    """Sungrow Authorization Callback View."""
-
-    requires_auth = False
-    url = "/api/sungrow_hass/callback"
-    name = "api:sungrow_hass:callback"
-
-    async def get(self, request: web.Request) -> web.Response:
-        """Handle callback."""
-        hass: HomeAssistant = request.app["hass"]
-        params = request.query
-        code = params.get("code")
-        flow_id = params.get("flow_id")
-
-        if not code or not flow_id:
-            _LOGGER.warning("Callback received but missing code or flow_id. Params: %s", params)
-            return web.Response(text="Missing code or flow_id parameters. Please try again.", status=400)
-
-        _LOGGER.debug("Callback received with code: %s for flow_id: %s", code, flow_id)
-
-        # Retrieve the flow and update it
-        try:
-            await hass.config_entries.flow.async_configure(flow_id=flow_id, user_input={"code": code})
-        except Exception as err:
-            _LOGGER.error("Failed to pass code to config flow: %s", err)
-            return web.Response(text=f"Error occurred while resuming flow: {err}", status=500)
-
-        return web.Response(
-            text="Authorization successful! You can close this window and return to Home Assistant.",
-            content_type="text/html",
-        )
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored plant catalogue and shared calls when a config entry is removed."""
+    await SungrowCatalogue(hass, entry.entry_id).async_remove()
+    async_remove_flights(hass, entry.entry_id)
@@ -0,0 +1,167 @@
+"""OAuth token lifecycle for the Sungrow iSolarCloud integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import ClientResponse, ClientSession
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+from pysolarcloud import AbstractAuth, PySolarCloudException
+
+from .const import CONF_APP_ID, CONF_APP_KEY, CONF_APP_SECRET, RATE_LIMIT_RETRIES, TOKEN_REFRESH_MARGIN
+from .ratelimit import RequestPriority, async_get_scheduler
+from .stats import async_get_stats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SungrowAuth(AbstractAuth):
+    """Authenticate iSolarCloud requests with the tokens stored on a config entry.
+
+    Tokens are refreshed ahead of expiry rather than after a request fails, and
+    every refresh is written back to the config entry so a restart never starts
+    from a stale token. Concurrent callers share a single in-flight refresh.
+
+    Every request goes through the GatewayScheduler shared by all entries using
+    the same app key on the same gateway, and is recorded in the entry's stats.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, websession: ClientSession, host: str) -> None:
+        """Initialize."""
+        super().__init__(
+            websession,
+            host,
+            entry.data[CONF_APP_KEY],
+            entry.data[CONF_APP_SECRET],
+            entry.data[CONF_APP_ID],
+        )
+        self.hass = hass
+        self.entry = entry
+        self.tokens: dict[str, Any] | None = entry.data.get("tokens")
+        self._refresh_task: asyncio.Task | None = None
+        self._unsub_refresh: CALLBACK_TYPE | None = None
+        self.scheduler = async_get_scheduler(hass, host, entry.data[CONF_APP_KEY])
+        self.stats = async_get_stats(hass, entry.entry_id)
+
+    @property
+    def expires_at(self) -> int | None:
+        """Return when the access token expires, as a Unix timestamp, if known."""
+        if not self.tokens:
+            return None
+        return self.tokens.get("expires_at")
+
+    def _expires_soon(self) -> bool:
+        """Return True if the access token is within TOKEN_REFRESH_MARGIN of expiry."""
+        if (expires_at := self.expires_at) is None:
+            return False
+        return expires_at - TOKEN_REFRESH_MARGIN.total_seconds() <= time.time()
+
+    async def async_get_access_token(self) -> str:
+        """Return a valid access token, refreshing it first if it is about to expire."""
+        if self.tokens is None:
+            raise PySolarCloudException(
+                {"error": "auth_not_initialised", "error_description": "You must authorize first."}
+            )
+        if self._expires_soon():
+            await self.async_refresh()
+        return self.tokens["access_token"]
+
+    async def async_refresh(self) -> None:
+        """Refresh the tokens, joining a refresh that is already in flight."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = self.entry.async_create_background_task(
+                self.hass, self._async_refresh(), name=f"Sungrow token refresh {self.entry.title}"
+            )
+        # Shielded so a caller that times out doesn't cancel the refresh for everyone else
+        await asyncio.shield(self._refresh_task)
+
+    async def _async_refresh(self) -> None:
+        """Exchange the refresh token for new tokens and persist them."""
+        _LOGGER.debug("Refreshing iSolarCloud access token")
+        await self.scheduler.async_acquire(RequestPriority.AUTH)
+        try:
+            ts = await self.async_refresh_tokens(self.tokens["refresh_token"])
+        except Exception as err:
+            self.stats.async_record_token_refresh(repr(err))
+            raise
+        if "access_token" not in ts:
+            self.stats.async_record_token_refresh(ts.get("error", "token_refresh_failed"))
+            raise PySolarCloudException(
+                {"error": ts.get("error", "token_refresh_failed"), "error_description": ts.get("error_description")}
+            )
+        self.stats.async_record_token_refresh()
+        self.tokens = {
+            "access_token": ts["access_token"],
+            "refresh_token": ts["refresh_token"],
+            "expires_at": int(time.time()) + ts["expires_in"] - 20,
+        }
+        self.hass.config_entries.async_update_entry(self.entry, data={**self.entry.data, "tokens": self.tokens})
+        self.async_schedule_refresh()
+
+    async def request(self, path, data, **kwargs) -> ClientResponse:
+        """Make a request through the gateway scheduler, retrying it if the gateway throttles it."""
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            if attempt:
+                self.stats.async_record_retry(path)
+            await self.scheduler.async_acquire()
+            started = time.monotonic()
+            try:
+                response = await super().request(path, data, **kwargs)
+                # Read the body here so its size and download time are counted; json() reuses it
+                body = await response.read()
+            except Exception:
+                self.stats.async_record_error(path)
+                raise
+            self.stats.async_record_request(path, time.monotonic() - started, len(body), response.status)
+            if response.status != HTTPStatus.TOO_MANY_REQUESTS:
+                self.scheduler.async_record_success()
+                return response
+            self.scheduler.async_record_throttled(_retry_after(response))
+            response.release()
+        raise PySolarCloudException(
+            {"error": "rate_limited", "error_description": f"Request to {path} was throttled by iSolarCloud"}
+        )
+
+    @callback
+    def async_schedule_refresh(self) -> None:
+        """Schedule a proactive refresh TOKEN_REFRESH_MARGIN before the token expires."""
+        self.async_cancel_refresh()
+        if (expires_at := self.expires_at) is None:
+            return
+        self._unsub_refresh = async_track_point_in_utc_time(
+            self.hass,
+            self._async_handle_refresh_timer,
+            dt_util.utc_from_timestamp(expires_at) - TOKEN_REFRESH_MARGIN,
+        )
+
+    @callback
+    def async_cancel_refresh(self) -> None:
+        """Cancel the scheduled proactive refresh."""
+        if self._unsub_refresh:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+
+    async def _async_handle_refresh_timer(self, _now: datetime) -> None:
+        """Refresh the tokens when the proactive timer fires."""
+        self._unsub_refresh = None
+        try:
+            await self.async_refresh()
+        except Exception as err:  # pylint: disable=broad-except
+            # The next request retries the refresh, as the token is still expiring
+            _LOGGER.warning("Failed to refresh iSolarCloud access token: %s", err)
+
+
+def _retry_after(response: ClientResponse) -> float | None:
+    """Return the delay a throttled response asks for, in seconds, if it gives one."""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,241 @@
+"""Backfill of long-term statistics for the Sungrow iSolarCloud integration.
+
+The recorder compiles no statistics for hours when Home Assistant was down or
+iSolarCloud was unreachable. The backfill finds those hours for each energy and
+power sensor, fetches them from iSolarCloud's historical data and imports them.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from aiohttp import ClientError
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMeanType, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_import_statistics, statistics_during_period
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+from pysolarcloud import PySolarCloudException
+from pysolarcloud.plants import Plants
+
+from .catalogue import SungrowCatalogue
+from .const import BACKFILL_CHUNK, BACKFILL_LOOKBACK, BACKFILL_SAMPLE_INTERVAL, BACKFILL_SCAN_INTERVAL, CONF_LOCAL
+from .ratelimit import RequestPriority, request_priority
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+
+# The point codes iSolarCloud keeps history for
+CLOUD_POINT_CODES = frozenset(Plants.measure_points.values())
+
+
+@dataclass(slots=True)
+class StatisticGap:
+    """The missing hours of one sensor's statistics."""
+
+    statistic_id: str
+    point_code: str
+    unit: str | None
+    has_sum: bool
+    # The existing hourly rows, by start timestamp, to continue the sum from
+    rows: dict[float, dict[str, Any]]
+    hours: list[datetime]
+
+
+def hour_runs(hours: list[datetime], chunk: timedelta = BACKFILL_CHUNK) -> list[tuple[datetime, datetime]]:
+    """Group sorted hours into (start, end) ranges of consecutive hours, each at most chunk long."""
+    runs: list[tuple[datetime, datetime]] = []
+    for hour in hours:
+        if runs and runs[-1][1] == hour and runs[-1][1] - runs[-1][0] < chunk:
+            runs[-1] = (runs[-1][0], hour + HOUR)
+        else:
+            runs.append((hour, hour + HOUR))
+    return runs
+
+
+def hourly_samples(series: list[dict[str, Any]]) -> dict[str, dict[datetime, list[float]]]:
+    """Group historical data by point code and the UTC hour it was sampled in.
+
+    iSolarCloud's timestamps have no time zone; they are taken to be Home Assistant's.
+    """
+    samples: dict[str, dict[datetime, list[float]]] = defaultdict(lambda: defaultdict(list))
+    time_zone = dt_util.get_default_time_zone()
+    for point in series:
+        if not isinstance(value := point.get("value"), float):
+            continue
+        timestamp = dt_util.as_utc(point["timestamp"].replace(tzinfo=time_zone))
+        samples[point["code"]][timestamp.replace(minute=0, second=0, microsecond=0)].append(value)
+    return samples
+
+
+def build_statistics(gap: StatisticGap, samples: dict[datetime, list[float]]) -> list[StatisticData]:
+    """Build the hourly statistics of a sensor's missing hours from its samples.
+
+    Energy sums carry on from the row before each missing hour, counting a drop in
+    the reading as a meter reset, as the recorder does.
+    """
+    statistics: list[StatisticData] = []
+    last_state: float | None = None
+    last_sum: float | None = None
+    for hour in gap.hours:
+        if (previous := gap.rows.get((hour - HOUR).timestamp())) is not None:
+            last_state, last_sum = previous.get("state"), previous.get("sum")
+        if not (values := samples.get(hour)):
+            continue
+        if not gap.has_sum:
+            statistics.append(
+                StatisticData(start=hour, mean=sum(values) / len(values), min=min(values), max=max(values))
+            )
+            continue
+        state = values[-1]
+        if last_state is None or last_sum is None:
+            # Nothing to continue the sum from
+            continue
+        last_sum += state - last_state if state >= last_state else state
+        last_state = state
+        statistics.append(StatisticData(start=hour, state=state, sum=last_sum))
+    return statistics
+
+
+class SungrowBackfill:
+    """Fills gaps in the long-term statistics of one config entry's sensors."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, plants_service: Plants, catalogue: SungrowCatalogue
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.entry = entry
+        self.plants_service = plants_service
+        self.catalogue = catalogue
+
+    @callback
+    def async_start(self) -> None:
+        """Backfill now, then look for new gaps every BACKFILL_SCAN_INTERVAL until the entry unloads."""
+
+        @callback
+        def _async_schedule_backfill(_now: datetime | None = None) -> None:
+            self.entry.async_create_background_task(
+                self.hass, self.async_backfill(), name=f"Sungrow statistics backfill {self.entry.title}"
+            )
+
+        _async_schedule_backfill()
+        self.entry.async_on_unload(
+            async_track_time_interval(self.hass, _async_schedule_backfill, BACKFILL_SCAN_INTERVAL)
+        )
+
+    async def async_backfill(self) -> int:
+        """Import the statistics missing for every plant; returns the number of hourly rows imported."""
+        imported = 0
+        for plant_id, gaps in (await self._async_find_gaps()).items():
+            imported += await self._async_backfill_plant(plant_id, gaps)
+        if imported:
+            _LOGGER.info("Backfilled %d hourly statistics from iSolarCloud", imported)
+        return imported
+
+    @callback
+    def _async_statistic_sensors(self) -> dict[str, tuple[str, str, dict[str, Any]]]:
+        """Return the plant, point code and catalogue record of each energy and power sensor, by entity ID.
+
+        Only sensors of cloud plants' points with history in iSolarCloud can be backfilled.
+        """
+        sensors = {}
+        local_plants = self.entry.options.get(CONF_LOCAL, {})
+        entity_registry = er.async_get(self.hass)
+        for entity_entry in er.async_entries_for_config_entry(entity_registry, self.entry.entry_id):
+            if entity_entry.disabled:
+                continue
+            plant_id, _, point_code = entity_entry.unique_id.partition("_")
+            if plant_id in local_plants or point_code not in CLOUD_POINT_CODES:
+                continue
+            record = self.catalogue.plants.get(plant_id, {}).get("points", {}).get(point_code)
+            if record is not None and record.get("device_class") in (SensorDeviceClass.ENERGY, SensorDeviceClass.POWER):
+                sensors[entity_entry.entity_id] = (plant_id, point_code, record)
+        return sensors
+
+    async def _async_find_gaps(self) -> dict[str, list[StatisticGap]]:
+        """Return the gaps in each plant's statistics, between their first row and the last compiled hour."""
+        if not (sensors := self._async_statistic_sensors()):
+            return {}
+
+        # The recorder may still be compiling the last hour, so leave it alone
+        end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - HOUR
+        stats = await get_instance(self.hass).async_add_executor_job(
+            statistics_during_period,
+            self.hass,
+            end - BACKFILL_LOOKBACK,
+            end,
+            set(sensors),
+            "hour",
+            None,
+            {"state", "sum", "mean"},
+        )
+
+        gaps: dict[str, list[StatisticGap]] = defaultdict(list)
+        for statistic_id, (plant_id, point_code, record) in sensors.items():
+            # Without a first row there's nothing to tell a gap from a sensor that didn't exist yet
+            if not (rows := stats.get(statistic_id)):
+                continue
+            existing = {row["start"]: row for row in rows}
+            hour = dt_util.utc_from_timestamp(rows[0]["start"]) + HOUR
+            missing = []
+            while hour < end:
+                if hour.timestamp() not in existing:
+                    missing.append(hour)
+                hour += HOUR
+            if missing:
+                has_sum = record["device_class"] == SensorDeviceClass.ENERGY
+                gaps[plant_id].append(
+                    StatisticGap(statistic_id, point_code, record.get("unit"), has_sum, existing, missing)
+                )
+        return gaps
+
+    async def _async_backfill_plant(self, plant_id: str, gaps: list[StatisticGap]) -> int:
+        """Fetch a plant's missing hours in chunks, with every point in one request, and import them."""
+        hours = sorted({hour for gap in gaps for hour in gap.hours})
+        measure_points = sorted({gap.point_code for gap in gaps})
+
+        series: list[dict[str, Any]] = []
+        for start, end in hour_runs(hours):
+            local_start, local_end = dt_util.as_local(start), dt_util.as_local(end)
+            try:
+                with request_priority(RequestPriority.BACKGROUND):
+                    data = await self.plants_service.async_get_historical_data(
+                        plant_id,
+                        local_start.replace(tzinfo=None),
+                        local_end.replace(tzinfo=None),
+                        measure_points=measure_points,
+                        interval=BACKFILL_SAMPLE_INTERVAL,
+                    )
+            except (PySolarCloudException, ClientError, TimeoutError) as err:
+                # The hours are still missing, so they are tried again next time
+                _LOGGER.warning("Failed to fetch history for plant %s from %s: %s", plant_id, local_start, err)
+                continue
+            series.extend(data.get(plant_id, []))
+
+        samples = hourly_samples(series)
+        imported = 0
+        for gap in gaps:
+            if not (statistics := build_statistics(gap, samples.get(gap.point_code, {}))):
+                continue
+            metadata = StatisticMetaData(
+                mean_type=StatisticMeanType.NONE if gap.has_sum else StatisticMeanType.ARITHMETIC,
+                has_sum=gap.has_sum,
+                name=None,
+                source="recorder",
+                statistic_id=gap.statistic_id,
+                unit_of_measurement=gap.unit,
+            )
+            _LOGGER.debug("Importing %d hours of statistics for %s", len(statistics), gap.statistic_id)
+            async_import_statistics(self.hass, metadata, statistics)
+            imported += len(statistics)
+        return imported
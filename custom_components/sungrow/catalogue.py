@@ -0,0 +1,142 @@
+"""Persistent plant and point catalogue for the Sungrow iSolarCloud integration.
+
+The catalogue remembers which plants an account has and which points each plant
+reports, so entities can be created at startup without waiting for the cloud.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .models import PointValue
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+def describe_point(point: PointValue) -> dict[str, Any]:
+    """Build the catalogue record for a point from its realtime reading."""
+    unit = point.unit
+
+    # Simple inference for Power/Energy
+    device_class = None
+    if unit in ["kW", "W"]:
+        device_class = SensorDeviceClass.POWER.value
+    elif unit in ["kWh"]:
+        device_class = SensorDeviceClass.ENERGY.value
+
+    # Points that are "Unknown" when first seen are usually for hardware that isn't
+    # present (e.g. meters/batteries), so their entities start disabled
+    enabled_default = point.value is not None or (point.status is not None and point.status.lower() != "unknown")
+
+    return {
+        "name": point.name,
+        "unit": unit,
+        "device_class": device_class,
+        "enabled_default": enabled_default,
+    }
+
+
+def plant_location(plant_info: dict[str, Any]) -> list[float] | None:
+    """Return a plant's [latitude, longitude] from the plant list, if it has usable coordinates."""
+    try:
+        latitude = float(plant_info["latitude"])
+        longitude = float(plant_info["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    # Plants without a configured location report 0, 0
+    if latitude == 0 and longitude == 0:
+        return None
+    return [latitude, longitude]
+
+
+class SungrowCatalogue:
+    """Plants and their points for one config entry, persisted with the Store helper.
+
+    The stored data is { "plants": { plant_id: { "name": str, "location": [lat, lon] | None,
+    "points": { point_code: record }, "devices": { ps_key: device } } } }, where each record
+    is built by describe_point and each device is a device_record with its own "points".
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self.plants: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Load the catalogue from storage."""
+        if (data := await self._store.async_load()) is not None:
+            self.plants = data.get("plants", {})
+            _LOGGER.debug("Loaded catalogue with %d plants", len(self.plants))
+
+    @callback
+    def async_update_plant(
+        self, plant_id: str, plant_name: str, points: dict[str, PointValue], location: list[float] | None = None
+    ) -> dict[str, dict]:
+        """Merge a plant's realtime readings into the catalogue.
+
+        Points missing from a payload are kept, so one partial response doesn't
+        churn entities. Returns the records for points not seen before.
+        """
+        plant = self.plants.setdefault(plant_id, {"name": None, "points": {}})
+        changed = plant["name"] != plant_name or plant.get("location") != location
+        plant["name"] = plant_name
+        plant["location"] = location
+
+        new_points = {}
+        for point_code, point in points.items():
+            if point_code not in plant["points"]:
+                new_points[point_code] = plant["points"][point_code] = describe_point(point)
+
+        if changed or new_points:
+            self._async_schedule_save()
+        return new_points
+
+    @callback
+    def async_update_devices(self, plant_id: str, devices: dict[str, dict[str, Any]]) -> None:
+        """Set a catalogued plant's devices from its device list, keeping the points of known devices."""
+        if (plant := self.plants.get(plant_id)) is None:
+            return
+        known = plant.get("devices", {})
+        updated = {
+            ps_key: device | {"points": known.get(ps_key, {}).get("points", {})} for ps_key, device in devices.items()
+        }
+        if updated != known:
+            plant["devices"] = updated
+            self._async_schedule_save()
+
+    @callback
+    def async_update_device(self, plant_id: str, ps_key: str, points: dict[str, PointValue]) -> dict[str, dict]:
+        """Merge a device's realtime readings into the catalogue, returning the records for new points."""
+        device = self.plants[plant_id]["devices"][ps_key]
+        new_points = {}
+        for point_code, point in points.items():
+            if point_code not in device["points"]:
+                new_points[point_code] = device["points"][point_code] = describe_point(point)
+
+        if new_points:
+            self._async_schedule_save()
+        return new_points
+
+    @callback
+    def async_remove_plant(self, plant_id: str) -> None:
+        """Forget a plant that is no longer on the account."""
+        if self.plants.pop(plant_id, None) is not None:
+            self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Write the catalogue to storage, coalescing bursts of changes."""
+        self._store.async_delay_save(lambda: {"plants": self.plants}, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the stored catalogue."""
+        await self._store.async_remove()
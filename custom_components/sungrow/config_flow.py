@@ -6,26 +6,37 @@ from typing import Any
 import voluptuous as vol
 from aiohttp import ClientError
 from homeassistant import config_entries
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.importlib import async_import_module
 from homeassistant.helpers.network import get_url
 
+from .catalogue import SungrowCatalogue
 from .const import (
     CONF_APP_ID,
     CONF_APP_KEY,
     CONF_APP_SECRET,
+    CONF_EXCLUDE_POINTS,
     CONF_GATEWAY,
+    CONF_HOST,
+    CONF_INCLUDE_POINTS,
+    CONF_LOCAL,
+    CONF_MINIMAL_ATTRIBUTES,
+    CONF_POINT_GROUPS,
+    CONF_POINTS,
+    CONF_PORT,
+    CONF_PROBE_GATEWAYS,
     CONF_REDIRECT_URI,
     DOMAIN,
     GATEWAYS,
+    MODBUS_PORT,
+    POINT_GROUPS,
+    TO_REDACT,
 )
-
-# Try to import pysolarcloud, handle if missing gracefully for development
-try:
-    from pysolarcloud import Auth
-except ImportError:
-    Auth = None
-    # For local development if pysolarcloud is not installed but in path or similar
-    # In a real environment, it should be installed via requirements.
+from .modbus import REGISTERS, ModbusClient, ModbusError, ModbusPlants
+from .probe import GatewayProbe, async_probe_gateways, fastest
+from .session import async_get_session, async_release_session
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,13 +51,26 @@ class SungrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.init_info = {}
         self.auth_client = None
 
+    @callback
+    def async_remove(self) -> None:
+        """Release the gateways' sessions, which are closed if no config entry is using them."""
+        self.hass.async_create_task(async_release_session(self.hass, self.flow_id))
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return SungrowOptionsFlow()
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None):
         """Handle the initial step."""
-        _LOGGER.debug(f"async_step_user called with user_input: {user_input}")
+        _LOGGER.debug("async_step_user called with user_input: %s", async_redact_data(user_input, TO_REDACT))
         errors = {}
 
         if user_input is not None:
             self.init_info = user_input
+            if user_input.get(CONF_PROBE_GATEWAYS):
+                return await self.async_step_gateway()
             return await self.async_step_auth()
 
         # Attempt to automatically detect the callback URL
@@ -76,34 +100,66 @@ class SungrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     vol.Required(CONF_APP_ID, default=""): str,
                     vol.Required(CONF_GATEWAY, default="Europe"): vol.In(list(GATEWAYS.keys())),
                     vol.Required(CONF_REDIRECT_URI, default=default_redirect): str,
+                    vol.Optional(CONF_PROBE_GATEWAYS, default=False): bool,
                 }
             ),
             errors=errors,
         )
 
+    async def async_step_gateway(self, user_input: dict[str, Any] | None = None):
+        """Probe every gateway with the credentials, then choose one, the fastest working one by default."""
+        if user_input is not None:
+            self.init_info = {**self.init_info, CONF_GATEWAY: user_input[CONF_GATEWAY]}
+            return await self.async_step_auth()
+
+        probes = await async_probe_gateways(
+            self.hass, self.flow_id, self.init_info[CONF_APP_KEY], self.init_info[CONF_APP_SECRET]
+        )
+        _LOGGER.debug("Probed iSolarCloud gateways: %s", probes)
+        best = fastest(probes)
+
+        return self.async_show_form(
+            step_id="gateway",
+            description_placeholders={
+                "results": "\n".join(_describe_probe(probe) for probe in probes),
+                "recommended": best.gateway if best is not None else "-",
+            },
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_GATEWAY, default=best.gateway if best is not None else self.init_info[CONF_GATEWAY]
+                    ): vol.In(list(GATEWAYS.keys())),
+                }
+            ),
+            errors={} if best is not None else {"base": "no_gateway"},
+        )
+
     async def async_step_auth(self, user_input: dict[str, Any] | None = None):
         """Handle the authorization step."""
         errors = {}
 
         # Initialize Auth client
         if not self.auth_client:
-            session = async_get_clientsession(self.hass)
-            gateway_url = GATEWAYS[self.init_info[CONF_GATEWAY]]
-
-            # Ensure Auth is available
-            if Auth is None:
-                # Fallback or error if library missing
+            # The client library and the callback view are only imported once a flow needs them,
+            # keeping them off the path of loading the integration
+            try:
+                pysolarcloud = await async_import_module(self.hass, "pysolarcloud")
+            except ImportError:
                 return self.async_abort(reason="library_missing")
+            view = await async_import_module(self.hass, f"{__package__}.view")
+            view.async_register_callback_view(self.hass)
 
-            self.auth_client = Auth(
+            gateway_url = GATEWAYS[self.init_info[CONF_GATEWAY]]
+            session = async_get_session(self.hass, gateway_url, self.flow_id)
+
+            self.auth_client = pysolarcloud.Auth(
                 host=gateway_url,
                 appkey=self.init_info[CONF_APP_KEY],
                 access_key=self.init_info[CONF_APP_SECRET],
                 app_id=self.init_info[CONF_APP_ID],
                 websession=session,
             )
-            _LOGGER.info("Initialized Auth client for Sungrow iSolarCloud")
-            _LOGGER.debug(f"Auth client details: {self.auth_client}")
+            _LOGGER.info("Initialized Auth client for Sungrow iSolarCloud gateway %s", gateway_url)
 
         if user_input is not None and user_input.get("code"):
             try:
@@ -135,12 +191,12 @@ class SungrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 # (and prevents issues if the provider strips query params)
                 redirect_uri_clean = self.init_info[CONF_REDIRECT_URI]
 
-                _LOGGER.info("Authorizing with code: %s and redirect_uri: %s", code, redirect_uri_clean)
+                _LOGGER.info("Authorizing with redirect_uri: %s", redirect_uri_clean)
                 await self.auth_client.async_authorize(code, redirect_uri_clean)
 
                 # Get the tokens
                 tokens = self.auth_client.tokens
-                _LOGGER.debug(f"Received tokens: {tokens}")
+                _LOGGER.debug("Received tokens: %s", async_redact_data(tokens, TO_REDACT))
 
                 if not tokens or not tokens.get("access_token"):
                     _LOGGER.error("Failed to retrieve tokens")
@@ -170,3 +226,114 @@ class SungrowConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=vol.Schema({vol.Optional("code"): str}),
             errors=errors,
         )
+
+
+def _describe_probe(probe: GatewayProbe) -> str:
+    """Return a line of the gateway step's description for a probe."""
+    if not probe.works:
+        return f"- {probe.gateway}: {probe.error}"
+    return (
+        f"- {probe.gateway}: {probe.handshake_seconds * 1000:.0f} ms to connect, "
+        f"{probe.api_seconds * 1000:.0f} ms to answer"
+    )
+
+
+class SungrowOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for Sungrow iSolarCloud."""
+
+    def __init__(self):
+        """Initialize the options flow."""
+        self.options: dict[str, Any] = {}
+        self.plants: dict[str, dict[str, Any]] = {}
+        self.plant_id: str | None = None
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None):
+        """Manage the options, optionally going on to choose a plant's points."""
+        if not self.plants:
+            catalogue = SungrowCatalogue(self.hass, self.config_entry.entry_id)
+            await catalogue.async_load()
+            self.plants = catalogue.plants
+
+        if user_input is not None:
+            self.options = {**self.config_entry.options, CONF_MINIMAL_ATTRIBUTES: user_input[CONF_MINIMAL_ATTRIBUTES]}
+            if plant_id := user_input.get("plant"):
+                self.plant_id = plant_id
+                return await self.async_step_points()
+            return self.async_create_entry(data=self.options)
+
+        schema = {
+            vol.Required(
+                CONF_MINIMAL_ATTRIBUTES,
+                default=self.config_entry.options.get(CONF_MINIMAL_ATTRIBUTES, False),
+            ): bool,
+        }
+        if self.plants:
+            schema[vol.Optional("plant")] = vol.In({plant_id: plant["name"] for plant_id, plant in self.plants.items()})
+
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
+
+    async def async_step_points(self, user_input: dict[str, Any] | None = None):
+        """Choose the point groups and points to fetch for a plant, and where to read them from."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            host = user_input.pop(CONF_HOST, "").strip()
+            port = user_input.pop(CONF_PORT, MODBUS_PORT)
+            if host and not await self._async_can_read_locally(host, port):
+                errors[CONF_HOST] = "cannot_connect"
+            else:
+                points = dict(self.options.get(CONF_POINTS, {}))
+                if any(user_input.values()):
+                    points[self.plant_id] = user_input
+                else:
+                    points.pop(self.plant_id, None)
+
+                local = dict(self.options.get(CONF_LOCAL, {}))
+                if host:
+                    local[self.plant_id] = {CONF_HOST: host, CONF_PORT: port}
+                else:
+                    local.pop(self.plant_id, None)
+
+                options = {**self.options, CONF_POINTS: points, CONF_LOCAL: local}
+                if not local:
+                    del options[CONF_LOCAL]
+                return self.async_create_entry(data=options)
+
+        plant = self.plants[self.plant_id]
+        current = self.config_entry.options.get(CONF_POINTS, {}).get(self.plant_id, {})
+        current_local = self.config_entry.options.get(CONF_LOCAL, {}).get(self.plant_id, {})
+        point_names = {point_code: info.get("name") or point_code for point_code, info in plant["points"].items()}
+
+        return self.async_show_form(
+            step_id="points",
+            description_placeholders={"plant": plant["name"]},
+            errors=errors,
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(CONF_POINT_GROUPS, default=current.get(CONF_POINT_GROUPS, [])): cv.multi_select(
+                        {group: group.title() for group in POINT_GROUPS}
+                    ),
+                    vol.Optional(CONF_INCLUDE_POINTS, default=current.get(CONF_INCLUDE_POINTS, [])): cv.multi_select(
+                        point_names
+                    ),
+                    vol.Optional(CONF_EXCLUDE_POINTS, default=current.get(CONF_EXCLUDE_POINTS, [])): cv.multi_select(
+                        point_names
+                    ),
+                    vol.Optional(CONF_HOST, description={"suggested_value": current_local.get(CONF_HOST)}): str,
+                    vol.Optional(CONF_PORT, default=current_local.get(CONF_PORT, MODBUS_PORT)): cv.port,
+                }
+            ),
+        )
+
+    async def _async_can_read_locally(self, host: str, port: int) -> bool:
+        """Return True if the plant's inverter answers Modbus requests at host and port."""
+        client = ModbusClient(host, port)
+        try:
+            await ModbusPlants(client, self.plant_id).async_get_realtime_data(
+                [self.plant_id], measure_points=[REGISTERS[0].code]
+            )
+        except ModbusError as err:
+            _LOGGER.warning("Could not read the inverter at %s:%s: %s", host, port, err)
+            return False
+        finally:
+            await client.async_close()
+        return True
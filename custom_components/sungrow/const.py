@@ -1,5 +1,7 @@
 """Constants for the Sungrow iSolarCloud integration."""
 
+from datetime import timedelta
+
 DOMAIN = "sungrow"
 CONF_APP_KEY = "app_key"
 CONF_APP_SECRET = "app_secret"
@@ -7,12 +9,180 @@ CONF_APP_ID = "app_id"
 CONF_AUTH_URL = "auth_url_input"
 CONF_GATEWAY = "gateway"
 CONF_REDIRECT_URI = "redirect_uri"
+CONF_PROBE_GATEWAYS = "probe_gateways"
 CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 
+# Options
+CONF_MINIMAL_ATTRIBUTES = "minimal_attributes"
+CONF_POINTS = "points"
+CONF_POINT_GROUPS = "groups"
+CONF_INCLUDE_POINTS = "include"
+CONF_EXCLUDE_POINTS = "exclude"
+CONF_LOCAL = "local"
+CONF_HOST = "host"
+CONF_PORT = "port"
+
 GATEWAYS = {
     "Europe": "https://gateway.isolarcloud.eu",
     "International": "https://gateway.isolarcloud.com.hk",
     "China": "https://gateway.isolarcloud.com",
     "Australia": "https://augateway.isolarcloud.com",
 }
+
+# Seconds allowed for probing a gateway, and how often an entry whose gateway was
+# chosen by probing checks it still works, failing over to another if not
+GATEWAY_PROBE_TIMEOUT = 10
+GATEWAY_PROBE_INTERVAL = timedelta(hours=1)
+
+# Maximum number of plants requested in a single realtime-data call
+REALTIME_BATCH_SIZE = 50
+
+# Connections kept open to each gateway, shared by every entry using it, and the
+# seconds an idle one is kept for reuse
+GATEWAY_CONNECTIONS = 8
+GATEWAY_KEEPALIVE = 60
+
+# Seconds a gateway's DNS lookup is cached for
+GATEWAY_DNS_CACHE_TTL = 300
+
+# Seconds allowed to connect to a gateway, and to wait for each read of its response
+GATEWAY_CONNECT_TIMEOUT = 10
+GATEWAY_READ_TIMEOUT = 20
+
+# Maximum number of realtime-data calls in flight at once for one account
+MAX_CONCURRENT_REQUESTS = 4
+
+# Seconds before a single realtime-data call is abandoned
+REQUEST_TIMEOUT = 30
+
+# Seconds allowed for discovering an account's plants in the background after setup, and
+# how long until a failed discovery is retried, doubling every time up to DISCOVERY_RETRY_MAX
+DISCOVERY_TIMEOUT = 120
+DISCOVERY_RETRY = timedelta(seconds=30)
+DISCOVERY_RETRY_MAX = timedelta(minutes=30)
+
+# Seconds a plant list or realtime-data result is reused for identical calls
+REQUEST_REUSE_WINDOW = 2
+
+# Refresh the access token this long before it expires
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# Adaptive polling: plants are polled quickly from DAYLIGHT_MARGIN before sunrise
+# until DAYLIGHT_MARGIN after sunset, and back off at night unless they have a battery
+DAY_SCAN_INTERVAL = timedelta(minutes=1)
+NIGHT_SCAN_INTERVAL = timedelta(minutes=30)
+BATTERY_NIGHT_SCAN_INTERVAL = timedelta(minutes=5)
+DAYLIGHT_MARGIN = timedelta(minutes=30)
+
+# Point codes containing any of these belong to a battery
+BATTERY_POINT_KEYWORDS = ("battery", "soc", "energy_storage", "charge")
+
+# Plants falling due within this window share a poll cycle; also the shortest poll interval
+POLL_COALESCE_WINDOW = timedelta(seconds=30)
+
+# iSolarCloud refreshes plant data this often; once its phase is learned, polls are
+# aligned to land UPSTREAM_UPDATE_DELAY after each expected update
+UPSTREAM_UPDATE_INTERVAL = timedelta(minutes=5)
+UPSTREAM_UPDATE_DELAY = timedelta(seconds=20)
+
+# Keep probing until the upstream update time is known to within this window
+UPSTREAM_PHASE_TOLERANCE = timedelta(seconds=30)
+
+# Requests per second each app key may send to a gateway, and the burst allowed on top
+REQUEST_RATE = 2.0
+REQUEST_BURST = 10
+
+# Backoff after the gateway throttles us, in seconds: doubles per throttled response, with jitter
+RATE_LIMIT_BACKOFF = 2
+RATE_LIMIT_MAX_BACKOFF = 300
+
+# Times a throttled request is retried before giving up
+RATE_LIMIT_RETRIES = 3
+
+# Point groups offered in the options, matched against the words of each point code
+POINT_GROUPS = {
+    "production": frozenset(
+        {"yield", "pv", "inverter", "irradiation", "radiation", "equivalent", "pr", "temperature", "forecast"}
+    ),
+    "battery": frozenset({"battery", "soc", "ess", "storage", "field", "charge", "discharge", "charging"}),
+    "grid": frozenset({"grid", "meter", "purchased", "feed"}),
+    "load": frozenset({"load", "consumption"}),
+}
+
+# Polling tiers: a point polls with the first tier whose words appear in its code, otherwise "normal".
+# Each tier polls no more often than its minimum interval, so fast points follow the plant's interval.
+# Running totals are matched before readings, as their codes can name what they total (e.g.
+# accumulative_power_consumption_by_meter), but "total" alone is matched last, as it also
+# starts readings across the whole plant (e.g. total_active_power)
+POINT_TIERS = (
+    ("slow", frozenset({"cumulative", "accumulative", "capacity", "equivalent", "number", "pr"})),
+    ("fast", frozenset({"power", "soc", "radiation", "temperature"})),
+    ("slow", frozenset({"total"})),
+)
+DEFAULT_POINT_TIER = "normal"
+TIER_MIN_INTERVALS = {
+    "fast": timedelta(0),
+    "normal": timedelta(minutes=15),
+    "slow": timedelta(hours=1),
+}
+
+# Backfill of long-term statistics: gaps up to BACKFILL_LOOKBACK old are looked for every
+# BACKFILL_SCAN_INTERVAL, and fetched BACKFILL_CHUNK at a time in BACKFILL_SAMPLE_INTERVAL steps
+BACKFILL_LOOKBACK = timedelta(days=7)
+BACKFILL_SCAN_INTERVAL = timedelta(hours=1)
+BACKFILL_CHUNK = timedelta(hours=3)
+BACKFILL_SAMPLE_INTERVAL = timedelta(minutes=5)
+
+# Local Modbus TCP access to an inverter's WiNet-S dongle or LAN port
+MODBUS_PORT = 502
+MODBUS_UNIT_ID = 1
+LOCAL_SCAN_INTERVAL = timedelta(seconds=5)
+
+# Where a local plant's data came from: its inverter, or iSolarCloud when the local link is down
+SOURCE_LOCAL = "local"
+SOURCE_CLOUD = "cloud"
+
+# Failovers between sources remembered for each local plant
+FAILOVER_HISTORY = 20
+
+# Seconds before a Modbus request is abandoned
+MODBUS_TIMEOUT = 5
+
+# Registers read in one request, and the largest run of unused registers read through
+# to join two neighbouring reads into one
+MODBUS_MAX_REGISTERS = 100
+MODBUS_MAX_GAP = 10
+
+# Device-level data for inverters, batteries and meters: devices of one type are
+# fetched DEVICE_BATCH_SIZE per call, every DEVICE_SCAN_INTERVAL
+DEVICE_BATCH_SIZE = 50
+DEVICE_SCAN_INTERVAL = timedelta(minutes=5)
+
+# iSolarCloud endpoints whose responses the coordinators parse into point values
+REALTIME_ENDPOINT = "/openapi/platform/getPowerStationRealTimeData"
+DEVICE_REALTIME_ENDPOINT = "/openapi/platform/getDeviceRealTimeData"
+
+# Upper bounds of the request latency histogram in diagnostics, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Token refreshes and per-update entity write counts kept for diagnostics
+STATS_HISTORY = 20
+
+# Period over which each plant's API calls are counted by its diagnostic sensor
+API_CALL_WINDOW = timedelta(hours=1)
+
+# Keys of credentials, tokens and locations, redacted from diagnostics and logs
+TO_REDACT = {
+    CONF_APP_KEY,
+    CONF_APP_SECRET,
+    CONF_APP_ID,
+    CONF_PASSWORD,
+    CONF_HOST,
+    "tokens",
+    "access_token",
+    "refresh_token",
+    "location",
+    "latitude",
+    "longitude",
+}
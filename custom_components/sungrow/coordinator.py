@@ -0,0 +1,704 @@
+"""Data update coordinators for the Sungrow iSolarCloud integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from functools import cached_property
+
+from astral import LocationInfo
+from astral.location import Location
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.sun import get_astral_location, get_location_astral_event_next
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BATTERY_NIGHT_SCAN_INTERVAL,
+    BATTERY_POINT_KEYWORDS,
+    DAY_SCAN_INTERVAL,
+    DAYLIGHT_MARGIN,
+    DEVICE_BATCH_SIZE,
+    DEVICE_REALTIME_ENDPOINT,
+    DEVICE_SCAN_INTERVAL,
+    FAILOVER_HISTORY,
+    LOCAL_SCAN_INTERVAL,
+    MAX_CONCURRENT_REQUESTS,
+    NIGHT_SCAN_INTERVAL,
+    POLL_COALESCE_WINDOW,
+    REALTIME_BATCH_SIZE,
+    REALTIME_ENDPOINT,
+    REQUEST_TIMEOUT,
+    SOURCE_CLOUD,
+    SOURCE_LOCAL,
+    TIER_MIN_INTERVALS,
+    UPSTREAM_PHASE_TOLERANCE,
+    UPSTREAM_UPDATE_DELAY,
+    UPSTREAM_UPDATE_INTERVAL,
+)
+from .modbus import ModbusError
+from .models import PointSelection, PointValue, parse_points, point_tier
+from .ratelimit import RequestPriority, request_priority
+from .stats import PlantHealth, SungrowStats, async_get_stats
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(minutes=5)
+
+
+@callback
+def _async_get_stats(hass: HomeAssistant, config_entry: ConfigEntry | None) -> SungrowStats:
+    """Return the entry's statistics, or statistics of the coordinator's own if it has no entry."""
+    if config_entry is None:
+        return SungrowStats()
+    return async_get_stats(hass, config_entry.entry_id)
+
+
+class SungrowAccountCoordinator(DataUpdateCoordinator):
+    """Coordinator to fetch realtime data for every plant on an account in batched requests.
+
+    Each plant is polled on its own adaptive schedule (see
+    SungrowPlantCoordinator.async_get_poll_interval). Within a plant, points are
+    split into polling tiers (see point_tier) that poll no more often than their
+    TIER_MIN_INTERVALS, so slow-moving totals aren't refetched every cycle. A
+    cycle fetches the due tiers of every plant that is due, and the coordinator's
+    update_interval is set to wake up for the next tier that falls due.
+    """
+
+    def __init__(self, hass, config_entry, plants_service, plant_ids, point_selections=None):
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="Sungrow Account",
+            update_interval=SCAN_INTERVAL,
+            config_entry=config_entry,
+        )
+        self.plants_service = plants_service
+        self.plant_ids = list(plant_ids)
+        self.plant_coordinators: dict[str, SungrowPlantCoordinator] = {}
+        # Plants whose batch failed when they were last polled, with the error
+        self.plant_errors: dict[str, Exception] = {}
+        # Plants polled in the last cycle; only these are handed new data
+        self.polled_plant_ids: set[str] = set()
+        # When each tier of each plant is next due
+        self._next_poll: dict[str, dict[str, datetime]] = {}
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # Plants with points chosen in the options, and the measure points to request for each
+        self.point_selections: dict[str, PointSelection] = point_selections or {}
+        self._known_points = list(plants_service.measure_points.values())
+        self._measure_points = {
+            plant_id: selection.measure_points(self._known_points)
+            for plant_id, selection in self.point_selections.items()
+        }
+        self._tier_points: dict[str, dict[str, tuple[str, ...]]] = {}
+        self.stats = _async_get_stats(hass, self.config_entry)
+        # Each plant's health, shared with its plant coordinator once it has one
+        self.plant_health: dict[str, PlantHealth] = {}
+        # How long the request that last fetched each plant took this cycle
+        self._fetch_seconds: dict[str, float] = {}
+
+    def _plant_tiers(self, plant_id: str) -> dict[str, tuple[str, ...]]:
+        """Return the selected measure points of each of a plant's polling tiers."""
+        if (tiers := self._tier_points.get(plant_id)) is None:
+            tiers = {}
+            selection = self.point_selections.get(plant_id, PointSelection())
+            for point_code in selection.measure_points(self._known_points):
+                tiers.setdefault(point_tier(point_code), []).append(point_code)
+            tiers = self._tier_points[plant_id] = {tier: tuple(codes) for tier, codes in tiers.items()}
+        # Without a list of points to split up, everything polls together
+        return tiers or {"fast": ()}
+
+    async def _async_update_data(self):
+        """Fetch data for the plants that are due, REALTIME_BATCH_SIZE plants per API call.
+
+        Plants only share a batch with plants requesting the same measure points.
+        Batches are fetched concurrently. A failed batch only marks its own
+        plants as failed; the update as a whole fails only if every plant does.
+        """
+        now = dt_util.utcnow()
+        # Pull in tiers that fall due shortly, so they share this cycle's requests
+        horizon = now + POLL_COALESCE_WINDOW
+
+        # The tiers due for each plant, and the measure points to request for it
+        due_tiers: dict[str, list[str]] = {}
+        requests: dict[str, tuple[str, ...] | None] = {}
+        partial: set[str] = set()
+        for plant_id in self.plant_ids:
+            next_poll = self._next_poll.get(plant_id, {})
+            tiers = self._plant_tiers(plant_id)
+            if not (due := [tier for tier in tiers if next_poll.get(tier, now) <= horizon]):
+                continue
+            due_tiers[plant_id] = due
+            if len(due) == len(tiers):
+                requests[plant_id] = self._measure_points.get(plant_id)
+            else:
+                requests[plant_id] = tuple(sorted(point for tier in due for point in tiers[tier]))
+                partial.add(plant_id)
+        self.polled_plant_ids = set(due_tiers)
+
+        data, plant_errors = await self._async_fetch_batches(self._batch(requests))
+
+        # On the first refresh, retry failed batches one plant per call so a single
+        # slow or broken plant doesn't stop every plant sharing its batch from being set up
+        if self.data is None and plant_errors and REALTIME_BATCH_SIZE > 1:
+            retry_data, plant_errors = await self._async_fetch_batches(
+                [(requests[plant_id], [plant_id]) for plant_id in plant_errors]
+            )
+            data.update(retry_data)
+
+        # Plants that only had some tiers fetched keep the rest of their last data
+        previous = self.data or {}
+        for plant_id in partial & data.keys():
+            data[plant_id] = previous.get(plant_id, {}) | data[plant_id]
+
+        self._async_schedule_polls(due_tiers, data, plant_errors, now)
+        self._async_record_health(plant_errors)
+
+        if plant_errors and len(plant_errors) == len(due_tiers):
+            err = next(iter(plant_errors.values()))
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+
+        # Carry over the plants that weren't due this cycle
+        self.plant_errors = {
+            plant_id: self.plant_errors[plant_id]
+            for plant_id in self.plant_ids
+            if plant_id not in self.polled_plant_ids and plant_id in self.plant_errors
+        } | plant_errors
+        return {
+            plant_id: previous[plant_id]
+            for plant_id in self.plant_ids
+            if plant_id not in self.polled_plant_ids and plant_id in previous
+        } | data
+
+    @callback
+    def _async_schedule_polls(
+        self,
+        due_tiers: dict[str, list[str]],
+        data: dict[str, dict[str, PointValue]],
+        plant_errors: dict[str, Exception],
+        now: datetime,
+    ) -> None:
+        """Work out when the polled tiers are next due and wake up for the earliest."""
+        for plant_id, tiers in due_tiers.items():
+            if (plant_coordinator := self.plant_coordinators.get(plant_id)) is not None:
+                if plant_id in data:
+                    plant_coordinator.async_observe_poll(data[plant_id], now)
+                interval = plant_coordinator.async_get_poll_interval(now)
+            else:
+                interval = SCAN_INTERVAL
+            next_poll = self._next_poll.setdefault(plant_id, {})
+            # A failed plant's tiers are retried at its own interval, not held back to their minimums
+            failed = plant_id in plant_errors
+            for tier in tiers:
+                next_poll[tier] = now + (interval if failed else max(interval, TIER_MIN_INTERVALS[tier]))
+
+        next_polls = [
+            next_poll
+            for plant_id in self.plant_ids
+            if plant_id in self._next_poll
+            for next_poll in self._next_poll[plant_id].values()
+        ]
+        if next_polls:
+            self.update_interval = max(min(next_polls) - now, POLL_COALESCE_WINDOW)
+
+    @callback
+    def async_reset_schedule(self) -> None:
+        """Make every tier of every plant due, so the next refresh polls them all."""
+        self._next_poll.clear()
+
+    @callback
+    def _async_record_health(self, plant_errors: dict[str, Exception]) -> None:
+        """Record how this cycle's fetch of each plant went in the plant's health."""
+        for plant_id, seconds in self._fetch_seconds.items():
+            self._async_get_health(plant_id).async_record_update(seconds, plant_id not in plant_errors)
+        self._fetch_seconds.clear()
+
+    @callback
+    def _async_get_health(self, plant_id: str) -> PlantHealth:
+        """Return a plant's health, creating it on first use."""
+        if (health := self.plant_health.get(plant_id)) is None:
+            health = self.plant_health[plant_id] = PlantHealth()
+        return health
+
+    def _batch(self, requests: dict[str, tuple[str, ...] | None]) -> list[tuple[tuple[str, ...] | None, list[str]]]:
+        """Split plants into batches of up to REALTIME_BATCH_SIZE plants requesting the same points."""
+        groups: dict[tuple[str, ...] | None, list[str]] = {}
+        for plant_id, measure_points in requests.items():
+            groups.setdefault(measure_points, []).append(plant_id)
+        return [
+            (measure_points, plant_ids[start : start + REALTIME_BATCH_SIZE])
+            for measure_points, plant_ids in groups.items()
+            for start in range(0, len(plant_ids), REALTIME_BATCH_SIZE)
+        ]
+
+    async def _async_fetch_batches(self, batches):
+        """Fetch batches of plants concurrently, returning the data and the error for each failed plant."""
+        results = await asyncio.gather(
+            *(self._async_fetch(plant_ids, measure_points) for measure_points, plant_ids in batches),
+            return_exceptions=True,
+        )
+
+        data = {}
+        plant_errors = {}
+        for (_, plant_ids), result in zip(batches, results, strict=True):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Error fetching realtime data for plants %s: %s", plant_ids, result)
+                plant_errors.update(dict.fromkeys(plant_ids, result))
+            else:
+                # { "123": { "code1": {...} }, "456": { ... } }
+                started = time.perf_counter()
+                data.update(
+                    {
+                        plant_id: parse_points(points, self.point_selections.get(plant_id))
+                        for plant_id, points in result.items()
+                    }
+                )
+                self.stats.async_record_parse(REALTIME_ENDPOINT, time.perf_counter() - started)
+        return data, plant_errors
+
+    async def _async_fetch(self, plant_ids, measure_points=None):
+        """Fetch realtime data for some plants, bounded by the shared concurrency limit."""
+        if measure_points is not None:
+            if not measure_points:
+                # Every point is deselected, so there's nothing to ask for
+                return {plant_id: {} for plant_id in plant_ids}
+            measure_points = list(measure_points)
+        async with self._semaphore:
+            for plant_id in plant_ids:
+                self._async_get_health(plant_id).async_record_api_call()
+            started = time.monotonic()
+            try:
+                async with asyncio.timeout(REQUEST_TIMEOUT):
+                    return await self.plants_service.async_get_realtime_data(plant_ids, measure_points=measure_points)
+            finally:
+                self._fetch_seconds.update(dict.fromkeys(plant_ids, time.monotonic() - started))
+
+    @callback
+    def async_add_plant(self, plant_coordinator: SungrowPlantCoordinator) -> CALLBACK_TYPE:
+        """Hand a plant coordinator its slice of every batched update that polled it.
+
+        Returns a callback that detaches the plant again.
+        """
+        plant_id = plant_coordinator.plant_id
+        if plant_id not in self.plant_ids:
+            self.plant_ids.append(plant_id)
+        self.plant_coordinators[plant_id] = plant_coordinator
+        plant_coordinator.health = self.plant_health.setdefault(plant_id, plant_coordinator.health)
+
+        @callback
+        def _async_push() -> None:
+            if plant_id not in self.plant_ids:
+                plant_coordinator.async_set_account_error(UpdateFailed(f"Plant {plant_id} is no longer on the account"))
+            elif not self.last_update_success:
+                plant_coordinator.async_set_account_error(self.last_exception)
+            elif plant_id in self.plant_errors:
+                plant_coordinator.async_set_account_error(self.plant_errors[plant_id])
+            else:
+                plant_coordinator.async_set_updated_data(self.data.get(plant_id, {}))
+
+        @callback
+        def _async_dispatch() -> None:
+            if plant_id in self.polled_plant_ids or plant_id not in self.plant_ids:
+                _async_push()
+
+        if self.data is not None:
+            _async_push()
+
+        remove_listener = self.async_add_listener(_async_dispatch, plant_id)
+
+        @callback
+        def _async_remove() -> None:
+            remove_listener()
+            self.plant_coordinators.pop(plant_id, None)
+
+        return _async_remove
+
+
+class SungrowPlantCoordinator(DataUpdateCoordinator):
+    """Coordinator to manage data for a single plant.
+
+    Scheduled polling is done in bulk by SungrowAccountCoordinator, which pushes
+    each plant's data in via async_set_updated_data. The plant only calls the API
+    itself when a refresh is requested for it directly (e.g. homeassistant.update_entity).
+    """
+
+    def __init__(self, hass, config_entry, plants_service, plant_id, plant_name, point_selection=None):
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"Sungrow Plant {plant_name}",
+            update_interval=None,
+            config_entry=config_entry,
+        )
+        self.plants_service = plants_service
+        self.plant_id = plant_id
+        self.point_selection: PointSelection | None = point_selection
+        # The plant's own coordinates, if iSolarCloud knows them; otherwise HA's location is used
+        self.latitude: float | None = None
+        self.longitude: float | None = None
+        # When the last scheduled poll ran and the data it saw
+        self._last_poll: tuple[datetime, dict[str, PointValue]] | None = None
+        # The window (earliest, latest] in which the next upstream update is expected to land
+        self._expected_update: tuple[datetime, datetime] | None = None
+        # The data and availability listeners were last notified of
+        self._notified_data: dict[str, PointValue] | None = None
+        self._notified_success = True
+        self.stats = _async_get_stats(hass, self.config_entry)
+        self.health = PlantHealth()
+
+    async def _async_update_data(self):
+        """Fetch the plant's data, recording how long it took and whether it worked in its health."""
+        started = time.monotonic()
+        try:
+            data = await self._async_fetch_data()
+        except Exception:
+            self.health.async_record_update(time.monotonic() - started, False)
+            raise
+        self.health.async_record_update(time.monotonic() - started, True)
+        return data
+
+    async def _async_fetch_data(self):
+        """Fetch data from API."""
+        try:
+            # async_get_realtime_data returns a dict of plants, keyed by plant_id
+            # { "123": { "code1": {...}, "code2": {...} } }
+            measure_points = None
+            if self.point_selection is not None:
+                measure_points = list(self.point_selection.measure_points(self.plants_service.measure_points.values()))
+                if not measure_points:
+                    return {}
+
+            # Only requested refreshes get here, so they jump ahead of scheduled polls
+            self.health.async_record_api_call()
+            with request_priority(RequestPriority.INTERACTIVE):
+                all_plants_data = await self.plants_service.async_get_realtime_data(
+                    [self.plant_id], measure_points=measure_points
+                )
+
+            if self.plant_id not in all_plants_data:
+                return {}
+            started = time.perf_counter()
+            data = parse_points(all_plants_data[self.plant_id], self.point_selection)
+            self.stats.async_record_parse(REALTIME_ENDPOINT, time.perf_counter() - started)
+            return data
+        except Exception as err:
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the entities whose point changed since the last update.
+
+        Sensors subscribe with their point code as context. Listeners without a
+        context, and every listener when availability changes, are always notified.
+        """
+        previous, self._notified_data = self._notified_data, self.data
+        availability_changed = self.last_update_success != self._notified_success
+        self._notified_success = self.last_update_success
+
+        if previous is None or self.data is None or availability_changed:
+            self.stats.async_record_writes(self.name, len(self._listeners))
+            super().async_update_listeners()
+            return
+
+        written = 0
+        for update_callback, point_code in list(self._listeners.values()):
+            if point_code is None or previous.get(point_code) != self.data.get(point_code):
+                update_callback()
+                written += 1
+        self.stats.async_record_writes(self.name, written)
+
+    @callback
+    def async_set_account_error(self, err: Exception | None) -> None:
+        """Mark the plant unavailable after a failed account-level update.
+
+        The account coordinator already logged the failure, so unlike
+        async_set_update_error this does not log once per plant.
+        """
+        self.last_exception = err
+        if self.last_update_success:
+            self.last_update_success = False
+            self.async_update_listeners()
+
+    @callback
+    def async_set_location(self, latitude: float | None, longitude: float | None) -> None:
+        """Set the plant's coordinates, used to work out when it is generating."""
+        self.latitude = latitude
+        self.longitude = longitude
+        self.__dict__.pop("_astral_location", None)
+
+    @cached_property
+    def _astral_location(self):
+        """Return the astral location and elevation used for sun calculations."""
+        if self.latitude is None or self.longitude is None:
+            return get_astral_location(self.hass)
+        return Location(LocationInfo("", "", "UTC", self.latitude, self.longitude)), 0
+
+    def _sun_is_up(self, utc_point_in_time: datetime) -> bool:
+        """Return True if the sun is up over the plant at the given time."""
+        location, elevation = self._astral_location
+        next_sunrise = get_location_astral_event_next(location, elevation, "sunrise", utc_point_in_time)
+        next_sunset = get_location_astral_event_next(location, elevation, "sunset", utc_point_in_time)
+        return next_sunrise > next_sunset
+
+    @property
+    def has_battery(self) -> bool:
+        """Return True if the plant reports battery points with values."""
+        return any(
+            keyword in point_code
+            for point_code, point in (self.data or {}).items()
+            if point.value is not None
+            for keyword in BATTERY_POINT_KEYWORDS
+        )
+
+    @callback
+    def async_observe_poll(self, data: dict[str, PointValue], now: datetime) -> None:
+        """Learn when iSolarCloud updates the plant from the data seen by a scheduled poll.
+
+        The realtime payload carries no timestamps, so an update is only known to
+        have landed between the last poll that saw the old values and the first
+        poll that saw new ones. Intersecting those windows across update cycles
+        narrows down the upstream phase.
+        """
+        previous, self._last_poll = self._last_poll, (now, data)
+        if previous is None:
+            return
+        polled_at, previous_data = previous
+        expected = self._expected_update
+
+        if data != previous_data:
+            earliest, latest = polled_at, now
+            if expected is not None and expected[0] < latest and earliest < expected[1]:
+                earliest, latest = max(earliest, expected[0]), min(latest, expected[1])
+            self.health.upstream_updated_at = earliest + (latest - earliest) / 2
+            self._expected_update = (earliest + UPSTREAM_UPDATE_INTERVAL, latest + UPSTREAM_UPDATE_INTERVAL)
+        elif expected is not None:
+            if now > expected[1]:
+                # The update didn't land when expected, so the phase has to be learned again
+                self._expected_update = None
+            elif now > expected[0]:
+                self._expected_update = (now, expected[1])
+
+    def _time_to_expected_update(self, now: datetime) -> timedelta | None:
+        """Return how long until the next poll should look for the expected upstream update."""
+        if (expected := self._expected_update) is None:
+            return None
+        earliest, latest = expected
+        midpoint = earliest + (latest - earliest) / 2
+        if latest - earliest > UPSTREAM_PHASE_TOLERANCE and now < midpoint:
+            # Probe the middle of the window to narrow down the phase
+            return midpoint - now
+        if now < latest + UPSTREAM_UPDATE_DELAY:
+            return latest + UPSTREAM_UPDATE_DELAY - now
+        return None
+
+    @callback
+    def async_get_poll_interval(self, now: datetime) -> timedelta:
+        """Return how long to wait before this plant is polled again.
+
+        Plants are polled quickly from DAYLIGHT_MARGIN before sunrise until
+        DAYLIGHT_MARGIN after sunset, and back off at night. Plants with a battery
+        are still polled often enough at night to follow its discharge. Once the
+        upstream update phase is known, polls that would otherwise run more often
+        than iSolarCloud updates are instead aligned to land just after each update.
+        """
+        if self._sun_is_up(now - DAYLIGHT_MARGIN) or self._sun_is_up(now + DAYLIGHT_MARGIN):
+            interval = DAY_SCAN_INTERVAL
+        elif self.has_battery:
+            interval = BATTERY_NIGHT_SCAN_INTERVAL
+        else:
+            return NIGHT_SCAN_INTERVAL
+
+        if interval <= UPSTREAM_UPDATE_INTERVAL and (aligned := self._time_to_expected_update(now)) is not None:
+            return aligned
+        return interval
+
+
+class SungrowLocalPlantCoordinator(SungrowPlantCoordinator):
+    """Coordinator for a plant read from its inverter, failing over to iSolarCloud.
+
+    The inverter is polled every LOCAL_SCAN_INTERVAL. When it can't be read, the
+    plant is fetched from iSolarCloud at the cloud poll interval instead, trying
+    the inverter again first on every poll. Cloud points are mapped to the local
+    codes and limited to the points the inverter has, so the same entities are
+    served whichever source answers.
+    """
+
+    def __init__(self, hass, config_entry, local_service, cloud_service, plant_id, plant_name, point_selection=None):
+        """Initialize."""
+        super().__init__(hass, config_entry, local_service, plant_id, plant_name, point_selection)
+        self.cloud_service = cloud_service
+        self.update_interval = LOCAL_SCAN_INTERVAL
+        # The source that served the last update, and how long each source took when it last answered
+        self.source: str | None = None
+        self.latency: dict[str, float] = {}
+        # (time, source switched to, reason) for each failover
+        self.failovers: deque[tuple[datetime, str, str]] = deque(maxlen=FAILOVER_HISTORY)
+
+    async def _async_fetch_data(self):
+        """Fetch data from the inverter, or from iSolarCloud if the inverter can't be read."""
+        measure_points = None
+        if self.point_selection is not None:
+            measure_points = list(self.point_selection.measure_points(self.plants_service.measure_points.values()))
+            if not measure_points:
+                return {}
+
+        started = time.monotonic()
+        try:
+            data = await self.plants_service.async_get_realtime_data([self.plant_id], measure_points=measure_points)
+        except ModbusError as local_err:
+            try:
+                points = await self._async_fetch_cloud(measure_points)
+            except Exception as err:
+                self.update_interval = self.async_get_poll_interval(dt_util.utcnow())
+                raise UpdateFailed(f"Error reading inverter ({local_err}) and iSolarCloud ({err})") from err
+            self._async_record_source(SOURCE_CLOUD, started, str(local_err))
+            self.update_interval = self.async_get_poll_interval(dt_util.utcnow())
+        else:
+            points = data.get(self.plant_id, {})
+            self._async_record_source(SOURCE_LOCAL, started, "Inverter reachable again")
+            self.update_interval = LOCAL_SCAN_INTERVAL
+
+        return parse_points(points, self.point_selection)
+
+    async def _async_fetch_cloud(self, measure_points: list[str] | None) -> dict[str, dict]:
+        """Fetch the plant's points from iSolarCloud, keyed by their local codes."""
+        known_points = set(self.cloud_service.measure_points.values())
+        cloud_codes = {
+            code: cloud_code
+            for code, cloud_code in self.plants_service.cloud_codes.items()
+            if cloud_code in known_points and (measure_points is None or code in measure_points)
+        }
+        if not cloud_codes:
+            return {}
+        self.health.async_record_api_call()
+        async with asyncio.timeout(REQUEST_TIMEOUT):
+            data = await self.cloud_service.async_get_realtime_data(
+                [self.plant_id], measure_points=sorted(cloud_codes.values())
+            )
+        cloud_points = data.get(self.plant_id, {})
+        return {
+            code: {**cloud_points[cloud_code], "code": code}
+            for code, cloud_code in cloud_codes.items()
+            if cloud_code in cloud_points
+        }
+
+    @callback
+    def _async_record_source(self, source: str, started: float, reason: str) -> None:
+        """Record which source served this update and how long it took, logging any failover."""
+        self.latency[source] = time.monotonic() - started
+        if source == SOURCE_LOCAL:
+            # The inverter's registers are live, so its values are as fresh as the read
+            self.health.upstream_updated_at = dt_util.utcnow()
+        _LOGGER.debug("Plant %s served from %s in %.3f seconds", self.plant_id, source, self.latency[source])
+        if source == self.source:
+            return
+        if self.source is not None or source == SOURCE_CLOUD:
+            if source == SOURCE_CLOUD:
+                _LOGGER.warning("Can't read plant %s locally (%s), falling back to iSolarCloud", self.plant_id, reason)
+            else:
+                _LOGGER.info("Reading plant %s locally again", self.plant_id)
+            self.failovers.append((dt_util.utcnow(), source, reason))
+        self.source = source
+
+
+class SungrowDeviceCoordinator(DataUpdateCoordinator):
+    """Coordinator to fetch realtime data for the individual devices of every plant on an account.
+
+    Devices are fetched by type, DEVICE_BATCH_SIZE devices per API call, with
+    the batches sharing one concurrency limit. The data is keyed by ps_key, then
+    point code, and sensors subscribe with (ps_key, point code) as context.
+    """
+
+    def __init__(self, hass, config_entry, devices_service, devices=None):
+        """Initialize."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="Sungrow Devices",
+            update_interval=DEVICE_SCAN_INTERVAL,
+            config_entry=config_entry,
+        )
+        self.devices_service = devices_service
+        # The device type of each device to fetch, by ps_key
+        self.devices: dict[str, int] = dict(devices or {})
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        # The data and availability listeners were last notified of
+        self._notified_data: dict[str, dict[str, PointValue]] | None = None
+        self._notified_success = True
+        self.stats = _async_get_stats(hass, self.config_entry)
+
+    def _batch(self) -> list[tuple[int, list[str]]]:
+        """Split the devices into batches of up to DEVICE_BATCH_SIZE devices of the same type."""
+        groups: dict[int, list[str]] = {}
+        for ps_key, device_type in self.devices.items():
+            groups.setdefault(device_type, []).append(ps_key)
+        return [
+            (device_type, ps_keys[start : start + DEVICE_BATCH_SIZE])
+            for device_type, ps_keys in groups.items()
+            for start in range(0, len(ps_keys), DEVICE_BATCH_SIZE)
+        ]
+
+    async def _async_update_data(self):
+        """Fetch every device's points, DEVICE_BATCH_SIZE devices per API call.
+
+        A failed batch only leaves its own devices without data; the update as a
+        whole fails only if every batch does.
+        """
+        if not (batches := self._batch()):
+            return {}
+        results = await asyncio.gather(
+            *(self._async_fetch(device_type, ps_keys) for device_type, ps_keys in batches),
+            return_exceptions=True,
+        )
+
+        data = {}
+        errors = []
+        for (_, ps_keys), result in zip(batches, results, strict=True):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Error fetching realtime data for devices %s: %s", ps_keys, result)
+                errors.append(result)
+            else:
+                started = time.perf_counter()
+                data.update({ps_key: parse_points(points) for ps_key, points in result.items()})
+                self.stats.async_record_parse(DEVICE_REALTIME_ENDPOINT, time.perf_counter() - started)
+
+        if len(errors) == len(batches):
+            raise UpdateFailed(f"Error communicating with API: {errors[0]}") from errors[0]
+        return data
+
+    async def _async_fetch(self, device_type: int, ps_keys: list[str]):
+        """Fetch realtime data for some devices, bounded by the concurrency limit."""
+        async with self._semaphore, asyncio.timeout(REQUEST_TIMEOUT):
+            return await self.devices_service.async_get_realtime_data(device_type, ps_keys)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the entities whose point changed since the last update.
+
+        Listeners without a context, and every listener when availability
+        changes, are always notified.
+        """
+        previous, self._notified_data = self._notified_data, self.data
+        availability_changed = self.last_update_success != self._notified_success
+        self._notified_success = self.last_update_success
+
+        if previous is None or self.data is None or availability_changed:
+            self.stats.async_record_writes(self.name, len(self._listeners))
+            super().async_update_listeners()
+            return
+
+        written = 0
+        for update_callback, context in list(self._listeners.values()):
+            if context is not None:
+                ps_key, point_code = context
+                if previous.get(ps_key, {}).get(point_code) == self.data.get(ps_key, {}).get(point_code):
+                    continue
+            update_callback()
+            written += 1
+        self.stats.async_record_writes(self.name, written)
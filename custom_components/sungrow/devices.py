@@ -0,0 +1,114 @@
+"""Device-level data for the Sungrow iSolarCloud integration.
+
+pysolarcloud lists a plant's devices but only fetches realtime data for whole
+plants, so Devices fetches the points of individual inverters, energy storage
+systems, batteries and meters from iSolarCloud's device endpoint.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from pysolarcloud import AbstractAuth, PySolarCloudException
+
+from .const import DEVICE_REALTIME_ENDPOINT
+
+_LOGGER = logging.getLogger(__name__)
+
+# The points fetched for each device type, by point ID, with the code they are known by.
+# iSolarCloud only returns the points a device has, so sensors are only created for those
+DEVICE_POINTS: dict[int, dict[str, str]] = {
+    # Inverter
+    1: {
+        "1": "daily_yield",
+        "2": "total_yield",
+        "4": "internal_temperature",
+        "14": "total_dc_power",
+        "18": "phase_a_voltage",
+        "19": "phase_b_voltage",
+        "20": "phase_c_voltage",
+        "24": "total_active_power",
+        "27": "grid_frequency",
+    },
+    # Meter
+    7: {
+        "8018": "meter_active_power",
+    },
+    # Energy storage system (hybrid inverter)
+    14: {
+        "13011": "total_active_power",
+        "13112": "daily_pv_yield",
+        "13126": "battery_charging_power",
+        "13141": "battery_level_soc",
+        "13150": "battery_discharging_power",
+    },
+    # Battery
+    43: {
+        "58601": "battery_voltage",
+        "58602": "battery_current",
+        "58603": "battery_temperature",
+        "58604": "battery_soc",
+    },
+}
+
+
+def device_record(device: dict[str, Any]) -> dict[str, Any]:
+    """Build the catalogue record for a device from the plant's device list."""
+    device_type = device["device_type"]
+    return {
+        "name": device.get("device_name"),
+        # pysolarcloud turns known device types into a DeviceType
+        "type": getattr(device_type, "value", device_type),
+        "model": device.get("device_model_code") or device.get("type_name"),
+        "serial": device.get("device_sn"),
+    }
+
+
+class Devices:
+    """Class to fetch device-level realtime data, in the style of pysolarcloud's Plants."""
+
+    def __init__(self, auth: AbstractAuth, *, lang: str = "_en_US") -> None:
+        """Initialize."""
+        self.auth = auth
+        self.lang = lang
+
+    async def async_get_realtime_data(self, device_type: int, ps_keys: list[str]) -> dict[str, dict[str, Any]]:
+        """Return the latest realtime data from devices of one type, keyed by ps_key then point code.
+
+        Each point is in the same form as pysolarcloud's plant realtime data.
+        """
+        points = DEVICE_POINTS[device_type]
+        res = await self.auth.request(
+            DEVICE_REALTIME_ENDPOINT,
+            {
+                "device_type": device_type,
+                "ps_key_list": ps_keys,
+                "point_id_list": list(points),
+                "is_get_point_dict": "1",
+            },
+            lang=self.lang,
+        )
+        res = await res.json()
+        if "error" in res or res.get("result_code") != "1":
+            _LOGGER.error("Error response from %s: %s", DEVICE_REALTIME_ENDPOINT, res)
+            # PySolarCloudException only takes OAuth-style errors as a dict
+            raise PySolarCloudException(res if "error" in res else f"{res.get('result_code')}: {res.get('result_msg')}")
+
+        point_dict = {str(point["point_id"]): point for point in res["result_data"].get("point_dict") or []}
+        devices = {}
+        for item in res["result_data"]["device_point_list"]:
+            device_point = item["device_point"]
+            devices[device_point["ps_key"]] = {
+                points[point_id]: {
+                    "id": point_id,
+                    "code": points[point_id],
+                    "value": value,
+                    "unit": point_dict.get(point_id, {}).get("point_unit"),
+                    "name": point_dict.get(point_id, {}).get("point_name"),
+                }
+                for key, value in device_point.items()
+                if key[0] == "p" and (point_id := key[1:]) in points
+            }
+        _LOGGER.debug("async_get_realtime_data: %s", devices)
+        return devices
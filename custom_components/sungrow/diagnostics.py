@@ -0,0 +1,32 @@
+"""Diagnostics support for the Sungrow iSolarCloud integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import CONF_APP_KEY, CONF_GATEWAY, GATEWAYS, TO_REDACT
+from .ratelimit import DATA_SCHEDULERS
+from .stats import DATA_STATS
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry, with credentials, tokens and locations redacted."""
+    host = GATEWAYS.get(entry.data.get(CONF_GATEWAY), "https://gateway.isolarcloud.eu")
+    # Only an entry that is set up has a scheduler and stats
+    scheduler = hass.data.get(DATA_SCHEDULERS, {}).get((host, entry.data.get(CONF_APP_KEY)))
+    stats = hass.data.get(DATA_STATS, {}).get(entry.entry_id)
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "entities": len(er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)),
+        "scheduler": scheduler.as_dict() if scheduler is not None else None,
+        "stats": stats.as_dict() if stats is not None else None,
+    }
@@ -0,0 +1,204 @@
+"""Local Modbus TCP data source for the Sungrow iSolarCloud integration.
+
+Sungrow inverters serve their readings as Modbus input registers, on the LAN port
+or through a WiNet-S dongle. ModbusPlants reads them and returns them in the same
+shape as pysolarcloud's Plants, so the coordinators and sensors work unchanged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import struct
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from .const import MODBUS_MAX_GAP, MODBUS_MAX_REGISTERS, MODBUS_PORT, MODBUS_TIMEOUT, MODBUS_UNIT_ID
+
+_LOGGER = logging.getLogger(__name__)
+
+READ_INPUT_REGISTERS = 0x04
+
+REGISTER_COUNTS = {"u16": 1, "s16": 1, "u32": 2, "s32": 2}
+
+
+class ModbusError(Exception):
+    """A Modbus request failed."""
+
+
+@dataclass(frozen=True, slots=True)
+class ModbusRegister:
+    """A measure point held in one or two input registers.
+
+    The raw value is multiplied by scale to get the point in unit. Point codes
+    match iSolarCloud's where the reading is the same, in the same units;
+    cloud_code names the iSolarCloud point where the codes differ.
+    """
+
+    code: str
+    address: int
+    data_type: str
+    scale: float
+    unit: str | None
+    name: str
+    cloud_code: str | None = None
+
+    @property
+    def count(self) -> int:
+        """Return the number of registers the point takes up."""
+        return REGISTER_COUNTS[self.data_type]
+
+    def decode(self, words: list[int]) -> float:
+        """Return the point's value from its registers."""
+        # 32-bit values are sent low word first
+        raw = words[0] if self.count == 1 else words[0] | words[1] << 16
+        if self.data_type.startswith("s") and raw >= 1 << (16 * self.count - 1):
+            raw -= 1 << (16 * self.count)
+        return round(raw * self.scale, 3)
+
+
+# Addresses are the register numbers in Sungrow's protocol documentation, less one
+REGISTERS = (
+    ModbusRegister("daily_yield", 5002, "u16", 100, "Wh", "Daily Yield"),
+    ModbusRegister("total_yield", 5003, "u32", 1000, "Wh", "Total Yield"),
+    ModbusRegister("internal_temperature", 5007, "s16", 0.1, "℃", "Internal Temperature"),
+    ModbusRegister("mppt1_voltage", 5010, "u16", 0.1, "V", "MPPT1 Voltage"),
+    ModbusRegister("mppt1_current", 5011, "u16", 0.1, "A", "MPPT1 Current"),
+    ModbusRegister("mppt2_voltage", 5012, "u16", 0.1, "V", "MPPT2 Voltage"),
+    ModbusRegister("mppt2_current", 5013, "u16", 0.1, "A", "MPPT2 Current"),
+    ModbusRegister("total_dc_power", 5016, "u32", 1, "W", "Total DC Power", "total_active_power_of_pv"),
+    ModbusRegister("phase_a_voltage", 5018, "u16", 0.1, "V", "Phase A Voltage"),
+    ModbusRegister("phase_b_voltage", 5019, "u16", 0.1, "V", "Phase B Voltage"),
+    ModbusRegister("phase_c_voltage", 5020, "u16", 0.1, "V", "Phase C Voltage"),
+    ModbusRegister("inverter_ac_power", 5030, "u32", 1, "W", "Inverter AC Power"),
+    ModbusRegister("grid_frequency", 5035, "u16", 0.1, "Hz", "Grid Frequency"),
+    ModbusRegister("meter_ac_power", 5082, "s32", 1, "W", "Meter AC Power"),
+    ModbusRegister("battery_soc", 13022, "u16", 0.1, "%", "Battery SOC"),
+)
+
+
+def register_ranges(
+    registers: Iterable[ModbusRegister], max_gap: int = MODBUS_MAX_GAP, max_count: int = MODBUS_MAX_REGISTERS
+) -> list[tuple[int, int, list[ModbusRegister]]]:
+    """Group registers into as few (address, count, registers) reads as possible.
+
+    Neighbouring registers share a read if no more than max_gap unused registers
+    lie between them and the read stays within max_count registers.
+    """
+    ranges: list[tuple[int, int, list[ModbusRegister]]] = []
+    for register in sorted(registers, key=lambda register: register.address):
+        end = register.address + register.count
+        if ranges:
+            start, count, group = ranges[-1]
+            if register.address - (start + count) <= max_gap and end - start <= max_count:
+                ranges[-1] = (start, max(count, end - start), [*group, register])
+                continue
+        ranges.append((register.address, register.count, [register]))
+    return ranges
+
+
+class ModbusClient:
+    """Minimal Modbus TCP client, reading input registers over one persistent connection.
+
+    Dongles only handle one request at a time, so requests are sent one after
+    another. The connection is dropped after any error and reopened by the next request.
+    """
+
+    def __init__(self, host: str, port: int = MODBUS_PORT, unit_id: int = MODBUS_UNIT_ID) -> None:
+        """Initialize."""
+        self.host = host
+        self.port = port
+        self.unit_id = unit_id
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+        self._transactions = itertools.count(1)
+
+    async def async_read_input_registers(self, address: int, count: int) -> list[int]:
+        """Read count input registers starting at address."""
+        async with self._lock:
+            transaction = next(self._transactions) & 0xFFFF
+            try:
+                async with asyncio.timeout(MODBUS_TIMEOUT):
+                    if self._writer is None:
+                        _LOGGER.debug("Connecting to %s:%s", self.host, self.port)
+                        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                    self._writer.write(
+                        struct.pack(">HHHBBHH", transaction, 0, 6, self.unit_id, READ_INPUT_REGISTERS, address, count)
+                    )
+                    await self._writer.drain()
+                    reply_transaction, _, length, _ = struct.unpack(">HHHB", await self._reader.readexactly(7))
+                    # The unit ID, function code and a byte count or exception code at least
+                    if length < 3:
+                        await self._async_disconnect()
+                        raise ModbusError(f"Reply to transaction {reply_transaction} is too short, of length {length}")
+                    pdu = await self._reader.readexactly(length - 1)
+            except (OSError, TimeoutError, asyncio.IncompleteReadError) as err:
+                await self._async_disconnect()
+                raise ModbusError(f"Error reading registers {address}-{address + count - 1}: {err!r}") from err
+
+            if reply_transaction != transaction:
+                # A late reply to an abandoned request; start again on a fresh connection
+                await self._async_disconnect()
+                raise ModbusError(f"Unexpected reply to transaction {reply_transaction}")
+
+            if pdu[0] & 0x80:
+                raise ModbusError(f"Registers {address}-{address + count - 1} rejected with exception code {pdu[1]}")
+            if pdu[1] != 2 * count or len(pdu) != 2 + 2 * count:
+                # A garbled reply; the connection can't be trusted to be in step with the inverter
+                await self._async_disconnect()
+                raise ModbusError(f"Expected {count} registers, got {len(pdu) - 2} bytes claiming {pdu[1] // 2}")
+        return list(struct.unpack(f">{count}H", pdu[2:]))
+
+    async def _async_disconnect(self) -> None:
+        """Close the connection."""
+        if (writer := self._writer) is None:
+            return
+        self._reader = self._writer = None
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+
+    async def async_close(self) -> None:
+        """Close the connection once any request in flight is done."""
+        async with self._lock:
+            await self._async_disconnect()
+
+
+class ModbusPlants:
+    """Local stand-in for pysolarcloud's Plants, serving one plant from its inverter's registers."""
+
+    def __init__(self, client: ModbusClient, plant_id: str, registers: tuple[ModbusRegister, ...] = REGISTERS) -> None:
+        """Initialize."""
+        self.client = client
+        self.plant_id = plant_id
+        self.registers = registers
+        self.measure_points = {str(register.address): register.code for register in registers}
+        # The iSolarCloud point with the same reading as each local point
+        self.cloud_codes = {register.code: register.cloud_code or register.code for register in registers}
+
+    async def async_get_realtime_data(
+        self, plant_ids: list[str], *, measure_points: list[str] | None = None
+    ) -> dict[str, dict[str, dict[str, Any]]]:
+        """Return the plant's points, reading each range of neighbouring registers in one request."""
+        if self.plant_id not in plant_ids:
+            return {}
+        registers = self.registers
+        if measure_points is not None:
+            registers = tuple(register for register in registers if register.code in measure_points)
+
+        points = {}
+        for address, count, group in register_ranges(registers):
+            words = await self.client.async_read_input_registers(address, count)
+            for register in group:
+                offset = register.address - address
+                points[register.code] = {
+                    "code": register.code,
+                    "value": register.decode(words[offset : offset + register.count]),
+                    "unit": register.unit,
+                    "name": register.name,
+                }
+        return {self.plant_id: points}
@@ -0,0 +1,116 @@
+"""Data models for the Sungrow iSolarCloud integration."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    CONF_EXCLUDE_POINTS,
+    CONF_INCLUDE_POINTS,
+    CONF_POINT_GROUPS,
+    CONF_POINTS,
+    DEFAULT_POINT_TIER,
+    POINT_GROUPS,
+    POINT_TIERS,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PointValue:
+    """A measure point's reading, parsed once when it is fetched.
+
+    Numeric readings are in value; anything else (e.g. "Running") is in status.
+    attributes holds the point's data as iSolarCloud returned it.
+    """
+
+    value: float | None
+    status: str | None
+    unit: str | None
+    name: str | None
+    attributes: dict[str, Any]
+
+    @property
+    def native_value(self) -> float | str | None:
+        """Return the reading as a sensor state."""
+        return self.status if self.value is None else self.value
+
+
+def parse_point(point_data: dict[str, Any]) -> PointValue:
+    """Parse a point from the realtime API data."""
+    raw = point_data.get("value")
+    value = None
+    status = None
+    # Values often come back as numeric strings
+    try:
+        value = float(raw)
+    except (ValueError, TypeError):
+        if raw is not None and str(raw).strip():
+            status = str(raw)
+    return PointValue(value, status, point_data.get("unit"), point_data.get("name"), point_data)
+
+
+def parse_points(points: dict[str, dict[str, Any]], selection: PointSelection | None = None) -> dict[str, PointValue]:
+    """Parse a plant's realtime API data, keyed by point code, skipping points that aren't selected."""
+    return {
+        point_code: parse_point(point_data)
+        for point_code, point_data in points.items()
+        if selection is None or selection.allows(point_code)
+    }
+
+
+def point_in_group(point_code: str, group: str) -> bool:
+    """Return True if a point belongs to one of the POINT_GROUPS."""
+    return not POINT_GROUPS.get(group, frozenset()).isdisjoint(point_code.split("_"))
+
+
+def point_tier(point_code: str) -> str:
+    """Return the polling tier of a point."""
+    words = point_code.split("_")
+    for tier, keywords in POINT_TIERS:
+        if not keywords.isdisjoint(words):
+            return tier
+    return DEFAULT_POINT_TIER
+
+
+@dataclass(frozen=True, slots=True)
+class PointSelection:
+    """The points chosen for a plant in the options.
+
+    A point is selected if it is in one of the groups or the allowlist (or
+    neither is set), and isn't in the denylist.
+    """
+
+    groups: frozenset[str] = frozenset()
+    include: frozenset[str] = frozenset()
+    exclude: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_options(cls, plant_options: Mapping[str, Any]) -> PointSelection:
+        """Create the selection from a plant's options."""
+        return cls(
+            frozenset(plant_options.get(CONF_POINT_GROUPS, ())),
+            frozenset(plant_options.get(CONF_INCLUDE_POINTS, ())),
+            frozenset(plant_options.get(CONF_EXCLUDE_POINTS, ())),
+        )
+
+    def allows(self, point_code: str) -> bool:
+        """Return True if the point is selected."""
+        if point_code in self.exclude:
+            return False
+        if not self.groups and not self.include:
+            return True
+        return point_code in self.include or any(point_in_group(point_code, group) for group in self.groups)
+
+    def measure_points(self, known_points: Iterable[str]) -> tuple[str, ...]:
+        """Return the codes of the known points that are selected, to request only those."""
+        return tuple(sorted(point_code for point_code in known_points if self.allows(point_code)))
+
+
+def point_selections(options: Mapping[str, Any]) -> dict[str, PointSelection]:
+    """Return the point selection for each plant that has one in the options."""
+    return {
+        plant_id: PointSelection.from_options(plant_options)
+        for plant_id, plant_options in options.get(CONF_POINTS, {}).items()
+    }
@@ -0,0 +1,200 @@
+"""Gateway probing for the Sungrow iSolarCloud integration.
+
+An account can often be reached through more than one iSolarCloud gateway, with
+very different round-trip times. Probing a gateway times a TLS handshake with it
+and an API request to it, and checks that it accepts the entry's credentials.
+GatewayFailover re-probes an entry's gateways periodically, and moves the entry
+to the fastest working one if its own stops working.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from aiohttp import ClientError, ClientSession
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import ssl as ssl_util
+from yarl import URL
+
+from .const import CONF_APP_KEY, CONF_APP_SECRET, CONF_GATEWAY, GATEWAY_PROBE_INTERVAL, GATEWAY_PROBE_TIMEOUT, GATEWAYS
+from .session import async_get_session
+
+_LOGGER = logging.getLogger(__name__)
+
+TOKEN_PATH = "/openapi/apiManage/token"
+PLANT_LIST_PATH = "/openapi/platform/queryPowerStationList"
+
+
+@dataclass(slots=True, frozen=True)
+class GatewayProbe:
+    """How one gateway answered a probe."""
+
+    gateway: str
+    handshake_seconds: float | None = None
+    api_seconds: float | None = None
+    works: bool = False
+    error: str | None = None
+
+    @property
+    def latency(self) -> float:
+        """Return the handshake and API request time together, or infinity if either is unknown."""
+        if self.handshake_seconds is None or self.api_seconds is None:
+            return math.inf
+        return self.handshake_seconds + self.api_seconds
+
+
+def fastest(probes: list[GatewayProbe]) -> GatewayProbe | None:
+    """Return the working gateway with the lowest latency, if any gateway works."""
+    return min((probe for probe in probes if probe.works), key=lambda probe: probe.latency, default=None)
+
+
+def _rejects_app_key(payload: Any) -> bool:
+    """Return True if a token endpoint response says the app key is unknown to the gateway.
+
+    A gateway answers a made-up authorization code with an error either way, so
+    only an error that names the app key counts against it.
+    """
+    if not isinstance(payload, dict):
+        return True
+    message = " ".join(str(payload.get(key, "")) for key in ("error", "error_description", "result_msg")).lower()
+    return "appkey" in message.replace("_", "").replace(" ", "")
+
+
+async def _async_handshake(host: str) -> float:
+    """Return the seconds taken to open a connection to host, including its TLS handshake."""
+    url = URL(host)
+    ssl_context = ssl_util.get_default_context() if url.scheme == "https" else None
+    started = time.perf_counter()
+    _, writer = await asyncio.open_connection(url.host, url.port, ssl=ssl_context)
+    seconds = time.perf_counter() - started
+    writer.close()
+    with contextlib.suppress(OSError):
+        await writer.wait_closed()
+    return seconds
+
+
+async def _async_request(
+    session: ClientSession, host: str, appkey: str, access_key: str, access_token: str | None
+) -> tuple[float, str | None]:
+    """Return the seconds taken by an API request to host, and why host didn't accept the credentials if it didn't.
+
+    With an access token the gateway must list the account's plants; without
+    one, it must recognise the app key when asked for tokens.
+    """
+    headers = {"x-access-key": access_key}
+    if access_token is None:
+        path = TOKEN_PATH
+        body: dict[str, Any] = {
+            "appkey": appkey,
+            "code": "probe",
+            "grant_type": "authorization_code",
+            "redirect_uri": "",
+        }
+    else:
+        path = PLANT_LIST_PATH
+        body = {"appkey": appkey, "page": 1, "size": 1}
+        headers["Authorization"] = f"Bearer {access_token}"
+
+    started = time.perf_counter()
+    async with session.post(f"{host}{path}", json=body, headers=headers) as response:
+        payload = await response.json(content_type=None) if response.status == 200 else None
+    seconds = time.perf_counter() - started
+
+    if response.status != 200:
+        return seconds, f"HTTP {response.status}"
+    if access_token is None:
+        works = not _rejects_app_key(payload)
+    else:
+        works = isinstance(payload, dict) and payload.get("result_code") == "1"
+    return seconds, None if works else "rejected the credentials"
+
+
+async def async_probe_gateway(
+    session: ClientSession, gateway: str, appkey: str, access_key: str, access_token: str | None = None
+) -> GatewayProbe:
+    """Probe one gateway, giving it GATEWAY_PROBE_TIMEOUT seconds to answer."""
+    host = GATEWAYS[gateway]
+    try:
+        async with asyncio.timeout(GATEWAY_PROBE_TIMEOUT):
+            handshake_seconds = await _async_handshake(host)
+            api_seconds, error = await _async_request(session, host, appkey, access_key, access_token)
+    except TimeoutError:
+        return GatewayProbe(gateway, error="timed out")
+    except (ClientError, OSError, ValueError) as err:
+        return GatewayProbe(gateway, error=str(err) or type(err).__name__)
+    return GatewayProbe(gateway, handshake_seconds, api_seconds, error is None, error)
+
+
+async def async_probe_gateways(
+    hass: HomeAssistant, user: str, appkey: str, access_key: str, access_token: str | None = None
+) -> list[GatewayProbe]:
+    """Probe every gateway at once, through the gateways' sessions held for user."""
+    return list(
+        await asyncio.gather(
+            *(
+                async_probe_gateway(async_get_session(hass, host, user), gateway, appkey, access_key, access_token)
+                for gateway, host in GATEWAYS.items()
+            )
+        )
+    )
+
+
+class GatewayFailover:
+    """Re-probes a config entry's gateways every GATEWAY_PROBE_INTERVAL.
+
+    Nothing changes while the entry's gateway works. Once it doesn't, the entry
+    is moved to the fastest gateway that does, and reloaded.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, auth: Any) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.entry = entry
+        self.auth = auth
+
+    @callback
+    def async_start(self) -> None:
+        """Re-probe every GATEWAY_PROBE_INTERVAL until the entry is unloaded."""
+
+        @callback
+        def _async_reprobe(_now) -> None:
+            self.entry.async_create_background_task(
+                self.hass, self.async_reprobe(), name=f"Sungrow gateway probe {self.entry.entry_id}"
+            )
+
+        self.entry.async_on_unload(async_track_time_interval(self.hass, _async_reprobe, GATEWAY_PROBE_INTERVAL))
+
+    async def async_reprobe(self) -> str | None:
+        """Probe the gateways, returning the gateway the entry was moved to, if it was."""
+        current = self.entry.data[CONF_GATEWAY]
+        try:
+            access_token = await self.auth.async_get_access_token()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Not probing iSolarCloud gateways without an access token: %s", err)
+            return None
+
+        probes = await async_probe_gateways(
+            self.hass,
+            self.entry.entry_id,
+            self.entry.data[CONF_APP_KEY],
+            self.entry.data[CONF_APP_SECRET],
+            access_token,
+        )
+        if any(probe.gateway == current and probe.works for probe in probes):
+            return None
+        if (best := fastest(probes)) is None:
+            _LOGGER.warning("No iSolarCloud gateway is working, staying on %s", current)
+            return None
+
+        _LOGGER.warning("iSolarCloud gateway %s is not working, moving to %s", current, best.gateway)
+        self.hass.config_entries.async_update_entry(self.entry, data={**self.entry.data, CONF_GATEWAY: best.gateway})
+        self.hass.config_entries.async_schedule_reload(self.entry.entry_id)
+        return best.gateway
@@ -0,0 +1,160 @@
+"""Shared request scheduling for the Sungrow iSolarCloud integration.
+
+iSolarCloud throttles per app key, so every request an app key makes to a gateway,
+from every config entry and coordinator, goes through one GatewayScheduler.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, RATE_LIMIT_BACKOFF, RATE_LIMIT_MAX_BACKOFF, REQUEST_BURST, REQUEST_RATE
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SCHEDULERS = f"{DOMAIN}_schedulers"
+
+
+class RequestPriority(IntEnum):
+    """Order in which queued requests are sent; lower values go first."""
+
+    AUTH = 0
+    INTERACTIVE = 1
+    POLL = 2
+    BACKGROUND = 3
+
+
+# The priority of requests made from the current task; inherited by tasks it creates
+_REQUEST_PRIORITY: ContextVar[RequestPriority] = ContextVar("sungrow_request_priority", default=RequestPriority.POLL)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """Send the requests made inside the block at the given priority."""
+    token = _REQUEST_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _REQUEST_PRIORITY.reset(token)
+
+
+def current_priority() -> RequestPriority:
+    """Return the priority requests made from the current task are sent at."""
+    return _REQUEST_PRIORITY.get()
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant, host: str, appkey: str) -> GatewayScheduler:
+    """Return the scheduler shared by every request an app key makes to a gateway."""
+    schedulers: dict[tuple[str, str], GatewayScheduler] = hass.data.setdefault(DATA_SCHEDULERS, {})
+    if (scheduler := schedulers.get((host, appkey))) is None:
+        scheduler = schedulers[(host, appkey)] = GatewayScheduler(hass)
+    return scheduler
+
+
+class GatewayScheduler:
+    """Token bucket with a priority queue and exponential backoff for one gateway and app key.
+
+    Requests wait in priority order for a token; tokens refill at REQUEST_RATE per
+    second up to REQUEST_BURST. When the gateway throttles a request, nothing is sent
+    until the backoff (or the gateway's Retry-After, if longer) has passed.
+    """
+
+    def __init__(self, hass: HomeAssistant, rate: float = REQUEST_RATE, burst: int = REQUEST_BURST) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.rate = rate
+        self.burst = burst
+        self.throttled_count = 0
+        self._tokens = float(burst)
+        self._refilled_at = hass.loop.time()
+        self._blocked_until = 0.0
+        self._backoff_failures = 0
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    @property
+    def queued(self) -> int:
+        """Return the number of requests waiting to be sent."""
+        return sum(1 for _, _, future in self._queue if not future.done())
+
+    def as_dict(self) -> dict[str, float | int]:
+        """Return the throttling and backoff state for diagnostics."""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 2),
+            "queued": self.queued,
+            "throttled_count": self.throttled_count,
+            "consecutive_backoffs": self._backoff_failures,
+            "backoff_remaining_seconds": round(max(self._blocked_until - self.hass.loop.time(), 0), 2),
+        }
+
+    async def async_acquire(self, priority: RequestPriority | None = None) -> None:
+        """Wait until a request may be sent."""
+        if priority is None:
+            priority = current_priority()
+        future: asyncio.Future[None] = self.hass.loop.create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future))
+        self._async_dispatch()
+        await future
+
+    @callback
+    def async_record_success(self) -> None:
+        """Reset the backoff after the gateway accepts a request."""
+        self._backoff_failures = 0
+
+    @callback
+    def async_record_throttled(self, retry_after: float | None = None) -> None:
+        """Hold back every request after the gateway throttles one."""
+        self.throttled_count += 1
+        backoff = min(RATE_LIMIT_BACKOFF * 2**self._backoff_failures, RATE_LIMIT_MAX_BACKOFF)
+        self._backoff_failures += 1
+        # Jitter spreads out the retries of entries that were throttled together
+        delay = max(random.uniform(backoff / 2, backoff), retry_after or 0)
+        _LOGGER.warning("iSolarCloud is throttling requests, backing off for %.1f seconds", delay)
+
+        now = self.hass.loop.time()
+        self._blocked_until = max(self._blocked_until, now + delay)
+        self._tokens = 0
+        self._refilled_at = now
+        self._async_dispatch()
+
+    @callback
+    def _async_dispatch(self) -> None:
+        """Release queued requests in priority order while tokens allow, then wait for the next."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        now = self.hass.loop.time()
+        if now >= self._blocked_until:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+        while self._queue:
+            if self._queue[0][2].done():
+                # The waiter was cancelled
+                heapq.heappop(self._queue)
+                continue
+            if now < self._blocked_until:
+                delay = self._blocked_until - now
+            elif self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+            else:
+                self._tokens -= 1
+                heapq.heappop(self._queue)[2].set_result(None)
+                continue
+            self._wakeup = self.hass.loop.call_later(delay, self._async_dispatch)
+            return
@@ -1,35 +1,121 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import timedelta
-
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
-from pysolarcloud import Auth
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 from pysolarcloud.plants import Plants
 
+from .auth import SungrowAuth
+from .catalogue import SungrowCatalogue, plant_location
 from .const import (
-    CONF_APP_ID,
-    CONF_APP_KEY,
-    CONF_APP_SECRET,
     CONF_GATEWAY,
+    CONF_HOST,
+    CONF_LOCAL,
+    CONF_MINIMAL_ATTRIBUTES,
+    CONF_PORT,
+    CONF_PROBE_GATEWAYS,
+    DISCOVERY_RETRY,
+    DISCOVERY_RETRY_MAX,
+    DISCOVERY_TIMEOUT,
     DOMAIN,
     GATEWAYS,
+    MODBUS_PORT,
+    SOURCE_CLOUD,
+    SOURCE_LOCAL,
 )
+from .coordinator import (
+    SungrowAccountCoordinator,
+    SungrowDeviceCoordinator,
+    SungrowLocalPlantCoordinator,
+    SungrowPlantCoordinator,
+)
+from .devices import DEVICE_POINTS, Devices, device_record
+from .modbus import ModbusClient, ModbusPlants
+from .models import PointSelection, point_selections
+from .probe import GatewayFailover
+from .ratelimit import RequestPriority, request_priority
+from .session import async_get_session
+from .singleflight import SingleFlightPlants, async_get_flights
+from .stats import PlantHealth
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(minutes=5)
+# Key of the data source sensor of local plants, in place of a point code
+DATA_SOURCE_KEY = "data_source"
+
+
+@dataclass(frozen=True, kw_only=True)
+class SungrowHealthSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor of how a plant's updates have been going."""
+
+    value_fn: Callable[[PlantHealth, datetime], datetime | float | int | None]
+
+
+# Diagnostic sensors of each plant, keyed in place of a point code
+HEALTH_SENSORS = (
+    SungrowHealthSensorEntityDescription(
+        key="last_update",
+        name="Last successful update",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda health, now: health.last_success,
+    ),
+    SungrowHealthSensorEntityDescription(
+        key="fetch_duration",
+        name="Last fetch duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=2,
+        value_fn=lambda health, now: health.last_duration,
+    ),
+    SungrowHealthSensorEntityDescription(
+        key="consecutive_failures",
+        name="Consecutive failures",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda health, now: health.consecutive_failures,
+    ),
+    SungrowHealthSensorEntityDescription(
+        key="data_age",
+        name="Data age",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=0,
+        value_fn=lambda health, now: health.data_age(now),
+    ),
+    SungrowHealthSensorEntityDescription(
+        key="api_calls",
+        name="API calls in the last hour",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda health, now: health.api_calls(now),
+    ),
+)
+HEALTH_KEYS = frozenset(description.key for description in HEALTH_SENSORS)
+
+STATE_CLASSES = {
+    SensorDeviceClass.POWER: SensorStateClass.MEASUREMENT,
+    SensorDeviceClass.ENERGY: SensorStateClass.TOTAL_INCREASING,
+}
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
@@ -39,84 +125,290 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     gateway_key = entry.data[CONF_GATEWAY]
     host = GATEWAYS.get(gateway_key, "https://gateway.isolarcloud.eu")  # Fallback to EU if mapping fails
 
-    # Reconstruct Auth
-    session = async_get_clientsession(hass)
-    auth = Auth(
-        host=host,
-        appkey=entry.data[CONF_APP_KEY],
-        access_key=entry.data[CONF_APP_SECRET],
-        app_id=entry.data[CONF_APP_ID],
-        websession=session,
-    )
-
     # Restore tokens
-    if "tokens" in entry.data:
-        auth.tokens = entry.data["tokens"]
-    else:
+    if "tokens" not in entry.data:
         _LOGGER.error("No tokens found in config entry")
         return
 
-    plants_service = Plants(auth)
-
-    # Fetch plants
-    try:
-        plant_list = await plants_service.async_get_plants()
-    except Exception as err:
-        _LOGGER.error("Failed to fetch plants: %s", err)
-        return
-
-    entities = []
+    # Reconstruct Auth; it keeps the tokens fresh and writes them back to the entry
+    session = async_get_session(hass, host, entry.entry_id)
+    auth = SungrowAuth(hass, entry, session, host)
+    auth.async_schedule_refresh()
+    entry.async_on_unload(auth.async_cancel_refresh)
+
+    # Entries whose gateway was chosen by probing move to another if it stops working
+    if entry.data.get(CONF_PROBE_GATEWAYS):
+        GatewayFailover(hass, entry, auth).async_start()
+
+    # Identical plant list and realtime calls, e.g. from a refresh and a reload, share one request
+    plants_service = SingleFlightPlants(Plants(auth), async_get_flights(hass, entry.entry_id))
+    devices_service = Devices(auth)
+
+    # The catalogue lets entities be created at startup without waiting for the cloud
+    catalogue = SungrowCatalogue(hass, entry.entry_id)
+    await catalogue.async_load()
+
+    # Plants with a local host in the options are read from their inverter over Modbus TCP
+    local_plants: dict[str, dict] = entry.options.get(CONF_LOCAL, {})
+
+    # Points deselected in the options are never requested, and their entities are removed
+    selections = point_selections(entry.options)
+    _async_remove_deselected_entities(hass, entry, selections, local_plants)
+
+    # One coordinator polls every cloud plant in batched requests and hands each
+    # plant coordinator its slice, so API calls per cycle don't grow with the fleet
+    account_coordinator = SungrowAccountCoordinator(
+        hass,
+        entry,
+        plants_service,
+        [plant_id for plant_id in catalogue.plants if plant_id not in local_plants],
+        selections,
+    )
+    plant_coordinators: dict[str, SungrowPlantCoordinator] = {}
+    # Inverters, batteries and meters are polled by type, in batches across every plant
+    device_coordinator = SungrowDeviceCoordinator(hass, entry, devices_service, _catalogued_devices(catalogue))
+    minimal_attributes = entry.options.get(CONF_MINIMAL_ATTRIBUTES, False)
 
-    for plant_info in plant_list:
-        plant_id = str(plant_info["ps_id"])
-        plant_name = plant_info["ps_name"]
+    @callback
+    def _async_get_plant_coordinator(plant_id: str, plant_name: str) -> SungrowPlantCoordinator:
+        """Return the plant's coordinator, creating it on first use."""
+        if (coordinator := plant_coordinators.get(plant_id)) is not None:
+            return coordinator
 
         _LOGGER.debug(f"Setting up plant: {plant_name} ({plant_id})")
+        selection = selections.get(plant_id)
+        if (local := local_plants.get(plant_id)) is not None:
+            client = ModbusClient(local[CONF_HOST], local.get(CONF_PORT, MODBUS_PORT))
+            entry.async_on_unload(client.async_close)
+            # Local plants poll themselves, failing over to iSolarCloud when the inverter can't be read
+            coordinator = SungrowLocalPlantCoordinator(
+                hass, entry, ModbusPlants(client, plant_id), plants_service, plant_id, plant_name, selection
+            )
+            async_add_entities([SungrowDataSourceSensor(coordinator, plant_id, plant_name)])
+        else:
+            coordinator = SungrowPlantCoordinator(hass, entry, plants_service, plant_id, plant_name, selection)
+            entry.async_on_unload(account_coordinator.async_add_plant(coordinator))
+        async_add_entities(
+            SungrowHealthSensor(coordinator, description, plant_id, plant_name) for description in HEALTH_SENSORS
+        )
+        if plant_id in catalogue.plants and (location := catalogue.plants[plant_id].get("location")):
+            coordinator.async_set_location(*location)
+        plant_coordinators[plant_id] = coordinator
+        return coordinator
+
+    @callback
+    def _async_add_sensors(plant_id: str, plant_name: str, points: dict[str, dict]) -> None:
+        """Create sensors for catalogue points, attaching the plant's coordinator on first use."""
+        if (selection := selections.get(plant_id)) is not None:
+            points = {point_code: info for point_code, info in points.items() if selection.allows(point_code)}
+            if not points:
+                return
+
+        coordinator = _async_get_plant_coordinator(plant_id, plant_name)
+        async_add_entities(
+            SungrowSensor(coordinator, point_code, plant_id, plant_name, point_info, entry.entry_id, minimal_attributes)
+            for point_code, point_info in points.items()
+        )
 
-        coordinator = SungrowPlantCoordinator(hass, entry, plants_service, plant_id, plant_name)
+    @callback
+    def _async_add_device_sensors(plant_id: str, ps_key: str, device: dict, points: dict[str, dict]) -> None:
+        """Create sensors for the catalogue points of one of a plant's devices."""
+        async_add_entities(
+            SungrowDeviceSensor(
+                device_coordinator, point_code, plant_id, ps_key, device, point_info, entry.entry_id, minimal_attributes
+            )
+            for point_code, point_info in points.items()
+        )
 
-        # Determine available sensors by doing a first refresh
-        await coordinator.async_config_entry_first_refresh()
+    async def _async_sync_devices(plant_ids: list[str]) -> None:
+        """Discover the devices of catalogued plants, adding sensors for new devices and points."""
+        for plant_id in plant_ids:
+            if plant_id not in catalogue.plants:
+                continue
+            try:
+                device_list = await plants_service.async_get_plant_devices(plant_id, device_types=list(DEVICE_POINTS))
+            except Exception as err:
+                # Keep serving the catalogued devices
+                _LOGGER.warning("Failed to fetch devices of plant %s: %s", plant_id, err)
+                continue
+            devices = {str(device["ps_key"]): device_record(device) for device in device_list}
+            catalogue.async_update_devices(
+                plant_id, {ps_key: device for ps_key, device in devices.items() if device["type"] in DEVICE_POINTS}
+            )
+
+        device_coordinator.devices = _catalogued_devices(catalogue)
+        await device_coordinator.async_refresh()
+        if not device_coordinator.last_update_success:
+            return
+
+        for plant_id, plant in catalogue.plants.items():
+            for ps_key, device in plant.get("devices", {}).items():
+                points = device_coordinator.data.get(ps_key)
+                if points and (new_points := catalogue.async_update_device(plant_id, ps_key, points)):
+                    _async_add_device_sensors(plant_id, ps_key, device, new_points)
+
+    async def _async_sync_catalogue(first_refresh: bool) -> bool:
+        """Reconcile the catalogue with the cloud, adding sensors for new plants and points.
+
+        Returns False if the plant list couldn't be fetched, or no plant on it had data.
+        """
+        try:
+            with request_priority(RequestPriority.INTERACTIVE):
+                plant_list = await plants_service.async_get_plants()
+        except Exception as err:
+            _LOGGER.error("Failed to fetch plants: %s", err)
+            if not first_refresh:
+                # Keep serving the catalogued plants
+                await account_coordinator.async_refresh()
+            return False
+
+        plants = {str(plant_info["ps_id"]): plant_info for plant_info in plant_list}
+        for plant_id in set(catalogue.plants) - set(plants):
+            _LOGGER.info("Plant %s is no longer on the account", plant_id)
+            catalogue.async_remove_plant(plant_id)
+        account_coordinator.plant_ids = [plant_id for plant_id in plants if plant_id not in local_plants]
+
+        await account_coordinator.async_refresh()
+        if not account_coordinator.last_update_success:
+            return False
+
+        @callback
+        def _async_add_plant(plant_id: str, plant_info: dict, points: dict | None) -> bool:
+            """Catalogue a plant's points, adding sensors for the new ones; returns False if it had no data."""
+            plant_name = plant_info["ps_name"]
+            if not points:
+                _LOGGER.warning(f"No data received for plant {plant_name}")
+                return False
+
+            location = plant_location(plant_info)
+            if (coordinator := plant_coordinators.get(plant_id)) is not None and location:
+                coordinator.async_set_location(*location)
+
+            if new_points := catalogue.async_update_plant(plant_id, plant_name, points, location):
+                _async_add_sensors(plant_id, plant_name, new_points)
+            return True
+
+        async def _async_add_local_plant(plant_id: str, plant_info: dict) -> bool:
+            """Read a local plant, then add it as soon as its data arrives."""
+            local_coordinator = _async_get_plant_coordinator(plant_id, plant_info["ps_name"])
+            await local_coordinator.async_refresh()
+            return _async_add_plant(plant_id, plant_info, local_coordinator.data)
+
+        # The data structure is { "P_CODE": PointValue(...) }. Cloud plants arrive together with
+        # the account's batched refresh; local plants are read at once, each added when it answers
+        added = [
+            _async_add_plant(plant_id, plant_info, account_coordinator.data.get(plant_id))
+            for plant_id, plant_info in plants.items()
+            if plant_id not in local_plants
+        ]
+        added += await asyncio.gather(
+            *(
+                _async_add_local_plant(plant_id, plant_info)
+                for plant_id, plant_info in plants.items()
+                if plant_id in local_plants
+            )
+        )
 
-        if not coordinator.data:
-            _LOGGER.warning(f"No data received for plant {plant_name}")
-            continue
+        await _async_sync_devices(list(plants))
+        return any(added) or not plants
 
-        # Create a sensor for each data point returned by the API
-        # The data structure is { "P_CODE": { "code": "...", "value": ..., "unit": "...", "name": "..." } }
-        for point_code, point_data in coordinator.data.items():
-            entities.append(SungrowSensor(coordinator, point_code, plant_id, plant_name, point_data, entry.entry_id))
+    # Cancels the pending discovery retry, if there is one
+    cancel_retry: CALLBACK_TYPE | None = None
 
-    async_add_entities(entities)
+    @callback
+    def _async_cancel_retry() -> None:
+        nonlocal cancel_retry
+        if cancel_retry is not None:
+            cancel_retry()
+            cancel_retry = None
 
+    async def _async_discover(attempt: int = 0) -> None:
+        """Discover the account's plants for an empty catalogue, retrying with backoff until it works."""
+        nonlocal cancel_retry
+        # A failed attempt leaves the plants scheduled for later, but discovery needs their data now
+        account_coordinator.async_reset_schedule()
+        try:
+            async with asyncio.timeout(DISCOVERY_TIMEOUT):
+                if await _async_sync_catalogue(first_refresh=True):
+                    return
+        except TimeoutError:
+            _LOGGER.warning("Discovering plants timed out after %s seconds", DISCOVERY_TIMEOUT)
+
+        delay = min(DISCOVERY_RETRY * 2**attempt, DISCOVERY_RETRY_MAX)
+        _LOGGER.info("Retrying plant discovery in %s", delay)
+
+        @callback
+        def _async_retry(_now) -> None:
+            nonlocal cancel_retry
+            cancel_retry = None
+            entry.async_create_background_task(
+                hass, _async_discover(attempt + 1), name=f"Sungrow plant discovery {entry.title}"
+            )
+
+        cancel_retry = async_call_later(hass, delay, _async_retry)
+
+    # Hours the recorder missed while we were down or iSolarCloud was unreachable. The backfill
+    # is only imported with the recorder running, as it pulls in the recorder's modules
+    if "recorder" in hass.config.components:
+        backfill = await async_import_module(hass, f"{__package__}.backfill")
+        backfill.SungrowBackfill(hass, entry, plants_service, catalogue).async_start()
+
+    if not catalogue.plants:
+        # Nothing catalogued yet, so entities are added as discovery finds them; setup doesn't
+        # wait for it, and unloading the entry cancels it
+        entry.async_on_unload(_async_cancel_retry)
+        entry.async_create_background_task(hass, _async_discover(), name=f"Sungrow plant discovery {entry.title}")
+        return
 
-class SungrowPlantCoordinator(DataUpdateCoordinator):
-    """Coordinator to manage fetching data from single plant."""
+    for plant_id, plant in catalogue.plants.items():
+        _async_add_sensors(plant_id, plant["name"], plant["points"])
+        for ps_key, device in plant.get("devices", {}).items():
+            _async_add_device_sensors(plant_id, ps_key, device, device["points"])
 
-    def __init__(self, hass, config_entry, plants_service, plant_id, plant_name):
-        """Initialize."""
-        super().__init__(
-            hass,
-            _LOGGER,
-            name=f"Sungrow Plant {plant_name}",
-            update_interval=SCAN_INTERVAL,
-            config_entry=config_entry,
-        )
-        self.plants_service = plants_service
-        self.plant_id = plant_id
+    entry.async_create_background_task(
+        hass, _async_sync_catalogue(first_refresh=False), name=f"Sungrow catalogue sync {entry.title}"
+    )
 
-    async def _async_update_data(self):
-        """Fetch data from API."""
-        try:
-            # async_get_realtime_data returns a dict of plants, keyed by plant_id
-            # { "123": { "code1": {...}, "code2": {...} } }
-            all_plants_data = await self.plants_service.async_get_realtime_data([self.plant_id])
 
-            if self.plant_id in all_plants_data:
-                return all_plants_data[self.plant_id]
-            return {}
-        except Exception as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
+@callback
+def _async_remove_deselected_entities(
+    hass: HomeAssistant, entry: ConfigEntry, selections: dict[str, PointSelection], local_plants: dict[str, dict]
+) -> None:
+    """Remove the entities of points that are no longer selected, and of plants no longer read locally."""
+    entity_registry = er.async_get(hass)
+    for entity_entry in er.async_entries_for_config_entry(entity_registry, entry.entry_id):
+        # Unique IDs are "<plant_id>_<point_code>"
+        plant_id, _, point_code = entity_entry.unique_id.partition("_")
+        if point_code in HEALTH_KEYS:
+            continue
+        if point_code == DATA_SOURCE_KEY:
+            if plant_id not in local_plants:
+                _LOGGER.debug("Removing %s, as plant %s is no longer read locally", entity_entry.entity_id, plant_id)
+                entity_registry.async_remove(entity_entry.entity_id)
+            continue
+        if (selection := selections.get(plant_id)) is not None and not selection.allows(point_code):
+            _LOGGER.debug("Removing %s, as point %s is not selected", entity_entry.entity_id, point_code)
+            entity_registry.async_remove(entity_entry.entity_id)
+
+
+def _catalogued_devices(catalogue: SungrowCatalogue) -> dict[str, int]:
+    """Return the device type of every catalogued device, by ps_key."""
+    return {
+        ps_key: device["type"]
+        for plant in catalogue.plants.values()
+        for ps_key, device in plant.get("devices", {}).items()
+    }
+
+
+def _plant_device_info(plant_id: str, plant_name: str) -> DeviceInfo:
+    """Return the device that groups a plant's sensors."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, plant_id)},
+        name=plant_name,
+        manufacturer="Sungrow",
+        entry_type=DeviceEntryType.SERVICE,
+        configuration_url="https://isolarcloud.eu",
+    )
 
 
 class SungrowSensor(CoordinatorEntity, SensorEntity):
@@ -124,18 +416,23 @@ class SungrowSensor(CoordinatorEntity, SensorEntity):
 
     has_entity_name = True
 
-    def __init__(self, coordinator, point_code, plant_id, plant_name, init_data, entry_id):
+    # The point's data only repeats its metadata and the state, so there's no need to record it
+    _unrecorded_attributes = frozenset({"id", "code", "name", "unit", "value"})
+
+    def __init__(self, coordinator, point_code, plant_id, plant_name, point_info, entry_id, minimal_attributes=False):
         """Initialize the sensor."""
-        super().__init__(coordinator)
+        # The point code as context means the coordinator only wakes this sensor when its point changes
+        super().__init__(coordinator, context=point_code)
         self.point_code = point_code
         self.plant_id = plant_id
+        self.minimal_attributes = minimal_attributes
 
         # Prefer generating name from code to avoid Chinese names from API
         # The API often returns Chinese names even when locale is set to English
         # We assume point_code is a readable string identifier (e.g. 'total_active_power')
         if point_code.isdigit():
             # Fallback if we only have a number, but ideally we should have a string key
-            sensor_name = init_data.get("name", f"Sensor {point_code}")
+            sensor_name = point_info.get("name") or f"Sensor {point_code}"
         else:
             sensor_name = point_code.replace("_", " ").title()
 
@@ -146,46 +443,142 @@ class SungrowSensor(CoordinatorEntity, SensorEntity):
         self._attr_icon = "mdi:solar-power-variant"
 
         # Group sensors under a device per plant
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, plant_id)},
-            name=plant_name,
-            manufacturer="Sungrow",
-            entry_type=DeviceEntryType.SERVICE,
-            configuration_url="https://isolarcloud.eu",
-        )
+        self._attr_device_info = _plant_device_info(plant_id, plant_name)
 
-        # Programmatically hide sensors that are "Unknown" at first setup
+        # Programmatically hide sensors that were "Unknown" when first catalogued
         # This prevents UI clutter for unsupported attributes (e.g. meters/batteries not present)
-        initial_value = init_data.get("value")
-        if initial_value is None or str(initial_value).strip() == "" or str(initial_value).lower() == "unknown":
+        if not point_info.get("enabled_default", True):
             self._attr_entity_registry_enabled_default = False
 
-        # Attempt to infer device class and unit
-        self._attr_native_unit_of_measurement = init_data.get("unit")
+        self._attr_native_unit_of_measurement = point_info.get("unit")
+
+        if device_class := point_info.get("device_class"):
+            self._attr_device_class = SensorDeviceClass(device_class)
+            self._attr_state_class = STATE_CLASSES.get(self._attr_device_class)
 
-        # Simple inference for Power/Energy
-        if self._attr_native_unit_of_measurement in ["kW", "W"]:
-            self._attr_device_class = SensorDeviceClass.POWER
-            self._attr_state_class = SensorStateClass.MEASUREMENT
-        elif self._attr_native_unit_of_measurement in ["kWh"]:
-            self._attr_device_class = SensorDeviceClass.ENERGY
-            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+    @property
+    def _points(self):
+        """Return the coordinator's points that this sensor's point is among."""
+        return self.coordinator.data
 
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        if self.coordinator.data and self.point_code in self.coordinator.data:
-            val = self.coordinator.data[self.point_code].get("value")
-            # Try convert to float if it looks like a number but is string
-            try:
-                return float(val)
-            except (ValueError, TypeError):
-                return val
+        if self._points and (point := self._points.get(self.point_code)) is not None:
+            return point.native_value
         return None
 
     @property
     def extra_state_attributes(self):
         """Return attributes."""
-        if self.coordinator.data and self.point_code in self.coordinator.data:
-            return self.coordinator.data[self.point_code]
+        if self.minimal_attributes:
+            return None
+        if self._points and (point := self._points.get(self.point_code)) is not None:
+            return point.attributes
         return {}
+
+
+class SungrowDeviceSensor(SungrowSensor):
+    """A point of one of a plant's devices: an inverter, battery or meter."""
+
+    def __init__(
+        self, coordinator, point_code, plant_id, ps_key, device, point_info, entry_id, minimal_attributes=False
+    ):
+        """Initialize the sensor."""
+        super().__init__(
+            coordinator, point_code, plant_id, device["name"] or ps_key, point_info, entry_id, minimal_attributes
+        )
+        self.ps_key = ps_key
+        # The device coordinator's data is keyed by device, then point
+        self.coordinator_context = (ps_key, point_code)
+        # Kept apart from "<plant_id>_<point_code>", so plant point selections don't apply
+        self._attr_unique_id = f"device_{ps_key}_{point_code}"
+        # Each device gets its own device, reached through the plant
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, ps_key)},
+            name=device["name"] or ps_key,
+            manufacturer="Sungrow",
+            model=device.get("model"),
+            serial_number=device.get("serial"),
+            via_device=(DOMAIN, plant_id),
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True if the last update included the device."""
+        return super().available and self.ps_key in (self.coordinator.data or {})
+
+    @property
+    def _points(self):
+        """Return the device's points."""
+        return (self.coordinator.data or {}).get(self.ps_key)
+
+
+class SungrowDataSourceSensor(CoordinatorEntity, SensorEntity):
+    """Which source served a local plant's last update, with each source's latency."""
+
+    has_entity_name = True
+    _attr_name = "Data source"
+    _attr_icon = "mdi:swap-horizontal"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [SOURCE_LOCAL, SOURCE_CLOUD]
+    _unrecorded_attributes = frozenset({"local_latency", "cloud_latency"})
+
+    def __init__(self, coordinator: SungrowLocalPlantCoordinator, plant_id: str, plant_name: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{plant_id}_{DATA_SOURCE_KEY}"
+        self._attr_device_info = _plant_device_info(plant_id, plant_name)
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the source of the last update."""
+        return self.coordinator.source
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return how long each source last took, in seconds, and the last failover."""
+        attributes = {f"{source}_latency": round(latency, 3) for source, latency in self.coordinator.latency.items()}
+        if self.coordinator.failovers:
+            failed_over_at, _, reason = self.coordinator.failovers[-1]
+            attributes["last_failover"] = failed_over_at.isoformat()
+            attributes["last_failover_reason"] = reason
+        return attributes
+
+
+class SungrowHealthSensor(SensorEntity):
+    """How a plant's updates have been going, from the bookkeeping its coordinators do around each update.
+
+    These are disabled by default. They are written after every update of the
+    plant, whether it worked or not, so they stay available while the plant's
+    other sensors are unavailable.
+    """
+
+    has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    entity_description: SungrowHealthSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: SungrowPlantCoordinator,
+        description: SungrowHealthSensorEntityDescription,
+        plant_id: str,
+        plant_name: str,
+    ) -> None:
+        """Initialize the sensor."""
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_unique_id = f"{plant_id}_{description.key}"
+        self._attr_device_info = _plant_device_info(plant_id, plant_name)
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state after every update of the plant."""
+        self.async_on_remove(self.coordinator.health.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> datetime | float | int | None:
+        """Return the value as of now."""
+        return self.entity_description.value_fn(self.coordinator.health, dt_util.utcnow())
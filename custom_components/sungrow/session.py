@@ -0,0 +1,86 @@
+"""HTTP sessions for the Sungrow iSolarCloud integration.
+
+Every config entry and config flow using a gateway shares one pooled session,
+tuned for talking to that gateway, in place of Home Assistant's shared session.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from aiohttp.hdrs import ACCEPT_ENCODING, USER_AGENT
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util import ssl as ssl_util
+
+from .const import (
+    DOMAIN,
+    GATEWAY_CONNECT_TIMEOUT,
+    GATEWAY_CONNECTIONS,
+    GATEWAY_DNS_CACHE_TTL,
+    GATEWAY_KEEPALIVE,
+    GATEWAY_READ_TIMEOUT,
+)
+
+DATA_SESSIONS = f"{DOMAIN}_sessions"
+
+
+@dataclass(slots=True)
+class GatewaySession:
+    """A gateway's session, and the config entries and flows using it."""
+
+    session: ClientSession
+    users: set[str] = field(default_factory=set)
+
+
+def _create_session() -> ClientSession:
+    """Create a session keeping connections to a gateway open, with DNS cached and compressed responses."""
+    connector = TCPConnector(
+        ssl=ssl_util.get_default_context(),
+        limit_per_host=GATEWAY_CONNECTIONS,
+        keepalive_timeout=GATEWAY_KEEPALIVE,
+        ttl_dns_cache=GATEWAY_DNS_CACHE_TTL,
+        enable_cleanup_closed=True,
+    )
+    return ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(total=None, connect=GATEWAY_CONNECT_TIMEOUT, sock_read=GATEWAY_READ_TIMEOUT),
+        headers={USER_AGENT: SERVER_SOFTWARE, ACCEPT_ENCODING: "gzip, deflate"},
+        json_serialize=json_dumps,
+    )
+
+
+@callback
+def async_get_session(hass: HomeAssistant, host: str, user: str) -> ClientSession:
+    """Return the session shared by everything using a gateway, creating it on first use.
+
+    user is the config entry or flow ID the session is released for.
+    """
+    if (sessions := hass.data.get(DATA_SESSIONS)) is None:
+        sessions = hass.data[DATA_SESSIONS] = {}
+
+        async def _async_close_sessions(event: Event) -> None:
+            """Close every session when Home Assistant stops."""
+            for gateway_session in sessions.values():
+                await gateway_session.session.close()
+            sessions.clear()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_sessions)
+
+    if (gateway_session := sessions.get(host)) is None:
+        gateway_session = sessions[host] = GatewaySession(_create_session())
+    gateway_session.users.add(user)
+    return gateway_session.session
+
+
+async def async_release_session(hass: HomeAssistant, user: str) -> None:
+    """Stop a config entry or flow using its gateway's session, closing the session once nothing does."""
+    sessions: dict[str, GatewaySession] = hass.data.get(DATA_SESSIONS, {})
+    for host, gateway_session in list(sessions.items()):
+        gateway_session.users.discard(user)
+        if not gateway_session.users:
+            del sessions[host]
+            await gateway_session.session.close()
@@ -0,0 +1,127 @@
+"""Request coalescing for the Sungrow iSolarCloud integration.
+
+A scheduled refresh, a requested refresh and a reload can all ask iSolarCloud
+for the same data at the same moment. Identical calls share one request while
+it is in flight, and reuse its result for REQUEST_REUSE_WINDOW seconds after.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, REQUEST_REUSE_WINDOW
+
+DATA_FLIGHTS = f"{DOMAIN}_flights"
+
+_T = TypeVar("_T")
+
+
+@dataclass(slots=True)
+class _Flight:
+    """A shared call, the callers waiting on it, and when it returned."""
+
+    task: asyncio.Task | None = None
+    waiters: int = 0
+    done_at: float | None = None
+
+
+class SingleFlight:
+    """Identical calls made for one config entry, shared while in flight and reused briefly after.
+
+    The call runs in its own task, so a caller that gives up (e.g. on a timeout)
+    doesn't cancel it for the others; it is only cancelled once every caller
+    has. Failures are not reused, so the next call tries again.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._flights: dict[Hashable, _Flight] = {}
+
+    async def async_call(self, key: Hashable, call: Callable[[], Awaitable[_T]]) -> _T:
+        """Return the result of call, shared with every other call made with the same key."""
+        self._async_expire(time.monotonic())
+        if (flight := self._flights.get(key)) is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = self.hass.async_create_background_task(
+                self._async_fly(key, flight, call), name=f"Sungrow request {key}"
+            )
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+
+    async def _async_fly(self, key: Hashable, flight: _Flight, call: Callable[[], Awaitable[_T]]) -> _T:
+        """Make the call, keeping a successful result for reuse and forgetting a failed call."""
+        try:
+            result = await call()
+        except BaseException:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            raise
+        flight.done_at = time.monotonic()
+        return result
+
+    @callback
+    def _async_expire(self, now: float) -> None:
+        """Forget results older than REQUEST_REUSE_WINDOW."""
+        for key, flight in list(self._flights.items()):
+            if flight.done_at is not None and now - flight.done_at >= REQUEST_REUSE_WINDOW:
+                del self._flights[key]
+
+
+@callback
+def async_get_flights(hass: HomeAssistant, entry_id: str) -> SingleFlight:
+    """Return a config entry's shared calls, kept across reloads of the entry."""
+    flights: dict[str, SingleFlight] = hass.data.setdefault(DATA_FLIGHTS, {})
+    if (entry_flights := flights.get(entry_id)) is None:
+        entry_flights = flights[entry_id] = SingleFlight(hass)
+    return entry_flights
+
+
+@callback
+def async_remove_flights(hass: HomeAssistant, entry_id: str) -> None:
+    """Drop the shared calls of a removed config entry."""
+    hass.data.get(DATA_FLIGHTS, {}).pop(entry_id, None)
+
+
+class SingleFlightPlants:
+    """A pysolarcloud Plants whose plant list and realtime data calls are shared through a SingleFlight.
+
+    Callers share the returned data, so must not change it. Everything else is
+    passed straight through to the wrapped Plants.
+    """
+
+    def __init__(self, plants: Any, flights: SingleFlight) -> None:
+        """Initialize."""
+        self._plants = plants
+        self._flights = flights
+
+    def __getattr__(self, name: str) -> Any:
+        """Return the wrapped Plants' attribute."""
+        return getattr(self._plants, name)
+
+    async def async_get_plants(self) -> list[dict[str, Any]]:
+        """Return the account's plants."""
+        return await self._flights.async_call(("plants",), self._plants.async_get_plants)
+
+    async def async_get_realtime_data(
+        self, plant_id: str | list[str], *, measure_points: list[str] | None = None
+    ) -> dict[str, dict[str, dict[str, Any]]]:
+        """Return the latest realtime data of one or more plants, keyed by plant ID then point code."""
+        plant_ids = [plant_id] if isinstance(plant_id, str) else plant_id
+        key = ("realtime", frozenset(plant_ids), None if measure_points is None else frozenset(measure_points))
+        return await self._flights.async_call(
+            key, partial(self._plants.async_get_realtime_data, plant_id, measure_points=measure_points)
+        )
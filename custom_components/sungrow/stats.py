@@ -0,0 +1,193 @@
+"""API performance statistics for the Sungrow iSolarCloud integration.
+
+Each config entry keeps a SungrowStats, fed by SungrowAuth for every request and
+by the coordinators for parsing and entity updates, and shown in diagnostics.
+Each plant keeps a PlantHealth, fed by the coordinators around every update of
+the plant, and shown by its diagnostic sensors.
+"""
+
+from __future__ import annotations
+
+import bisect
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import API_CALL_WINDOW, DOMAIN, LATENCY_BUCKETS, STATS_HISTORY
+
+DATA_STATS = f"{DOMAIN}_stats"
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    """Requests to one endpoint: counts, a latency histogram, payload sizes and parse time."""
+
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    # Requests per LATENCY_BUCKETS upper bound, with a last bucket for anything slower
+    latency_buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    latency_seconds: float = 0.0
+    payload_bytes: int = 0
+    max_payload_bytes: int = 0
+    parses: int = 0
+    parse_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics."""
+        bounds = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        answered = sum(self.latency_buckets)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "latency_histogram": dict(zip(bounds, self.latency_buckets, strict=True)),
+            "mean_latency_seconds": round(self.latency_seconds / answered, 4) if answered else None,
+            "payload_bytes": self.payload_bytes,
+            "mean_payload_bytes": self.payload_bytes // answered if answered else None,
+            "max_payload_bytes": self.max_payload_bytes,
+            "parses": self.parses,
+            "mean_parse_seconds": round(self.parse_seconds / self.parses, 6) if self.parses else None,
+        }
+
+
+class SungrowStats:
+    """API performance statistics for one config entry, kept since the entry was set up."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.started = dt_util.utcnow()
+        self.endpoints: dict[str, EndpointStats] = {}
+        # (time, error) of each token refresh, where error is None if it succeeded
+        self.token_refreshes: deque[tuple[datetime, str | None]] = deque(maxlen=STATS_HISTORY)
+        # Entities written by each of the coordinator's recent updates, by coordinator name
+        self.writes: dict[str, deque[int]] = {}
+
+    def _endpoint(self, path: str) -> EndpointStats:
+        if (endpoint := self.endpoints.get(path)) is None:
+            endpoint = self.endpoints[path] = EndpointStats()
+        return endpoint
+
+    @callback
+    def async_record_request(self, path: str, seconds: float, payload_bytes: int, status: int) -> None:
+        """Record a request that got a response, counting error statuses as errors."""
+        endpoint = self._endpoint(path)
+        endpoint.calls += 1
+        if status >= 400:
+            endpoint.errors += 1
+        endpoint.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        endpoint.latency_seconds += seconds
+        endpoint.payload_bytes += payload_bytes
+        endpoint.max_payload_bytes = max(endpoint.max_payload_bytes, payload_bytes)
+
+    @callback
+    def async_record_error(self, path: str) -> None:
+        """Record a request that failed without a response."""
+        endpoint = self._endpoint(path)
+        endpoint.calls += 1
+        endpoint.errors += 1
+
+    @callback
+    def async_record_retry(self, path: str) -> None:
+        """Record a throttled request being sent again."""
+        self._endpoint(path).retries += 1
+
+    @callback
+    def async_record_parse(self, path: str, seconds: float) -> None:
+        """Record the time taken to turn an endpoint's response into point values."""
+        endpoint = self._endpoint(path)
+        endpoint.parses += 1
+        endpoint.parse_seconds += seconds
+
+    @callback
+    def async_record_token_refresh(self, error: str | None = None) -> None:
+        """Record a token refresh, and why it failed if it did."""
+        self.token_refreshes.append((dt_util.utcnow(), error))
+
+    @callback
+    def async_record_writes(self, coordinator: str, entities: int) -> None:
+        """Record how many entities a coordinator update wrote."""
+        self.writes.setdefault(coordinator, deque(maxlen=STATS_HISTORY)).append(entities)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics."""
+        return {
+            "since": self.started.isoformat(),
+            "endpoints": {path: endpoint.as_dict() for path, endpoint in sorted(self.endpoints.items())},
+            "token_refreshes": [
+                {"time": refreshed_at.isoformat(), "error": error} for refreshed_at, error in self.token_refreshes
+            ],
+            "entities_written_per_cycle": {name: list(writes) for name, writes in sorted(self.writes.items())},
+        }
+
+
+class PlantHealth:
+    """How a plant's updates have been going, for its diagnostic sensors.
+
+    The coordinators record every API call made for the plant and the outcome of
+    every update, then listeners are told. Nothing here makes API calls itself.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.last_success: datetime | None = None
+        self.last_duration: float | None = None
+        self.consecutive_failures = 0
+        # When the values last changed upstream, as far as the polls can tell
+        self.upstream_updated_at: datetime | None = None
+        self._api_calls: deque[datetime] = deque()
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call update_callback after every recorded update, returning a callback that stops it."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @callback
+    def async_record_api_call(self) -> None:
+        """Record an API call made for the plant."""
+        self._api_calls.append(dt_util.utcnow())
+
+    @callback
+    def async_record_update(self, seconds: float, success: bool) -> None:
+        """Record how long an update of the plant took and whether it worked, then tell the listeners."""
+        self.last_duration = seconds
+        if success:
+            self.last_success = dt_util.utcnow()
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def api_calls(self, now: datetime) -> int:
+        """Return the number of API calls made for the plant in the API_CALL_WINDOW before now."""
+        while self._api_calls and self._api_calls[0] <= now - API_CALL_WINDOW:
+            self._api_calls.popleft()
+        return len(self._api_calls)
+
+    def data_age(self, now: datetime) -> float | None:
+        """Return how many seconds old the plant's values were at now, if known."""
+        if self.upstream_updated_at is None:
+            return None
+        return (now - self.upstream_updated_at).total_seconds()
+
+
+@callback
+def async_get_stats(hass: HomeAssistant, entry_id: str) -> SungrowStats:
+    """Return the statistics of a config entry, creating them on first use."""
+    stats: dict[str, SungrowStats] = hass.data.setdefault(DATA_STATS, {})
+    if (entry_stats := stats.get(entry_id)) is None:
+        entry_stats = stats[entry_id] = SungrowStats()
+    return entry_stats
+
+
+@callback
+def async_remove_stats(hass: HomeAssistant, entry_id: str) -> None:
+    """Drop the statistics of an unloaded config entry."""
+    hass.data.get(DATA_STATS, {}).pop(entry_id, None)
@@ -0,0 +1,61 @@
+"""OAuth callback view for the Sungrow iSolarCloud integration.
+
+Only a config flow waiting for an authorization code needs the view, so it is
+imported and registered by the flow rather than when the integration loads.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_CALLBACK_VIEW = f"{DOMAIN}_callback_view"
+
+
+@callback
+def async_register_callback_view(hass: HomeAssistant) -> None:
+    """Register the callback view, unless it already is; views can't be unregistered."""
+    if hass.data.get(DATA_CALLBACK_VIEW):
+        return
+    hass.http.register_view(SungrowAuthCallbackView())
+    hass.data[DATA_CALLBACK_VIEW] = True
+
+
+class SungrowAuthCallbackView(HomeAssistantView):
+    """Sungrow Authorization Callback View."""
+
+    requires_auth = False
+    url = "/api/sungrow_hass/callback"
+    name = "api:sungrow_hass:callback"
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Handle callback."""
+        hass: HomeAssistant = request.app["hass"]
+        params = request.query
+        code = params.get("code")
+        flow_id = params.get("flow_id")
+
+        if not code or not flow_id:
+            _LOGGER.warning("Callback received but missing code or flow_id. Params: %s", list(params))
+            return web.Response(text="Missing code or flow_id parameters. Please try again.", status=400)
+
+        _LOGGER.debug("Callback received with a code for flow_id: %s", flow_id)
+
+        # Retrieve the flow and update it
+        try:
+            await hass.config_entries.flow.async_configure(flow_id=flow_id, user_input={"code": code})
+        except Exception as err:
+            _LOGGER.error("Failed to pass code to config flow: %s", err)
+            return web.Response(text=f"Error occurred while resuming flow: {err}", status=500)
+
+        return web.Response(
+            text="Authorization successful! You can close this window and return to Home Assistant.",
+            content_type="text/html",
+        )
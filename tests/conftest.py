@@ -17,6 +17,9 @@ from custom_components.sungrow.const import (
     DOMAIN,
 )
 
+from .fake_gateway import FakeGateway
+from .modbus_simulator import SAMPLE_VALUES, ModbusSimulator
+
 # Load environment variables from .env file (for live tests)
 load_dotenv()
 
@@ -82,6 +85,33 @@ MOCK_REALTIME_DATA = {
     },
 }
 
+MOCK_DEVICE_LIST = [
+    {
+        "ps_key": "12345_1_1_1",
+        "device_sn": "A2190000001",
+        "device_name": "SG5.0RS",
+        "device_type": 1,
+        "device_model_code": "SG5.0RS",
+    },
+    {
+        "ps_key": "12345_7_1_1",
+        "device_sn": "M0000001",
+        "device_name": "Meter",
+        "device_type": 7,
+        "device_model_code": "DTSU666",
+    },
+]
+
+MOCK_DEVICE_DATA = {
+    "12345_1_1_1": {
+        "total_active_power": {"id": "24", "code": "total_active_power", "value": "4890", "unit": "W", "name": "Power"},
+        "daily_yield": {"id": "1", "code": "daily_yield", "value": "12400", "unit": "Wh", "name": "Daily Yield"},
+    },
+    "12345_7_1_1": {
+        "meter_active_power": {"id": "8018", "code": "meter_active_power", "value": "-1250", "unit": "W", "name": "P"},
+    },
+}
+
 
 @pytest.fixture(autouse=True)
 def patch_async_drop_config_annotations():
@@ -158,7 +188,7 @@ def mock_config_entry() -> MockConfigEntry:
 @pytest.fixture
 def mock_auth():
     """Create a mock Auth instance matching the real pysolarcloud.Auth interface."""
-    with patch("custom_components.sungrow.config_flow.Auth") as mock_auth_cls:
+    with patch("pysolarcloud.Auth") as mock_auth_cls:
         auth_instance = MagicMock()
         auth_instance.auth_url.return_value = "https://isolarcloud.eu/oauth?client_id=test"
         auth_instance.async_authorize = AsyncMock(return_value=None)
@@ -185,20 +215,66 @@ def mock_plants_service():
         plants_instance = MagicMock()
         plants_instance.async_get_plants = AsyncMock(return_value=MOCK_PLANT_LIST)
         plants_instance.async_get_realtime_data = AsyncMock(return_value=MOCK_REALTIME_DATA)
+        plants_instance.async_get_plant_devices = AsyncMock(return_value=[])
         mock_plants_cls.return_value = plants_instance
         yield plants_instance
 
 
+@pytest.fixture
+def mock_devices_service():
+    """Create a mock Devices service, serving each device's points from MOCK_DEVICE_DATA."""
+    with patch("custom_components.sungrow.sensor.Devices") as mock_devices_cls:
+        devices_instance = MagicMock()
+        devices_instance.async_get_realtime_data = AsyncMock(
+            side_effect=lambda device_type, ps_keys: {
+                ps_key: MOCK_DEVICE_DATA[ps_key] for ps_key in ps_keys if ps_key in MOCK_DEVICE_DATA
+            }
+        )
+        mock_devices_cls.return_value = devices_instance
+        yield devices_instance
+
+
 @pytest.fixture
 def mock_sensor_auth():
-    """Create a mock Auth instance for sensor setup (patches sensor module)."""
-    with patch("custom_components.sungrow.sensor.Auth") as mock_auth_cls:
+    """Create a mock SungrowAuth instance for sensor setup (patches sensor module)."""
+    with patch("custom_components.sungrow.sensor.SungrowAuth") as mock_auth_cls:
         auth_instance = MagicMock()
         auth_instance.tokens = MOCK_CONFIG_DATA["tokens"]
         mock_auth_cls.return_value = auth_instance
         yield auth_instance
 
 
+# ---------------------------------------------------------------------------
+# Local Modbus simulator
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+async def modbus_simulator(socket_enabled):
+    """Run a Modbus simulator of an inverter holding SAMPLE_VALUES, on a free local port."""
+    simulator = ModbusSimulator()
+    for code, value in SAMPLE_VALUES.items():
+        simulator.set_value(code, value)
+    await simulator.async_start()
+    yield simulator
+    await simulator.async_stop()
+
+
+# ---------------------------------------------------------------------------
+# Fake iSolarCloud gateway
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+async def fake_gateway(socket_enabled):
+    """Run a fake iSolarCloud gateway on a free local port, with the integration pointed at it."""
+    gateway = FakeGateway()
+    await gateway.async_start()
+    with patch.dict("custom_components.sungrow.sensor.GATEWAYS", {"Europe": gateway.url}):
+        yield gateway
+    await gateway.async_stop()
+
+
 # ---------------------------------------------------------------------------
 # Live test credentials
 # ---------------------------------------------------------------------------
@@ -0,0 +1,244 @@
+"""A local stand-in for an iSolarCloud gateway, for end-to-end, load and resilience testing without the network.
+
+Tests use it through the fake_gateway fixture, which points the Europe gateway
+at it. It can also be run with `python -m tests.fake_gateway [port] [--plants N]
+[--latency S] ...`. Any authorization code is accepted for tokens.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter, deque
+from typing import Any
+
+from aiohttp import web
+from pysolarcloud.plants import Plants
+
+TOKEN_PATH = "/openapi/apiManage/token"
+REFRESH_TOKEN_PATH = "/openapi/apiManage/refreshToken"
+PLANT_LIST_PATH = "/openapi/platform/queryPowerStationList"
+REALTIME_PATH = "/openapi/platform/getPowerStationRealTimeData"
+DEVICE_LIST_PATH = "/openapi/platform/getDeviceListByPsId"
+
+# Units of the points pysolarcloud knows, by the suffix of their code
+UNITS = {"yield": "Wh", "consumption": "Wh", "power": "W", "soc": "%", "voltage": "V", "current": "A"}
+
+
+class FakeGateway:
+    """aiohttp server answering the iSolarCloud endpoints the integration uses.
+
+    Every request is delayed by latency seconds, then fails with a 500 at
+    error_rate or is throttled with a 429 at throttle_rate, drawn from a seeded
+    random generator so runs are repeatable. Responses queued with inject are
+    sent first, whatever the rates. extra_points adds points pysolarcloud
+    doesn't know to every plant, for large payloads.
+
+    Each request's path is recorded in requests, and the client address of each
+    connection in connections.
+    """
+
+    def __init__(
+        self,
+        plants: int = 2,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float | None = None,
+        extra_points: int = 0,
+        token_lifetime: int = 172800,
+        seed: int = 0,
+    ) -> None:
+        """Initialize."""
+        self.plants = [{"ps_id": 100000 + index, "ps_name": f"Plant {index}"} for index in range(plants)]
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.extra_points = extra_points
+        self.token_lifetime = token_lifetime
+        self.updates = 0
+        self.requests: list[str] = []
+        self.responses: Counter[int] = Counter()
+        self.connections: set[tuple[str, int]] = set()
+        self.access_tokens: set[str] = set()
+        self.refresh_tokens: set[str] = set()
+        self.port: int | None = None
+        self._random = random.Random(seed)
+        self._injected: deque[int] = deque()
+        self._token_ids = itertools.count(1)
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the gateway's base URL."""
+        return f"http://127.0.0.1:{self.port}"
+
+    def inject(self, status: int, count: int = 1) -> None:
+        """Answer the next count requests with status, before any other response."""
+        self._injected.extend([status] * count)
+
+    def issue_tokens(self) -> dict[str, Any]:
+        """Return a fresh set of tokens, in the form a config entry stores them."""
+        token_id = next(self._token_ids)
+        tokens = {"access_token": f"access-{token_id}", "refresh_token": f"refresh-{token_id}"}
+        self.access_tokens.add(tokens["access_token"])
+        self.refresh_tokens.add(tokens["refresh_token"])
+        return tokens | {"expires_in": self.token_lifetime, "expires_at": int(time.time()) + self.token_lifetime}
+
+    def advance(self) -> None:
+        """Move every point on to its next value, as iSolarCloud does every five minutes."""
+        self.updates += 1
+
+    async def async_start(self, port: int = 0, host: str = "127.0.0.1") -> int:
+        """Start serving, on a free port unless one is given, returning the port."""
+        app = web.Application(middlewares=[self._faults])
+        app.router.add_post(TOKEN_PATH, self._async_token)
+        app.router.add_post(REFRESH_TOKEN_PATH, self._async_refresh_token)
+        app.router.add_post(PLANT_LIST_PATH, self._async_plant_list)
+        app.router.add_post(REALTIME_PATH, self._async_realtime)
+        app.router.add_post(DEVICE_LIST_PATH, self._async_device_list)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def async_stop(self) -> None:
+        """Stop serving and drop every connection."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _faults(self, request: web.Request, handler) -> web.StreamResponse:
+        """Record the request, then delay, fail or throttle it as configured."""
+        self.requests.append(request.path)
+        if (peer := request.transport and request.transport.get_extra_info("peername")) is not None:
+            self.connections.add(tuple(peer[:2]))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self._injected:
+            status = self._injected.popleft()
+        elif self._random.random() < self.error_rate:
+            status = 500
+        elif self._random.random() < self.throttle_rate:
+            status = 429
+        else:
+            status = 200
+
+        if status == 429:
+            headers = {} if self.retry_after is None else {"Retry-After": str(self.retry_after)}
+            response: web.StreamResponse = web.json_response(
+                {"error": "too_many_requests"}, status=429, headers=headers
+            )
+        elif status != 200:
+            response = web.Response(status=status, text="Internal error")
+        elif request.path in (TOKEN_PATH, REFRESH_TOKEN_PATH) or self._authorized(request):
+            response = await handler(request)
+        else:
+            response = web.json_response({"error": "invalid_token", "error_description": "Access token is invalid"})
+        self.responses[response.status] += 1
+        return response
+
+    def _authorized(self, request: web.Request) -> bool:
+        """Return True if the request carries an access token this gateway issued."""
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        return scheme == "Bearer" and token in self.access_tokens
+
+    async def _async_token(self, request: web.Request) -> web.Response:
+        """Exchange an authorization code for tokens."""
+        body = await request.json()
+        if not body.get("code"):
+            return web.json_response({"error": "invalid_grant", "error_description": "Missing code"})
+        tokens = self.issue_tokens()
+        del tokens["expires_at"]
+        return web.json_response(tokens)
+
+    async def _async_refresh_token(self, request: web.Request) -> web.Response:
+        """Exchange a refresh token for new tokens, retiring the old ones."""
+        body = await request.json()
+        if body.get("refresh_token") not in self.refresh_tokens:
+            return web.json_response({"error": "invalid_grant", "error_description": "Unknown refresh token"})
+        self.refresh_tokens.discard(body["refresh_token"])
+        tokens = self.issue_tokens()
+        del tokens["expires_at"]
+        return web.json_response(tokens)
+
+    async def _async_plant_list(self, request: web.Request) -> web.Response:
+        """Return one page of the account's plants."""
+        body = await request.json()
+        page, size = int(body.get("page", 1)), int(body.get("size", 100))
+        page_list = self.plants[(page - 1) * size : page * size]
+        return web.json_response(
+            {"result_code": "1", "result_data": {"pageList": page_list, "rowCount": len(self.plants)}}
+        )
+
+    async def _async_device_list(self, request: web.Request) -> web.Response:
+        """Return a plant's devices; the fake plants have none."""
+        return web.json_response({"result_code": "1", "result_data": {"pageList": [], "rowCount": 0}})
+
+    async def _async_realtime(self, request: web.Request) -> web.Response:
+        """Return the requested points of the requested plants."""
+        body = await request.json()
+        plant_ids = {str(plant_id) for plant_id in body.get("ps_id_list", [])}
+        point_ids = [str(point_id) for point_id in body.get("point_id_list", [])]
+        point_ids += [str(900000 + index) for index in range(self.extra_points)]
+
+        device_point_list = [
+            {"ps_id": plant["ps_id"]}
+            | {f"p{point_id}": self._value(plant["ps_id"], point_id) for point_id in point_ids}
+            for plant in self.plants
+            if str(plant["ps_id"]) in plant_ids
+        ]
+        point_dict = [
+            {"point_id": int(point_id), "point_name": code.replace("_", " ").title(), "point_unit": _unit(code)}
+            for point_id in point_ids
+            for code in [Plants.measure_points.get(point_id, f"point_{point_id}")]
+        ]
+        return web.json_response(
+            {"result_code": "1", "result_data": {"device_point_list": device_point_list, "point_dict": point_dict}}
+        )
+
+    def _value(self, plant_id: int, point_id: str) -> str:
+        """Return a point's current value, which changes with every update."""
+        return str((plant_id + int(point_id) + self.updates) % 1000)
+
+
+def _unit(code: str) -> str:
+    """Return the unit of a point from its code."""
+    return next((unit for suffix, unit in UNITS.items() if code.endswith(suffix)), "")
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    """Serve the fake gateway until interrupted, moving points on every five minutes."""
+    gateway = FakeGateway(
+        args.plants,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        extra_points=args.extra_points,
+    )
+    print(f"Fake iSolarCloud gateway listening on port {await gateway.async_start(args.port, '0.0.0.0')}")
+    while True:
+        await asyncio.sleep(300)
+        gateway.advance()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("port", type=int, nargs="?", default=8080)
+    parser.add_argument("--plants", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests throttled with a 429")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After sent with throttled responses")
+    parser.add_argument("--extra-points", type=int, default=0, help="unknown points added to every plant")
+    asyncio.run(_async_main(parser.parse_args()))
@@ -0,0 +1,126 @@
+"""A local Modbus TCP simulator of a Sungrow inverter, for testing without hardware.
+
+Run it with `python -m tests.modbus_simulator [port]` and point a plant's local
+host option at this machine to try the local data source.
+"""
+
+import asyncio
+import contextlib
+import struct
+import sys
+
+from custom_components.sungrow.modbus import READ_INPUT_REGISTERS, REGISTERS
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+
+SAMPLE_VALUES = {
+    "daily_yield": 12400,
+    "total_yield": 45678000,
+    "internal_temperature": 38.5,
+    "mppt1_voltage": 352.1,
+    "mppt1_current": 7.3,
+    "mppt2_voltage": 348.9,
+    "mppt2_current": 7.1,
+    "total_dc_power": 5048,
+    "phase_a_voltage": 240.2,
+    "phase_b_voltage": 239.8,
+    "phase_c_voltage": 241.0,
+    "inverter_ac_power": 4890,
+    "grid_frequency": 50.0,
+    "meter_ac_power": -1250,
+    "battery_soc": 76.5,
+}
+
+
+class ModbusSimulator:
+    """Modbus TCP server holding a Sungrow inverter's input registers.
+
+    Registers without a value read as 0, like the reserved registers of a real
+    inverter. Every read is recorded in requests as (address, count). Frames
+    queued in garbled are sent, in turn, in place of the next replies.
+    """
+
+    def __init__(self, max_address: int = 0xFFFF) -> None:
+        """Initialize."""
+        self.max_address = max_address
+        self.registers: dict[int, int] = {}
+        self.requests: list[tuple[int, int]] = []
+        self.garbled: list[tuple[int, bytes]] = []
+        self._writers: set[asyncio.StreamWriter] = set()
+        self.port: int | None = None
+        self._server: asyncio.Server | None = None
+
+    def set_value(self, code: str, value: float) -> None:
+        """Store a point's value in its registers, encoded as the inverter would."""
+        register = next(register for register in REGISTERS if register.code == code)
+        raw = round(value / register.scale) & ((1 << (16 * register.count)) - 1)
+        for offset in range(register.count):
+            # 32-bit values are sent low word first
+            self.registers[register.address + offset] = (raw >> (16 * offset)) & 0xFFFF
+
+    def garble(self, length: int, pdu: bytes) -> None:
+        """Send a frame with the given length field and PDU in place of the next reply."""
+        self.garbled.append((length, pdu))
+
+    async def async_start(self, port: int = 0, host: str = "127.0.0.1") -> int:
+        """Start serving, on a free port unless one is given, returning the port."""
+        self._server = await asyncio.start_server(self._async_handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def async_stop(self) -> None:
+        """Stop serving and drop every connection."""
+        if self._server is not None:
+            self._server.close()
+            # close() leaves open connections be, and Server.close_clients() is only in Python 3.13+
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _async_handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer requests on one connection until the client closes it."""
+        self._writers.add(writer)
+        try:
+            while True:
+                transaction, protocol, length, unit_id = struct.unpack(">HHHB", await reader.readexactly(7))
+                pdu = await reader.readexactly(length - 1)
+                reply = self._reply(pdu)
+                length = len(reply) + 1
+                if self.garbled:
+                    length, reply = self.garbled.pop(0)
+                writer.write(struct.pack(">HHHB", transaction, protocol, length, unit_id) + reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+
+    def _reply(self, pdu: bytes) -> bytes:
+        """Return the reply PDU to a request PDU."""
+        function = pdu[0]
+        if function != READ_INPUT_REGISTERS:
+            return bytes([function | 0x80, ILLEGAL_FUNCTION])
+        address, count = struct.unpack(">HH", pdu[1:5])
+        if address + count - 1 > self.max_address:
+            return bytes([function | 0x80, ILLEGAL_DATA_ADDRESS])
+        self.requests.append((address, count))
+        words = [self.registers.get(address + offset, 0) for offset in range(count)]
+        return bytes([function, 2 * count]) + struct.pack(f">{count}H", *words)
+
+
+async def _async_main(port: int) -> None:
+    """Serve the sample values until interrupted."""
+    simulator = ModbusSimulator()
+    for code, value in SAMPLE_VALUES.items():
+        simulator.set_value(code, value)
+    print(f"Sungrow Modbus simulator listening on port {await simulator.async_start(port, '0.0.0.0')}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(_async_main(int(sys.argv[1]) if len(sys.argv) > 1 else 5020))
@@ -0,0 +1,161 @@
+"""Tests for the Sungrow token lifecycle."""
+
+import asyncio
+import time
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pysolarcloud import PySolarCloudException
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.sungrow.auth import SungrowAuth
+from custom_components.sungrow.const import DOMAIN
+
+from .conftest import MOCK_CONFIG_DATA
+
+REFRESH_RESPONSE = {"access_token": "new_access_token", "refresh_token": "new_refresh_token", "expires_in": 3600}
+
+
+def _make_auth(hass: HomeAssistant, expires_in: int | None) -> SungrowAuth:
+    """Create a SungrowAuth whose stored token expires expires_in seconds from now."""
+    tokens = {**MOCK_CONFIG_DATA["tokens"]}
+    if expires_in is not None:
+        tokens["expires_at"] = int(time.time()) + expires_in
+    entry = MockConfigEntry(domain=DOMAIN, data={**MOCK_CONFIG_DATA, "tokens": tokens})
+    entry.add_to_hass(hass)
+
+    auth = SungrowAuth(hass, entry, MagicMock(), "https://gateway.isolarcloud.eu")
+    auth.async_refresh_tokens = AsyncMock(return_value=REFRESH_RESPONSE)
+    return auth
+
+
+async def test_valid_token_not_refreshed(hass: HomeAssistant):
+    """Test a token well within its lifetime is used as is."""
+    auth = _make_auth(hass, expires_in=3600)
+
+    assert await auth.async_get_access_token() == "test_access_token"
+    auth.async_refresh_tokens.assert_not_awaited()
+
+
+async def test_token_without_expiry_not_refreshed(hass: HomeAssistant):
+    """Test tokens with no known expiry are never refreshed proactively."""
+    auth = _make_auth(hass, expires_in=None)
+
+    assert await auth.async_get_access_token() == "test_access_token"
+    auth.async_refresh_tokens.assert_not_awaited()
+
+
+async def test_expiring_token_refreshed_and_persisted(hass: HomeAssistant):
+    """Test a token close to expiry is refreshed first and written back to the entry."""
+    auth = _make_auth(hass, expires_in=60)
+
+    assert await auth.async_get_access_token() == "new_access_token"
+    auth.async_refresh_tokens.assert_awaited_once_with("test_refresh_token")
+
+    tokens = auth.entry.data["tokens"]
+    assert tokens["access_token"] == "new_access_token"
+    assert tokens["refresh_token"] == "new_refresh_token"
+    assert tokens["expires_at"] > time.time() + 3000
+    auth.async_cancel_refresh()
+
+
+async def test_concurrent_callers_share_one_refresh(hass: HomeAssistant):
+    """Test concurrent requests wait on a single in-flight refresh."""
+    auth = _make_auth(hass, expires_in=0)
+    release = asyncio.Event()
+
+    async def _slow_refresh(refresh_token):
+        await release.wait()
+        return REFRESH_RESPONSE
+
+    auth.async_refresh_tokens = AsyncMock(side_effect=_slow_refresh)
+
+    callers = [asyncio.create_task(auth.async_get_access_token()) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*callers) == ["new_access_token"] * 5
+    auth.async_refresh_tokens.assert_awaited_once()
+    auth.async_cancel_refresh()
+
+
+async def test_rejected_refresh_raises(hass: HomeAssistant):
+    """Test a refresh the gateway rejects raises and leaves the entry untouched."""
+    auth = _make_auth(hass, expires_in=0)
+    auth.async_refresh_tokens = AsyncMock(return_value={"error": "invalid_grant"})
+
+    with pytest.raises(PySolarCloudException, match="invalid_grant"):
+        await auth.async_get_access_token()
+
+    assert auth.entry.data["tokens"]["access_token"] == "test_access_token"
+
+    # A later call tries again rather than waiting on the failed refresh
+    auth.async_refresh_tokens = AsyncMock(return_value=REFRESH_RESPONSE)
+    assert await auth.async_get_access_token() == "new_access_token"
+    auth.async_cancel_refresh()
+
+
+async def test_missing_tokens_raises(hass: HomeAssistant):
+    """Test requests fail clearly when the entry has no tokens."""
+    auth = _make_auth(hass, expires_in=3600)
+    auth.tokens = None
+
+    with pytest.raises(PySolarCloudException, match="auth_not_initialised"):
+        await auth.async_get_access_token()
+
+
+async def test_proactive_refresh(hass: HomeAssistant):
+    """Test the token is refreshed on a timer ahead of expiry, without any request."""
+    auth = _make_auth(hass, expires_in=3600)
+    auth.async_schedule_refresh()
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=50))
+    await hass.async_block_till_done()
+    auth.async_refresh_tokens.assert_not_awaited()
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=56))
+    await hass.async_block_till_done()
+    auth.async_refresh_tokens.assert_awaited_once()
+    assert auth.entry.data["tokens"]["access_token"] == "new_access_token"
+
+    # The next refresh is scheduled from the new expiry
+    assert auth._unsub_refresh is not None
+    auth.async_cancel_refresh()
+
+
+def _response(status: int, headers: dict | None = None) -> MagicMock:
+    """Create a mock aiohttp response."""
+    return MagicMock(status=status, headers=headers or {}, read=AsyncMock(return_value=b"{}"))
+
+
+async def test_throttled_request_retried(hass: HomeAssistant):
+    """Test a request the gateway throttles is retried once the backoff has passed."""
+    auth = _make_auth(hass, expires_in=3600)
+    auth.scheduler.rate = 1000
+    ok = _response(200)
+    auth.websession.request = AsyncMock(side_effect=[_response(429, {"Retry-After": "0"}), ok])
+
+    with patch("custom_components.sungrow.ratelimit.random.uniform", return_value=0):
+        assert await auth.request("/openapi/test", {}) is ok
+
+    assert auth.websession.request.await_count == 2
+    assert auth.scheduler.throttled_count == 1
+
+
+async def test_throttled_request_gives_up(hass: HomeAssistant):
+    """Test a request still throttled after RATE_LIMIT_RETRIES raises."""
+    auth = _make_auth(hass, expires_in=3600)
+    auth.scheduler.rate = 1000
+    auth.websession.request = AsyncMock(return_value=_response(429))
+
+    with (
+        patch("custom_components.sungrow.ratelimit.random.uniform", return_value=0),
+        patch("custom_components.sungrow.auth.RATE_LIMIT_RETRIES", 1),
+        pytest.raises(PySolarCloudException, match="rate_limited"),
+    ):
+        await auth.request("/openapi/test", {})
+
+    assert auth.websession.request.await_count == 2
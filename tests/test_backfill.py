@@ -0,0 +1,218 @@
+"""Tests for the Sungrow statistics backfill."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiohttp import ClientError
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.recorder import Recorder
+from homeassistant.components.recorder.models import StatisticMeanType, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_import_statistics, statistics_during_period
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.recorder.common import async_wait_recording_done
+
+from custom_components.sungrow.backfill import StatisticGap, SungrowBackfill, build_statistics, hour_runs
+from custom_components.sungrow.catalogue import SungrowCatalogue
+from custom_components.sungrow.const import BACKFILL_SAMPLE_INTERVAL, CONF_HOST, CONF_LOCAL, DOMAIN
+from custom_components.sungrow.ratelimit import RequestPriority, current_priority
+
+from .conftest import MOCK_CONFIG_DATA
+
+NOW = datetime(2026, 6, 21, 12, 30, tzinfo=UTC)
+HOUR = timedelta(hours=1)
+
+
+@pytest.fixture(autouse=True)
+def mock_recorder_before_hass(async_test_recorder):
+    """Set up the test recorder before hass, so the recorder_mock fixture can be used."""
+
+
+def _hour(hour: int) -> datetime:
+    return NOW.replace(hour=hour, minute=0)
+
+
+def test_hour_runs_split_at_gaps_and_chunk_size():
+    """Test consecutive hours are fetched together, up to the chunk size."""
+    hours = [_hour(1), _hour(2), _hour(3), _hour(4), _hour(7)]
+
+    assert hour_runs(hours, chunk=timedelta(hours=3)) == [
+        (_hour(1), _hour(4)),
+        (_hour(4), _hour(5)),
+        (_hour(7), _hour(8)),
+    ]
+
+
+def test_build_statistics_continues_sum_across_resets():
+    """Test energy sums carry on from the last row, treating a drop as a reset."""
+    gap = StatisticGap(
+        "sensor.daily_yield",
+        "daily_yield",
+        "kWh",
+        True,
+        {_hour(1).timestamp(): {"start": _hour(1).timestamp(), "state": 10.0, "sum": 100.0}},
+        [_hour(2), _hour(3)],
+    )
+    samples = {_hour(2): [11.0, 12.0], _hour(3): [1.5]}
+
+    statistics = build_statistics(gap, samples)
+
+    assert statistics == [
+        {"start": _hour(2), "state": 12.0, "sum": 102.0},
+        {"start": _hour(3), "state": 1.5, "sum": 103.5},
+    ]
+
+
+def test_build_statistics_power_means():
+    """Test power hours get the mean, min and max of their samples."""
+    gap = StatisticGap("sensor.total_active_power", "total_active_power", "kW", False, {}, [_hour(2), _hour(3)])
+
+    statistics = build_statistics(gap, {_hour(2): [1.0, 2.0, 6.0]})
+
+    assert statistics == [{"start": _hour(2), "mean": 3.0, "min": 1.0, "max": 6.0}]
+
+
+def _historical_point(code: str, timestamp: datetime, value: float) -> dict:
+    """Return a point as async_get_historical_data returns it, with a naive local timestamp."""
+    return {
+        "timestamp": dt_util.as_local(timestamp).replace(tzinfo=None),
+        "id": "1",
+        "code": code,
+        "value": value,
+        "unit": "kWh",
+        "name": code,
+    }
+
+
+@pytest.fixture
+async def backfill(hass: HomeAssistant, recorder_mock: Recorder, freezer: FrozenDateTimeFactory):
+    """Return a backfill for an entry with a registered energy sensor whose statistics have a gap."""
+    freezer.move_to(NOW)
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA)
+    entry.add_to_hass(hass)
+    er.async_get(hass).async_get_or_create(
+        "sensor", DOMAIN, "12345_daily_yield", config_entry=entry, suggested_object_id="daily_yield"
+    )
+
+    catalogue = SungrowCatalogue(hass, entry.entry_id)
+    catalogue.plants = {
+        "12345": {
+            "name": "Test Solar Plant",
+            "points": {"daily_yield": {"name": "Daily Yield", "unit": "kWh", "device_class": "energy"}},
+        }
+    }
+
+    metadata = StatisticMetaData(
+        mean_type=StatisticMeanType.NONE,
+        has_sum=True,
+        name=None,
+        source="recorder",
+        statistic_id="sensor.daily_yield",
+        unit_of_measurement="kWh",
+    )
+    async_import_statistics(
+        hass,
+        metadata,
+        [
+            {"start": _hour(6), "state": 5.0, "sum": 50.0},
+            {"start": _hour(7), "state": 6.0, "sum": 51.0},
+            {"start": _hour(10), "state": 9.0, "sum": 54.0},
+        ],
+    )
+    await async_wait_recording_done(hass)
+
+    plants_service = MagicMock()
+    return SungrowBackfill(hass, entry, plants_service, catalogue)
+
+
+async def test_backfill_imports_missing_hours(hass: HomeAssistant, backfill: SungrowBackfill):
+    """Test the hours missing between existing statistics are fetched in one chunk and imported."""
+    priorities = []
+
+    async def _history(plant_id, start, end, *, measure_points=None, interval=None):
+        priorities.append(current_priority())
+        return {
+            "12345": [
+                _historical_point("daily_yield", _hour(8) + timedelta(minutes=55), 7.0),
+                _historical_point("daily_yield", _hour(9) + timedelta(minutes=55), 8.5),
+            ]
+        }
+
+    backfill.plants_service.async_get_historical_data = AsyncMock(side_effect=_history)
+
+    assert await backfill.async_backfill() == 2
+    await async_wait_recording_done(hass)
+
+    backfill.plants_service.async_get_historical_data.assert_awaited_once_with(
+        "12345",
+        dt_util.as_local(_hour(8)).replace(tzinfo=None),
+        dt_util.as_local(_hour(10)).replace(tzinfo=None),
+        measure_points=["daily_yield"],
+        interval=BACKFILL_SAMPLE_INTERVAL,
+    )
+    assert priorities == [RequestPriority.BACKGROUND]
+
+    stats = await hass.async_add_executor_job(
+        statistics_during_period, hass, _hour(0), None, {"sensor.daily_yield"}, "hour", None, {"state", "sum"}
+    )
+    assert [(row["state"], row["sum"]) for row in stats["sensor.daily_yield"]] == [
+        (5.0, 50.0),
+        (6.0, 51.0),
+        (7.0, 52.0),
+        (8.5, 53.5),
+        (9.0, 54.0),
+    ]
+
+
+async def test_backfill_without_gaps_fetches_nothing(hass: HomeAssistant, backfill: SungrowBackfill):
+    """Test nothing is requested once the statistics are complete."""
+    async_import_statistics(
+        hass,
+        StatisticMetaData(
+            mean_type=StatisticMeanType.NONE,
+            has_sum=True,
+            name=None,
+            source="recorder",
+            statistic_id="sensor.daily_yield",
+            unit_of_measurement="kWh",
+        ),
+        [{"start": _hour(8), "state": 7.0, "sum": 52.0}, {"start": _hour(9), "state": 8.0, "sum": 53.0}],
+    )
+    await async_wait_recording_done(hass)
+    backfill.plants_service.async_get_historical_data = AsyncMock()
+
+    assert await backfill.async_backfill() == 0
+    backfill.plants_service.async_get_historical_data.assert_not_called()
+
+
+async def test_backfill_failed_fetch_retried_later(hass: HomeAssistant, backfill: SungrowBackfill):
+    """Test a failed fetch imports nothing and leaves the gap for the next run."""
+    backfill.plants_service.async_get_historical_data = AsyncMock(side_effect=ClientError("Gateway unreachable"))
+
+    assert await backfill.async_backfill() == 0
+
+    backfill.plants_service.async_get_historical_data = AsyncMock(
+        return_value={"12345": [_historical_point("daily_yield", _hour(8) + timedelta(minutes=55), 7.0)]}
+    )
+    assert await backfill.async_backfill() == 1
+
+
+async def test_backfill_skips_points_without_cloud_history(hass: HomeAssistant, backfill: SungrowBackfill):
+    """Test sensors of local plants, or of points iSolarCloud has no history for, aren't backfilled."""
+    backfill.plants_service.async_get_historical_data = AsyncMock(return_value={})
+    hass.config_entries.async_update_entry(backfill.entry, options={CONF_LOCAL: {"12345": {CONF_HOST: "192.0.2.1"}}})
+
+    assert await backfill.async_backfill() == 0
+    backfill.plants_service.async_get_historical_data.assert_not_called()
+
+    hass.config_entries.async_update_entry(backfill.entry, options={})
+    backfill.catalogue.plants["12345"]["points"] = {
+        "inverter_temperature": {"name": "Inverter Temperature", "unit": "kWh", "device_class": "energy"}
+    }
+    er.async_get(hass).async_update_entity("sensor.daily_yield", new_unique_id="12345_inverter_temperature")
+
+    assert await backfill.async_backfill() == 0
+    backfill.plants_service.async_get_historical_data.assert_not_called()
@@ -0,0 +1,214 @@
+"""Benchmarks of setup and update cost as accounts grow, from 1 to 200 plants and 10 to 1,000 points per plant.
+
+Run them with `pytest -m benchmark`. Each run stores its results in
+benchmarks/<version>.json, and any metric that got worse than in the previous
+release's results by more than REGRESSION_TOLERANCE is reported as a warning.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import tracemalloc
+import warnings
+from functools import cache
+from pathlib import Path
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from freezegun import api as freezegun_api
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.sungrow.const import DOMAIN, NIGHT_SCAN_INTERVAL, REALTIME_BATCH_SIZE
+
+from .conftest import MOCK_CONFIG_DATA
+
+pytestmark = pytest.mark.benchmark
+
+RESULTS_DIR = Path(__file__).parent.parent / "benchmarks"
+MANIFEST = Path(__file__).parent.parent / "custom_components" / DOMAIN / "manifest.json"
+
+# (plants, points per plant); the full cross product would mean 200,000 entities
+SCENARIOS = [(1, 10), (1, 1000), (10, 100), (50, 20), (200, 10)]
+
+# Share of each plant's points whose value changes between update cycles
+CHANGED_SHARE = 0.1
+CYCLES = 5
+
+# Metrics this much worse than the previous release's are reported
+REGRESSION_TOLERANCE = 1.25
+
+UNITS = ("kW", "kWh", "V", "%", "")
+
+
+def _wall_clock() -> float:
+    """Return the real time.perf_counter, which the freezer fixture would otherwise stop."""
+    # Looked up on freezegun's own module, which is the only one it leaves unpatched
+    return freezegun_api.real_perf_counter()
+
+
+class BenchmarkRegressionWarning(UserWarning):
+    """A benchmark metric got worse than in the previous release."""
+
+
+def synthetic_account(plants: int, points: int) -> tuple[list[dict], dict[str, dict[str, dict]]]:
+    """Return a plant list and realtime data for an account of plants with points each."""
+    plant_list = [{"ps_id": 100000 + index, "ps_name": f"Plant {index}"} for index in range(plants)]
+    realtime = {
+        str(plant["ps_id"]): {
+            f"point_{index}": {
+                "id": str(index),
+                "code": f"point_{index}",
+                "value": str(index),
+                "unit": UNITS[index % len(UNITS)],
+                "name": f"Point {index}",
+            }
+            for index in range(points)
+        }
+        for plant in plant_list
+    }
+    return plant_list, realtime
+
+
+def _version() -> str:
+    """Return the integration's version."""
+    return json.loads(MANIFEST.read_text())["version"]
+
+
+def _version_key(version: str) -> tuple[int, ...]:
+    """Return a version as a tuple for ordering."""
+    return tuple(int(part) for part in version.split(".") if part.isdigit())
+
+
+@cache
+def _previous_release() -> dict[str, dict[str, float]]:
+    """Return the stored results of the latest release before this one, by scenario."""
+    current = _version_key(_version())
+    stored = sorted(
+        (_version_key(path.stem), path) for path in RESULTS_DIR.glob("*.json") if _version_key(path.stem) < current
+    )
+    if not stored:
+        return {}
+    return json.loads(stored[-1][1].read_text())["scenarios"]
+
+
+@pytest.fixture(scope="session")
+def benchmark_results():
+    """Collect results by scenario, then store them under the current version."""
+    results: dict[str, dict[str, Any]] = {}
+    yield results
+    if not results:
+        return
+
+    path = RESULTS_DIR / f"{_version()}.json"
+    stored = json.loads(path.read_text()) if path.exists() else {"scenarios": {}}
+    for scenario, metrics in results.items():
+        stored["scenarios"].setdefault(scenario, {}).update(metrics)
+    stored |= {"version": _version(), "python": platform.python_version(), "machine": platform.machine()}
+    stored["scenarios"] = dict(
+        sorted(stored["scenarios"].items(), key=lambda item: tuple(map(int, item[0].split("x"))))
+    )
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path.write_text(json.dumps(stored, indent=2) + "\n")
+
+
+def _record(results: dict[str, dict[str, Any]], plants: int, points: int, metrics: dict[str, float]) -> None:
+    """Store a scenario's metrics, warning about any that regressed since the previous release."""
+    scenario = f"{plants}x{points}"
+    previous = _previous_release().get(scenario, {})
+    for metric, value in metrics.items():
+        if (before := previous.get(metric)) and value > before * REGRESSION_TOLERANCE:
+            warnings.warn(
+                f"{scenario} {metric} regressed from {before} to {value}", BenchmarkRegressionWarning, stacklevel=2
+            )
+    results.setdefault(scenario, {}).update(metrics)
+
+
+async def _async_setup(hass: HomeAssistant, mock_plants_service, plants: int, points: int) -> dict:
+    """Set up an entry for a synthetic account, returning its realtime data for the test to change."""
+    plant_list, realtime = synthetic_account(plants, points)
+    mock_plants_service.measure_points = {}
+    mock_plants_service.async_get_plants = AsyncMock(return_value=plant_list)
+    mock_plants_service.async_get_realtime_data = AsyncMock(
+        side_effect=lambda plant_ids, measure_points=None: {plant_id: realtime[plant_id] for plant_id in plant_ids}
+    )
+
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(hass.states.async_entity_ids("sensor")) == plants * points
+    return realtime
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+@pytest.mark.parametrize(("plants", "points"), SCENARIOS)
+async def test_setup_and_update(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    mock_sensor_auth,
+    mock_plants_service,
+    benchmark_results,
+    plants: int,
+    points: int,
+):
+    """Measure setup wall time, and the wall time, state writes and API calls of each update cycle."""
+    started = _wall_clock()
+    realtime = await _async_setup(hass, mock_plants_service, plants, points)
+    setup_seconds = _wall_clock() - started
+
+    changed = max(1, int(points * CHANGED_SHARE))
+    cycle_seconds = []
+    with patch.object(Entity, "async_write_ha_state", autospec=True, side_effect=Entity.async_write_ha_state) as writes:
+        for cycle in range(1, CYCLES + 1):
+            for plant_points in realtime.values():
+                for index in range(changed):
+                    plant_points[f"point_{index}"] = plant_points[f"point_{index}"] | {"value": str(cycle * points)}
+            writes.reset_mock()
+            mock_plants_service.async_get_realtime_data.reset_mock()
+
+            # Every plant is due at least this often, so each tick is one cycle
+            freezer.tick(NIGHT_SCAN_INTERVAL)
+            started = _wall_clock()
+            async_fire_time_changed(hass)
+            # Scheduled refreshes run as background tasks
+            await hass.async_block_till_done(wait_background_tasks=True)
+            cycle_seconds.append(_wall_clock() - started)
+
+            # Only the sensors whose point changed are written, in one call per batch of plants
+            assert writes.call_count == plants * changed
+            assert mock_plants_service.async_get_realtime_data.await_count == -(-plants // REALTIME_BATCH_SIZE)
+
+    _record(
+        benchmark_results,
+        plants,
+        points,
+        {
+            "setup_seconds": round(setup_seconds, 4),
+            "cycle_seconds": round(sorted(cycle_seconds)[len(cycle_seconds) // 2], 4),
+            "state_writes_per_cycle": writes.call_count,
+            "api_calls_per_cycle": mock_plants_service.async_get_realtime_data.await_count,
+        },
+    )
+
+
+@pytest.mark.parametrize("expected_lingering_timers", [True])
+@pytest.mark.parametrize(("plants", "points"), SCENARIOS)
+async def test_memory_per_entity(
+    hass: HomeAssistant, mock_sensor_auth, mock_plants_service, benchmark_results, plants: int, points: int
+):
+    """Measure the memory allocated by setup for each entity."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        await _async_setup(hass, mock_plants_service, plants, points)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    _record(benchmark_results, plants, points, {"memory_per_entity_bytes": allocated // (plants * points)})
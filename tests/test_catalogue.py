@@ -0,0 +1,98 @@
+"""Tests for the persistent plant and point catalogue."""
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.sungrow.catalogue import SungrowCatalogue, describe_point, plant_location
+from custom_components.sungrow.models import parse_point, parse_points
+
+from .conftest import MOCK_REALTIME_DATA
+
+# ---------------------------------------------------------------------------
+# describe_point
+# ---------------------------------------------------------------------------
+
+
+def test_describe_point_power():
+    """Test power units are catalogued with the power device class."""
+    info = describe_point(parse_point({"code": "p", "value": 5.0, "unit": "kW", "name": "Power"}))
+
+    assert info == {"name": "Power", "unit": "kW", "device_class": "power", "enabled_default": True}
+
+
+def test_describe_point_energy():
+    """Test energy units are catalogued with the energy device class."""
+    assert describe_point(parse_point({"value": 1.0, "unit": "kWh"}))["device_class"] == "energy"
+
+
+def test_describe_point_no_device_class():
+    """Test other units are catalogued without a device class."""
+    assert describe_point(parse_point({"value": "Running", "unit": ""}))["device_class"] is None
+
+
+def test_describe_point_unknown_value_disabled():
+    """Test points without a usable value are catalogued as disabled by default."""
+    for value in (None, "", "  ", "Unknown"):
+        assert describe_point(parse_point({"value": value, "unit": ""}))["enabled_default"] is False
+
+
+def test_plant_location():
+    """Test plant coordinates are parsed from the plant list, ignoring unset ones."""
+    assert plant_location({"latitude": "51.5", "longitude": -0.12}) == [51.5, -0.12]
+    assert plant_location({"latitude": 0, "longitude": 0}) is None
+    assert plant_location({"latitude": "", "longitude": None}) is None
+    assert plant_location({}) is None
+
+
+# ---------------------------------------------------------------------------
+# SungrowCatalogue
+# ---------------------------------------------------------------------------
+
+
+async def test_update_plant_returns_new_points(hass: HomeAssistant):
+    """Test only points not seen before are reported as new."""
+    catalogue = SungrowCatalogue(hass, "entry")
+
+    new_points = catalogue.async_update_plant("12345", "Test Solar Plant", parse_points(MOCK_REALTIME_DATA["12345"]))
+    assert set(new_points) == {"total_active_power", "daily_energy", "device_status"}
+
+    extra = {"battery_soc": {"code": "battery_soc", "value": 80, "unit": "%", "name": "Battery SOC"}}
+    new_points = catalogue.async_update_plant(
+        "12345", "Test Solar Plant", parse_points({**MOCK_REALTIME_DATA["12345"], **extra})
+    )
+    assert set(new_points) == {"battery_soc"}
+
+
+async def test_update_plant_keeps_missing_points(hass: HomeAssistant):
+    """Test points absent from a later payload stay in the catalogue."""
+    catalogue = SungrowCatalogue(hass, "entry")
+    catalogue.async_update_plant("12345", "Test Solar Plant", parse_points(MOCK_REALTIME_DATA["12345"]))
+
+    assert catalogue.async_update_plant("12345", "Renamed Plant", {}) == {}
+    assert len(catalogue.plants["12345"]["points"]) == 3
+    assert catalogue.plants["12345"]["name"] == "Renamed Plant"
+
+
+async def test_catalogue_persists(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test the catalogue round-trips through storage."""
+    catalogue = SungrowCatalogue(hass, "entry")
+    catalogue.async_update_plant("12345", "Test Solar Plant", parse_points(MOCK_REALTIME_DATA["12345"]))
+    catalogue.async_update_plant("67890", "Second Plant", parse_points(MOCK_REALTIME_DATA["67890"]))
+    catalogue.async_remove_plant("67890")
+    await hass.async_stop(force=True)
+
+    assert set(hass_storage["sungrow.entry"]["data"]["plants"]) == {"12345"}
+
+    restored = SungrowCatalogue(hass, "entry")
+    await restored.async_load()
+    assert restored.plants == catalogue.plants
+
+
+async def test_catalogue_remove(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test removing the catalogue deletes it from storage."""
+    hass_storage["sungrow.entry"] = {"version": 1, "key": "sungrow.entry", "data": {"plants": {}}}
+
+    await SungrowCatalogue(hass, "entry").async_remove()
+
+    assert "sungrow.entry" not in hass_storage
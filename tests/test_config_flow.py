@@ -1,26 +1,35 @@
 """Tests for the Sungrow iSolarCloud config flow."""
 
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from aiohttp import ClientError
 from homeassistant import config_entries, data_entry_flow
 from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.sungrow.const import (
     CONF_APP_ID,
     CONF_APP_KEY,
+    CONF_APP_SECRET,
+    CONF_GATEWAY,
+    CONF_MINIMAL_ATTRIBUTES,
+    CONF_PROBE_GATEWAYS,
     DOMAIN,
 )
+from custom_components.sungrow.probe import GatewayProbe
+from custom_components.sungrow.view import DATA_CALLBACK_VIEW
 
-from .conftest import MOCK_USER_INPUT
+from .conftest import MOCK_CONFIG_DATA, MOCK_USER_INPUT
+from .modbus_simulator import ModbusSimulator
 
 
 @pytest.fixture(autouse=True)
 def mock_client_session():
-    """Mock async_get_clientsession to prevent background thread creation."""
+    """Mock the gateway session to prevent background thread creation."""
     with patch(
-        "custom_components.sungrow.config_flow.async_get_clientsession",
+        "custom_components.sungrow.config_flow.async_get_session",
         return_value=MagicMock(),
     ):
         yield
@@ -55,6 +64,65 @@ async def test_user_step_advances_to_auth(hass: HomeAssistant, mock_auth):
     assert result2["step_id"] == "auth"
     # The auth URL should be present in description placeholders
     assert "auth_url" in result2["description_placeholders"]
+    # The callback view is registered once a flow needs it
+    assert hass.data[DATA_CALLBACK_VIEW]
+
+
+# ---------------------------------------------------------------------------
+# Gateway step
+# ---------------------------------------------------------------------------
+
+
+async def test_gateway_step_recommends_fastest_gateway(hass: HomeAssistant, mock_auth):
+    """Test probing the gateways recommends the fastest working one, and the choice reaches the entry."""
+    probes = [
+        GatewayProbe("Europe", 0.08, 0.3, True),
+        GatewayProbe("Australia", 0.05, 0.1, True),
+        GatewayProbe("China", error="timed out"),
+    ]
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
+    with patch(
+        "custom_components.sungrow.config_flow.async_probe_gateways", AsyncMock(return_value=probes)
+    ) as mock_probe:
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={**MOCK_USER_INPUT, CONF_PROBE_GATEWAYS: True}
+        )
+
+    mock_probe.assert_awaited_once_with(
+        hass, result["flow_id"], MOCK_USER_INPUT[CONF_APP_KEY], MOCK_USER_INPUT[CONF_APP_SECRET]
+    )
+    assert result2["step_id"] == "gateway"
+    assert result2["errors"] == {}
+    assert result2["description_placeholders"]["recommended"] == "Australia"
+    assert "- Australia: 50 ms to connect, 100 ms to answer" in result2["description_placeholders"]["results"]
+    assert "- China: timed out" in result2["description_placeholders"]["results"]
+    assert result2["data_schema"]({})[CONF_GATEWAY] == "Australia"
+
+    result3 = await hass.config_entries.flow.async_configure(result["flow_id"], user_input={CONF_GATEWAY: "Australia"})
+    assert result3["step_id"] == "auth"
+
+    with patch("custom_components.sungrow.async_setup_entry", return_value=True):
+        result4 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={"code": "auth_code_from_provider"}
+        )
+        await hass.async_block_till_done()
+
+    assert result4["data"][CONF_GATEWAY] == "Australia"
+    assert result4["data"][CONF_PROBE_GATEWAYS] is True
+
+
+async def test_gateway_step_no_working_gateway(hass: HomeAssistant, mock_auth):
+    """Test an error is shown, keeping the chosen region, when no gateway accepts the credentials."""
+    probes = [GatewayProbe("Europe", 0.08, 0.3, False, "rejected the credentials")]
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
+    with patch("custom_components.sungrow.config_flow.async_probe_gateways", AsyncMock(return_value=probes)):
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={**MOCK_USER_INPUT, CONF_PROBE_GATEWAYS: True}
+        )
+
+    assert result2["step_id"] == "gateway"
+    assert result2["errors"] == {"base": "no_gateway"}
+    assert result2["data_schema"]({})[CONF_GATEWAY] == MOCK_USER_INPUT[CONF_GATEWAY]
 
 
 # ---------------------------------------------------------------------------
@@ -88,6 +156,22 @@ async def test_auth_step_success(hass: HomeAssistant, mock_auth):
     assert result3["data"][CONF_APP_KEY] == MOCK_USER_INPUT[CONF_APP_KEY]
 
 
+async def test_auth_step_logs_no_secrets(hass: HomeAssistant, mock_auth, caplog: pytest.LogCaptureFixture):
+    """Test the app secret, authorization code and tokens never reach the log."""
+    caplog.set_level("DEBUG", logger="custom_components.sungrow")
+    result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
+    await hass.config_entries.flow.async_configure(result["flow_id"], user_input=MOCK_USER_INPUT)
+    with patch("custom_components.sungrow.async_setup_entry", return_value=True):
+        await hass.config_entries.flow.async_configure(
+            result["flow_id"], user_input={"code": "auth_code_from_provider"}
+        )
+        await hass.async_block_till_done()
+
+    assert "Received tokens" in caplog.text
+    for secret in ("test_app_secret", "auth_code_from_provider", "test_access_token", "test_refresh_token"):
+        assert secret not in caplog.text
+
+
 # ---------------------------------------------------------------------------
 # Step 2: Auth step — code from URL
 # ---------------------------------------------------------------------------
@@ -182,8 +266,8 @@ async def test_auth_step_unexpected_error(hass: HomeAssistant, mock_auth):
 
 
 async def test_auth_step_library_missing(hass: HomeAssistant):
-    """Test abort when pysolarcloud Auth is not installed."""
-    with patch("custom_components.sungrow.config_flow.Auth", None):
+    """Test abort when pysolarcloud is not installed."""
+    with patch("custom_components.sungrow.config_flow.async_import_module", side_effect=ImportError):
         result = await hass.config_entries.flow.async_init(DOMAIN, context={"source": config_entries.SOURCE_USER})
         result2 = await hass.config_entries.flow.async_configure(
             result["flow_id"],
@@ -239,3 +323,118 @@ async def test_auth_step_url_without_code_anywhere(hass: HomeAssistant, mock_aut
 
     assert result3["type"] == data_entry_flow.FlowResultType.FORM
     assert result3["errors"]["base"] == "unknown"
+
+
+# ---------------------------------------------------------------------------
+# Options flow
+# ---------------------------------------------------------------------------
+
+
+async def test_options_flow(hass: HomeAssistant):
+    """Test the options flow stores the minimal attributes option."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["step_id"] == "init"
+
+    result2 = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={CONF_MINIMAL_ATTRIBUTES: True}
+    )
+
+    assert result2["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert entry.options == {CONF_MINIMAL_ATTRIBUTES: True}
+
+
+async def test_options_flow_plant_points(hass: HomeAssistant, hass_storage: dict[str, Any]):
+    """Test choosing a plant's points in the options flow."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy(), options={CONF_MINIMAL_ATTRIBUTES: True})
+    entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}",
+        "data": {
+            "plants": {
+                "12345": {
+                    "name": "Test Solar Plant",
+                    "points": {"daily_energy": {"name": "Daily Energy"}, "device_status": {"name": None}},
+                }
+            }
+        },
+    }
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    result2 = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={CONF_MINIMAL_ATTRIBUTES: True, "plant": "12345"}
+    )
+    assert result2["step_id"] == "points"
+    assert result2["description_placeholders"] == {"plant": "Test Solar Plant"}
+
+    result3 = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={"groups": ["battery"], "include": ["daily_energy"], "exclude": []}
+    )
+
+    assert result3["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert entry.options == {
+        CONF_MINIMAL_ATTRIBUTES: True,
+        "points": {"12345": {"groups": ["battery"], "include": ["daily_energy"], "exclude": []}},
+    }
+
+    # Clearing every choice goes back to fetching all of the plant's points
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={CONF_MINIMAL_ATTRIBUTES: True, "plant": "12345"}
+    )
+    await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={"groups": [], "include": [], "exclude": []}
+    )
+
+    assert entry.options == {CONF_MINIMAL_ATTRIBUTES: True, "points": {}}
+
+
+async def test_options_flow_local_host(
+    hass: HomeAssistant, hass_storage: dict[str, Any], modbus_simulator: ModbusSimulator
+):
+    """Test a plant's local host is checked against the inverter before it is stored."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}",
+        "data": {"plants": {"12345": {"name": "Test Solar Plant", "points": {}}}},
+    }
+    points = {"groups": [], "include": [], "exclude": []}
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={CONF_MINIMAL_ATTRIBUTES: False, "plant": "12345"}
+    )
+
+    # Nothing answers on this port
+    await modbus_simulator.async_stop()
+    result2 = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={**points, "host": "127.0.0.1", "port": modbus_simulator.port}
+    )
+    assert result2["type"] == data_entry_flow.FlowResultType.FORM
+    assert result2["errors"] == {"host": "cannot_connect"}
+
+    await modbus_simulator.async_start(modbus_simulator.port)
+    result3 = await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={**points, "host": "127.0.0.1", "port": modbus_simulator.port}
+    )
+    assert result3["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert entry.options == {
+        CONF_MINIMAL_ATTRIBUTES: False,
+        "points": {},
+        "local": {"12345": {"host": "127.0.0.1", "port": modbus_simulator.port}},
+    }
+
+    # Clearing the host goes back to iSolarCloud
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    await hass.config_entries.options.async_configure(
+        result["flow_id"], user_input={CONF_MINIMAL_ATTRIBUTES: False, "plant": "12345"}
+    )
+    await hass.config_entries.options.async_configure(result["flow_id"], user_input={**points, "host": ""})
+
+    assert entry.options == {CONF_MINIMAL_ATTRIBUTES: False, "points": {}}
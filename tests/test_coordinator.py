@@ -0,0 +1,686 @@
+"""Tests for the Sungrow data update coordinators."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.sungrow.const import (
+    BATTERY_NIGHT_SCAN_INTERVAL,
+    DAY_SCAN_INTERVAL,
+    LOCAL_SCAN_INTERVAL,
+    NIGHT_SCAN_INTERVAL,
+    SOURCE_CLOUD,
+    SOURCE_LOCAL,
+    UPSTREAM_UPDATE_DELAY,
+)
+from custom_components.sungrow.coordinator import (
+    SCAN_INTERVAL,
+    SungrowAccountCoordinator,
+    SungrowDeviceCoordinator,
+    SungrowLocalPlantCoordinator,
+    SungrowPlantCoordinator,
+)
+from custom_components.sungrow.modbus import ModbusClient, ModbusPlants
+from custom_components.sungrow.models import PointSelection, parse_points
+
+from .conftest import MOCK_DEVICE_DATA, MOCK_REALTIME_DATA
+from .modbus_simulator import ModbusSimulator
+
+MIDDAY = datetime(2026, 6, 21, 12, 0, tzinfo=UTC)
+
+# ---------------------------------------------------------------------------
+# SungrowPlantCoordinator unit tests
+# ---------------------------------------------------------------------------
+
+
+class TestSungrowPlantCoordinator:
+    """Unit tests for the per-plant coordinator."""
+
+    async def test_update_data_success(self, hass: HomeAssistant):
+        """Test successful data fetch returns plant data."""
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(return_value=MOCK_REALTIME_DATA)
+        mock_entry = MagicMock()
+
+        coordinator = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "12345", "Test Plant")
+        data = await coordinator._async_update_data()
+
+        assert "total_active_power" in data
+        assert data["total_active_power"].value == 5.23
+
+    async def test_update_data_missing_plant(self, hass: HomeAssistant):
+        """Test returns empty dict when plant_id is not in response."""
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(return_value={"99999": {}})
+        mock_entry = MagicMock()
+
+        coordinator = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "12345", "Test Plant")
+        data = await coordinator._async_update_data()
+
+        assert data == {}
+
+    async def test_update_data_api_error(self, hass: HomeAssistant):
+        """Test API error raises UpdateFailed."""
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(side_effect=Exception("API down"))
+        mock_entry = MagicMock()
+
+        coordinator = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "12345", "Test Plant")
+
+        with pytest.raises(UpdateFailed, match="Error communicating with API"):
+            await coordinator._async_update_data()
+
+    async def test_plant_does_not_poll_on_its_own(self, hass: HomeAssistant):
+        """Test plant coordinators leave scheduled polling to the account coordinator."""
+        coordinator = SungrowPlantCoordinator(hass, MagicMock(), MagicMock(), "12345", "Test Plant")
+
+        assert coordinator.update_interval is None
+
+    async def test_only_changed_points_notified(self, hass: HomeAssistant):
+        """Test an update only wakes the listeners whose point changed."""
+        coordinator = SungrowPlantCoordinator(hass, MagicMock(), MagicMock(), "12345", "Test Plant")
+        power, energy, other = MagicMock(), MagicMock(), MagicMock()
+        unsubs = [
+            coordinator.async_add_listener(power, "power"),
+            coordinator.async_add_listener(energy, "energy"),
+            coordinator.async_add_listener(other),
+        ]
+
+        coordinator.async_set_updated_data(parse_points({"power": {"value": "1"}, "energy": {"value": "10"}}))
+        coordinator.async_set_updated_data(parse_points({"power": {"value": "2"}, "energy": {"value": "10"}}))
+
+        assert power.call_count == 2
+        assert energy.call_count == 1
+        assert other.call_count == 2
+
+        # Availability changes reach every listener, whatever the data
+        coordinator.async_set_account_error(UpdateFailed("API down"))
+        coordinator.async_set_updated_data(parse_points({"power": {"value": "2"}, "energy": {"value": "10"}}))
+
+        assert energy.call_count == 3
+        for unsub in unsubs:
+            unsub()
+
+    @pytest.mark.parametrize(
+        ("now", "data", "expected"),
+        [
+            # Midday in London
+            (datetime(2026, 6, 21, 12, 0, tzinfo=UTC), {}, DAY_SCAN_INTERVAL),
+            # Just before sunrise, inside the daylight margin
+            (datetime(2026, 6, 21, 3, 30, tzinfo=UTC), {}, DAY_SCAN_INTERVAL),
+            # Middle of the night
+            (datetime(2026, 6, 21, 0, 0, tzinfo=UTC), {}, NIGHT_SCAN_INTERVAL),
+            (
+                datetime(2026, 6, 21, 0, 0, tzinfo=UTC),
+                {"battery_level_soc": {"value": "80"}},
+                BATTERY_NIGHT_SCAN_INTERVAL,
+            ),
+            # Battery points reported as unknown don't count as a battery
+            (datetime(2026, 6, 21, 0, 0, tzinfo=UTC), {"battery_level_soc": {"value": None}}, NIGHT_SCAN_INTERVAL),
+        ],
+    )
+    async def test_poll_interval_follows_the_sun(self, hass: HomeAssistant, now, data, expected):
+        """Test plants are polled quickly in daylight and back off at night."""
+        coordinator = SungrowPlantCoordinator(hass, MagicMock(), MagicMock(), "12345", "Test Plant")
+        coordinator.async_set_location(51.5, -0.12)
+        coordinator.data = parse_points(data)
+
+        assert coordinator.async_get_poll_interval(now) == expected
+
+    async def test_poll_interval_uses_home_location(self, hass: HomeAssistant):
+        """Test plants without coordinates fall back to Home Assistant's location."""
+        coordinator = SungrowPlantCoordinator(hass, MagicMock(), MagicMock(), "12345", "Test Plant")
+
+        # The test instance is in San Diego, where 20:00 UTC is midday
+        assert coordinator.async_get_poll_interval(datetime(2026, 6, 21, 20, 0, tzinfo=UTC)) == DAY_SCAN_INTERVAL
+        assert coordinator.async_get_poll_interval(datetime(2026, 6, 21, 9, 0, tzinfo=UTC)) == NIGHT_SCAN_INTERVAL
+
+    def _observe(self, coordinator, *polls):
+        """Feed a sequence of (minutes past midday, value) scheduled polls to a plant."""
+        for minutes, value in polls:
+            coordinator.async_observe_poll(parse_points({"p1": {"value": value}}), MIDDAY + timedelta(minutes=minutes))
+
+    async def test_poll_aligns_to_upstream_updates(self, hass: HomeAssistant):
+        """Test the upstream update phase is learned from value changes and polls are aligned to it."""
+        coordinator = SungrowPlantCoordinator(hass, MagicMock(), MagicMock(), "12345", "Test Plant")
+        coordinator.async_set_location(51.5, -0.12)
+
+        # The update landed between 1 and 2 minutes past, so the next is due between 6 and 7
+        self._observe(coordinator, (0, "1"), (1, "1"), (2, "2"))
+        # The window is wider than the tolerance, so its middle is probed first
+        assert coordinator.async_get_poll_interval(MIDDAY + timedelta(minutes=2)) == timedelta(minutes=4, seconds=30)
+
+        # Nothing new at 6:30 narrows the window, after which polls land just after each update
+        self._observe(coordinator, (6.5, "2"))
+        assert coordinator.async_get_poll_interval(MIDDAY + timedelta(minutes=6.5)) == (
+            timedelta(seconds=30) + UPSTREAM_UPDATE_DELAY
+        )
+        self._observe(coordinator, (7 + UPSTREAM_UPDATE_DELAY.total_seconds() / 60, "3"))
+        assert coordinator._expected_update == (MIDDAY + timedelta(minutes=11.5), MIDDAY + timedelta(minutes=12))
+
+    async def test_poll_alignment_resets_on_missed_update(self, hass: HomeAssistant):
+        """Test polling falls back to the base interval when an update doesn't land when expected."""
+        coordinator = SungrowPlantCoordinator(hass, MagicMock(), MagicMock(), "12345", "Test Plant")
+        coordinator.async_set_location(51.5, -0.12)
+
+        self._observe(coordinator, (0, "1"), (1, "2"), (6.5, "2"))
+        assert coordinator._expected_update is None
+        assert coordinator.async_get_poll_interval(MIDDAY + timedelta(minutes=6.5)) == DAY_SCAN_INTERVAL
+
+    async def test_poll_alignment_not_applied_at_night(self, hass: HomeAssistant):
+        """Test plants backing off at night aren't pulled forward to every upstream update."""
+        coordinator = SungrowPlantCoordinator(hass, MagicMock(), MagicMock(), "12345", "Test Plant")
+        coordinator.async_set_location(51.5, -0.12)
+        midnight = datetime(2026, 6, 21, 0, 0, tzinfo=UTC)
+        coordinator.async_observe_poll(parse_points({"p1": {"value": "1"}}), midnight)
+        coordinator.async_observe_poll(parse_points({"p1": {"value": "2"}}), midnight + timedelta(minutes=1))
+
+        assert coordinator.async_get_poll_interval(midnight + timedelta(minutes=1)) == NIGHT_SCAN_INTERVAL
+
+
+# ---------------------------------------------------------------------------
+# SungrowAccountCoordinator unit tests
+# ---------------------------------------------------------------------------
+
+
+class TestSungrowAccountCoordinator:
+    """Unit tests for the batched account coordinator."""
+
+    async def test_update_data_single_call(self, hass: HomeAssistant):
+        """Test all plants are fetched in one realtime-data call."""
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(return_value=MOCK_REALTIME_DATA)
+
+        coordinator = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, ["12345", "67890"])
+        data = await coordinator._async_update_data()
+
+        mock_plants.async_get_realtime_data.assert_awaited_once_with(["12345", "67890"], measure_points=None)
+        assert data == {plant_id: parse_points(points) for plant_id, points in MOCK_REALTIME_DATA.items()}
+
+    async def test_update_data_batches_large_fleets(self, hass: HomeAssistant):
+        """Test plant IDs are split into REALTIME_BATCH_SIZE sized requests."""
+        plant_ids = [str(i) for i in range(5)]
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(
+            side_effect=lambda ids, measure_points=None: {i: {} for i in ids}
+        )
+
+        with patch("custom_components.sungrow.coordinator.REALTIME_BATCH_SIZE", 2):
+            coordinator = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, plant_ids)
+            data = await coordinator._async_update_data()
+
+        batches = [call.args[0] for call in mock_plants.async_get_realtime_data.await_args_list]
+        assert batches == [["0", "1"], ["2", "3"], ["4"]]
+        assert set(data) == set(plant_ids)
+
+    async def test_update_data_api_error(self, hass: HomeAssistant):
+        """Test API error raises UpdateFailed."""
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(side_effect=Exception("API down"))
+
+        coordinator = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, ["12345"])
+
+        with pytest.raises(UpdateFailed, match="Error communicating with API"):
+            await coordinator._async_update_data()
+
+    async def test_add_plant_dispatches_slice(self, hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+        """Test attached plant coordinators receive only their own plant's data."""
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(return_value=MOCK_REALTIME_DATA)
+        mock_entry = MagicMock()
+
+        account = SungrowAccountCoordinator(hass, mock_entry, mock_plants, ["12345", "67890"])
+        plant = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "67890", "Second Plant")
+
+        await account.async_refresh()
+        unsub = account.async_add_plant(plant)
+
+        # The current data is handed over straight away
+        assert plant.data == parse_points(MOCK_REALTIME_DATA["67890"])
+
+        freezer.tick(SCAN_INTERVAL)
+        await account.async_refresh()
+        unsub()
+
+        # Subsequent cycles only ever hit the API from the account coordinator
+        assert mock_plants.async_get_realtime_data.await_count == 2
+        assert plant.data == parse_points(MOCK_REALTIME_DATA["67890"])
+        assert plant.last_update_success is True
+
+    async def test_add_plant_propagates_failure(self, hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+        """Test a failed account update marks attached plants unavailable."""
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(return_value=MOCK_REALTIME_DATA)
+        mock_entry = MagicMock()
+
+        account = SungrowAccountCoordinator(hass, mock_entry, mock_plants, ["12345"])
+        plant = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "12345", "Test Plant")
+        await account.async_refresh()
+        unsub = account.async_add_plant(plant)
+
+        mock_plants.async_get_realtime_data.side_effect = Exception("API down")
+        freezer.tick(SCAN_INTERVAL)
+        await account.async_refresh()
+        unsub()
+
+        assert plant.last_update_success is False
+        assert isinstance(plant.last_exception, UpdateFailed)
+
+    async def test_update_data_partial_failure(self, hass: HomeAssistant):
+        """Test a failing batch only marks its own plants as failed."""
+
+        async def _realtime(plant_ids, measure_points=None):
+            if "67890" in plant_ids:
+                raise Exception("Gateway error")
+            return {plant_id: MOCK_REALTIME_DATA[plant_id] for plant_id in plant_ids}
+
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(side_effect=_realtime)
+
+        with patch("custom_components.sungrow.coordinator.REALTIME_BATCH_SIZE", 1):
+            coordinator = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, ["12345", "67890"])
+            data = await coordinator._async_update_data()
+
+        assert data == {"12345": parse_points(MOCK_REALTIME_DATA["12345"])}
+        assert set(coordinator.plant_errors) == {"67890"}
+
+    async def test_update_data_records_plant_health(self, hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+        """Test each cycle records every polled plant's API calls and outcome in its health, shared with its plant."""
+        freezer.move_to(MIDDAY)
+
+        async def _realtime(plant_ids, measure_points=None):
+            if "67890" in plant_ids:
+                raise Exception("Gateway error")
+            return {plant_id: MOCK_REALTIME_DATA[plant_id] for plant_id in plant_ids}
+
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(side_effect=_realtime)
+        mock_entry = MagicMock()
+
+        with patch("custom_components.sungrow.coordinator.REALTIME_BATCH_SIZE", 1):
+            account = SungrowAccountCoordinator(hass, mock_entry, mock_plants, ["12345", "67890"])
+            plant = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "12345", "Test Plant")
+            account.async_add_plant(plant)
+            await account._async_update_data()
+            freezer.tick(NIGHT_SCAN_INTERVAL)
+            await account._async_update_data()
+
+        healthy, failing = account.plant_health["12345"], account.plant_health["67890"]
+        assert plant.health is healthy
+        assert healthy.last_success == MIDDAY + NIGHT_SCAN_INTERVAL
+        assert healthy.consecutive_failures == 0
+        assert healthy.last_duration is not None
+        assert failing.last_success is None
+        assert failing.consecutive_failures == 2
+        assert healthy.api_calls(MIDDAY + NIGHT_SCAN_INTERVAL) == 2
+        # Calls drop out of the count an hour after they were made
+        assert healthy.api_calls(MIDDAY + timedelta(hours=1)) == 1
+
+    async def test_update_data_slow_batch_times_out(self, hass: HomeAssistant):
+        """Test a batch that exceeds REQUEST_TIMEOUT doesn't block the others."""
+
+        async def _realtime(plant_ids, measure_points=None):
+            if "67890" in plant_ids:
+                await asyncio.sleep(10)
+            return {plant_id: MOCK_REALTIME_DATA[plant_id] for plant_id in plant_ids}
+
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(side_effect=_realtime)
+
+        with (
+            patch("custom_components.sungrow.coordinator.REALTIME_BATCH_SIZE", 1),
+            patch("custom_components.sungrow.coordinator.REQUEST_TIMEOUT", 0.01),
+        ):
+            coordinator = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, ["12345", "67890"])
+            data = await coordinator._async_update_data()
+
+        assert set(data) == {"12345"}
+        assert isinstance(coordinator.plant_errors["67890"], TimeoutError)
+
+    async def test_requests_are_bounded(self, hass: HomeAssistant):
+        """Test no more than MAX_CONCURRENT_REQUESTS calls are in flight at once."""
+        in_flight = 0
+        peak = 0
+
+        async def _realtime(plant_ids, measure_points=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return {plant_id: {} for plant_id in plant_ids}
+
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(side_effect=_realtime)
+
+        with (
+            patch("custom_components.sungrow.coordinator.REALTIME_BATCH_SIZE", 1),
+            patch("custom_components.sungrow.coordinator.MAX_CONCURRENT_REQUESTS", 2),
+        ):
+            coordinator = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, [str(i) for i in range(6)])
+            await coordinator._async_update_data()
+
+        assert mock_plants.async_get_realtime_data.await_count == 6
+        assert peak == 2
+
+    async def test_first_refresh_retries_failed_batch_per_plant(
+        self, hass: HomeAssistant, freezer: FrozenDateTimeFactory
+    ):
+        """Test plants from a failed batch are refetched one by one on the first refresh."""
+
+        async def _realtime(plant_ids, measure_points=None):
+            if len(plant_ids) > 1:
+                raise Exception("Batch rejected")
+            if plant_ids == ["67890"]:
+                raise Exception("Broken plant")
+            return {plant_id: MOCK_REALTIME_DATA[plant_id] for plant_id in plant_ids}
+
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(side_effect=_realtime)
+
+        coordinator = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, ["12345", "67890"])
+        await coordinator.async_refresh()
+
+        assert coordinator.last_update_success is True
+        assert coordinator.data == {"12345": parse_points(MOCK_REALTIME_DATA["12345"])}
+        assert set(coordinator.plant_errors) == {"67890"}
+        assert mock_plants.async_get_realtime_data.await_count == 3
+
+        # Later cycles keep the batch intact rather than fanning out again
+        freezer.tick(SCAN_INTERVAL)
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success is False
+        assert mock_plants.async_get_realtime_data.await_count == 4
+
+    async def test_only_due_plants_are_polled(self, hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+        """Test each cycle fetches only the plants whose next poll has come round."""
+        mock_plants = MagicMock()
+        mock_plants.async_get_realtime_data = AsyncMock(
+            side_effect=lambda ids, measure_points=None: {i: {} for i in ids}
+        )
+        mock_entry = MagicMock()
+
+        account = SungrowAccountCoordinator(hass, mock_entry, mock_plants, ["12345", "67890"])
+        fast = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "12345", "Test Plant")
+        slow = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "67890", "Second Plant")
+        fast.async_get_poll_interval = MagicMock(return_value=timedelta(minutes=1))
+        slow.async_get_poll_interval = MagicMock(return_value=timedelta(minutes=10))
+        unsubs = [account.async_add_plant(fast), account.async_add_plant(slow)]
+
+        await account.async_refresh()
+        assert account.update_interval == timedelta(minutes=1)
+
+        freezer.tick(timedelta(minutes=1))
+        await account.async_refresh()
+        for unsub in unsubs:
+            unsub()
+
+        batches = [call.args[0] for call in mock_plants.async_get_realtime_data.await_args_list]
+        assert batches == [["12345", "67890"], ["12345"]]
+        # The plant that wasn't due keeps its last data
+        assert set(account.data) == {"12345", "67890"}
+        assert account.polled_plant_ids == {"12345"}
+
+    async def test_only_selected_points_requested(self, hass: HomeAssistant):
+        """Test plants with chosen points request only those, batched apart from plants requesting others."""
+        mock_plants = MagicMock()
+        mock_plants.measure_points = {"1": "total_active_power", "2": "daily_energy", "3": "device_status"}
+        realtime = {**MOCK_REALTIME_DATA, "11111": MOCK_REALTIME_DATA["12345"]}
+        mock_plants.async_get_realtime_data = AsyncMock(
+            side_effect=lambda ids, measure_points=None: {i: realtime[i] for i in ids}
+        )
+        selections = {
+            "12345": PointSelection(include=frozenset({"daily_energy"})),
+            "67890": PointSelection(exclude=frozenset(mock_plants.measure_points.values())),
+        }
+
+        coordinator = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, ["12345", "67890", "11111"], selections)
+        data = await coordinator._async_update_data()
+
+        calls = [
+            (call.args[0], call.kwargs["measure_points"])
+            for call in mock_plants.async_get_realtime_data.await_args_list
+        ]
+        # The plant with every point deselected isn't requested at all
+        assert sorted(calls, key=str) == [(["11111"], None), (["12345"], ["daily_energy"])]
+        assert set(data["12345"]) == {"daily_energy"}
+        assert data["67890"] == {}
+        assert set(data["11111"]) == set(MOCK_REALTIME_DATA["12345"])
+
+    async def test_tiers_poll_independently(self, hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+        """Test slower tiers are left out of cycles they aren't due in, keeping their last values."""
+        mock_plants = MagicMock()
+        mock_plants.measure_points = {"1": "total_active_power", "2": "daily_energy", "3": "total_yield"}
+        payload = {
+            "total_active_power": {"value": "1"},
+            "daily_energy": {"value": "2"},
+            "total_yield": {"value": "3"},
+        }
+        mock_plants.async_get_realtime_data = AsyncMock(
+            side_effect=lambda ids, measure_points=None: {
+                "12345": {
+                    code: point for code, point in payload.items() if not measure_points or code in measure_points
+                }
+            }
+        )
+        account = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, ["12345"])
+        plant = SungrowPlantCoordinator(hass, MagicMock(), mock_plants, "12345", "Test Plant")
+        plant.async_get_poll_interval = MagicMock(return_value=timedelta(minutes=1))
+        unsub = account.async_add_plant(plant)
+
+        await account.async_refresh()
+        payload["total_active_power"] = {"value": "10"}
+        for _ in range(15):
+            freezer.tick(timedelta(minutes=1))
+            await account.async_refresh()
+        unsub()
+
+        requested = [call.kwargs["measure_points"] for call in mock_plants.async_get_realtime_data.await_args_list]
+        assert requested[0] is None
+        assert requested[1:15] == [["total_active_power"]] * 14
+        # The normal tier comes round after 15 minutes; the slow tier isn't due for an hour
+        assert requested[15] == ["daily_energy", "total_active_power"]
+        assert account.data["12345"]["total_active_power"].value == 10
+        assert account.data["12345"]["total_yield"].value == 3
+
+    async def test_failed_tiers_retried_at_plant_interval(self, hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+        """Test tiers that failed to fetch come round again at the plant's interval, not their minimum."""
+        mock_plants = MagicMock()
+        mock_plants.measure_points = {"1": "total_active_power", "2": "daily_energy", "3": "total_yield"}
+        mock_plants.async_get_realtime_data = AsyncMock(side_effect=Exception("Gateway error"))
+        account = SungrowAccountCoordinator(hass, MagicMock(), mock_plants, ["12345"])
+        plant = SungrowPlantCoordinator(hass, MagicMock(), mock_plants, "12345", "Test Plant")
+        plant.async_get_poll_interval = MagicMock(return_value=timedelta(minutes=1))
+        unsub = account.async_add_plant(plant)
+
+        await account.async_refresh()
+        assert account.last_update_success is False
+        assert account.update_interval == timedelta(minutes=1)
+
+        mock_plants.async_get_realtime_data.reset_mock(side_effect=True)
+        mock_plants.async_get_realtime_data.return_value = {"12345": {"total_yield": {"value": "3"}}}
+        freezer.tick(timedelta(minutes=1))
+        await account.async_refresh()
+        unsub()
+
+        # Every tier, the slow one included, is fetched again a minute later
+        mock_plants.async_get_realtime_data.assert_awaited_once_with(["12345"], measure_points=None)
+        assert account.data["12345"]["total_yield"].value == 3
+
+    async def test_dispatch_marks_failed_plant(self, hass: HomeAssistant):
+        """Test a plant whose batch failed is marked unavailable while others update."""
+        mock_entry = MagicMock()
+        account = SungrowAccountCoordinator(hass, mock_entry, MagicMock(), ["12345", "67890"])
+        account.data = {"12345": parse_points(MOCK_REALTIME_DATA["12345"])}
+        account.plant_errors = {"67890": Exception("Gateway error")}
+
+        good = SungrowPlantCoordinator(hass, mock_entry, MagicMock(), "12345", "Test Plant")
+        bad = SungrowPlantCoordinator(hass, mock_entry, MagicMock(), "67890", "Second Plant")
+        unsubs = [account.async_add_plant(good), account.async_add_plant(bad)]
+        for unsub in unsubs:
+            unsub()
+
+        assert good.data == parse_points(MOCK_REALTIME_DATA["12345"])
+        assert good.last_update_success is True
+        assert bad.last_update_success is False
+
+
+# ---------------------------------------------------------------------------
+# SungrowLocalPlantCoordinator unit tests
+# ---------------------------------------------------------------------------
+
+
+class TestSungrowLocalPlantCoordinator:
+    """Unit tests for the coordinator of plants read from their inverter."""
+
+    def _make_coordinator(self, hass: HomeAssistant, simulator: ModbusSimulator, cloud_data=None):
+        """Create a coordinator reading the simulator, with a mock iSolarCloud behind it."""
+        cloud = MagicMock()
+        cloud.measure_points = {"83022": "daily_yield", "83067": "total_active_power_of_pv", "83033": "power"}
+        cloud.async_get_realtime_data = AsyncMock(return_value=cloud_data or {})
+        client = ModbusClient("127.0.0.1", simulator.port)
+        coordinator = SungrowLocalPlantCoordinator(
+            hass, MagicMock(), ModbusPlants(client, "12345"), cloud, "12345", "Test Plant"
+        )
+        coordinator.async_set_location(51.5, -0.12)
+        return coordinator, cloud, client
+
+    async def test_local_first(self, hass: HomeAssistant, modbus_simulator: ModbusSimulator):
+        """Test the inverter is read when it answers, without touching iSolarCloud."""
+        coordinator, cloud, client = self._make_coordinator(hass, modbus_simulator)
+
+        data = await coordinator._async_update_data()
+        await client.async_close()
+
+        assert data["inverter_ac_power"].value == 4890
+        assert coordinator.source == SOURCE_LOCAL
+        assert coordinator.update_interval == LOCAL_SCAN_INTERVAL
+        assert set(coordinator.latency) == {SOURCE_LOCAL}
+        assert not coordinator.failovers
+        cloud.async_get_realtime_data.assert_not_called()
+
+    async def test_failover_to_cloud_and_back(
+        self, hass: HomeAssistant, modbus_simulator: ModbusSimulator, freezer: FrozenDateTimeFactory
+    ):
+        """Test iSolarCloud serves the plant, under the local codes, while the inverter is unreachable."""
+        freezer.move_to(MIDDAY)
+        cloud_data = {
+            "12345": {
+                "daily_yield": {"code": "daily_yield", "value": "12000", "unit": "Wh", "name": "Daily Yield"},
+                "total_active_power_of_pv": {"code": "total_active_power_of_pv", "value": "5000", "unit": "W"},
+                "power": {"code": "power", "value": "4800", "unit": "W"},
+            }
+        }
+        coordinator, cloud, client = self._make_coordinator(hass, modbus_simulator, cloud_data)
+        await coordinator._async_update_data()
+
+        port = modbus_simulator.port
+        await modbus_simulator.async_stop()
+        data = await coordinator._async_update_data()
+
+        cloud.async_get_realtime_data.assert_awaited_once_with(
+            ["12345"], measure_points=["daily_yield", "total_active_power_of_pv"]
+        )
+        # Cloud points are renamed to the inverter's codes, and points the inverter lacks are left out
+        assert set(data) == {"daily_yield", "total_dc_power"}
+        assert data["total_dc_power"].value == 5000
+        assert data["total_dc_power"].attributes["code"] == "total_dc_power"
+        assert coordinator.source == SOURCE_CLOUD
+        assert coordinator.update_interval == DAY_SCAN_INTERVAL
+        assert set(coordinator.latency) == {SOURCE_LOCAL, SOURCE_CLOUD}
+        assert [source for _, source, _ in coordinator.failovers] == [SOURCE_CLOUD]
+
+        await modbus_simulator.async_start(port)
+        data = await coordinator._async_update_data()
+        await client.async_close()
+
+        assert data["total_dc_power"].value == 5048
+        assert coordinator.source == SOURCE_LOCAL
+        assert coordinator.update_interval == LOCAL_SCAN_INTERVAL
+        assert [source for _, source, _ in coordinator.failovers] == [SOURCE_CLOUD, SOURCE_LOCAL]
+
+    async def test_both_sources_fail(
+        self, hass: HomeAssistant, modbus_simulator: ModbusSimulator, freezer: FrozenDateTimeFactory
+    ):
+        """Test the update fails when neither source answers, and retries at the cloud interval."""
+        freezer.move_to(MIDDAY)
+        coordinator, cloud, client = self._make_coordinator(hass, modbus_simulator)
+        cloud.async_get_realtime_data.side_effect = Exception("Gateway error")
+        await modbus_simulator.async_stop()
+
+        with pytest.raises(UpdateFailed, match="Gateway error"):
+            await coordinator._async_update_data()
+
+        assert coordinator.source is None
+        assert coordinator.update_interval == DAY_SCAN_INTERVAL
+        await client.async_close()
+
+
+# ---------------------------------------------------------------------------
+# SungrowDeviceCoordinator unit tests
+# ---------------------------------------------------------------------------
+
+
+class TestSungrowDeviceCoordinator:
+    """Unit tests for the batched device coordinator."""
+
+    async def test_update_data_batches_by_type(self, hass: HomeAssistant):
+        """Test devices are fetched in DEVICE_BATCH_SIZE sized requests of one device type each."""
+        devices = {"1_1_1_1": 1, "2_1_1_1": 1, "3_1_1_1": 1, "1_7_1_1": 7}
+        mock_devices = MagicMock()
+        mock_devices.async_get_realtime_data = AsyncMock(
+            side_effect=lambda device_type, ps_keys: {ps_key: {} for ps_key in ps_keys}
+        )
+
+        with patch("custom_components.sungrow.coordinator.DEVICE_BATCH_SIZE", 2):
+            coordinator = SungrowDeviceCoordinator(hass, MagicMock(), mock_devices, devices)
+            data = await coordinator._async_update_data()
+
+        batches = [call.args for call in mock_devices.async_get_realtime_data.await_args_list]
+        assert batches == [(1, ["1_1_1_1", "2_1_1_1"]), (1, ["3_1_1_1"]), (7, ["1_7_1_1"])]
+        assert set(data) == set(devices)
+
+    async def test_update_data_failed_batch(self, hass: HomeAssistant):
+        """Test a failed batch only leaves its own devices without data."""
+        mock_devices = MagicMock()
+
+        async def _fetch(device_type, ps_keys):
+            if device_type == 7:
+                raise Exception("Gateway error")
+            return {ps_key: MOCK_DEVICE_DATA[ps_key] for ps_key in ps_keys}
+
+        mock_devices.async_get_realtime_data = AsyncMock(side_effect=_fetch)
+        coordinator = SungrowDeviceCoordinator(hass, MagicMock(), mock_devices, {"12345_1_1_1": 1, "12345_7_1_1": 7})
+
+        data = await coordinator._async_update_data()
+        assert data == {"12345_1_1_1": parse_points(MOCK_DEVICE_DATA["12345_1_1_1"])}
+
+        coordinator.devices = {"12345_7_1_1": 7}
+        with pytest.raises(UpdateFailed, match="Gateway error"):
+            await coordinator._async_update_data()
+
+    async def test_only_changed_points_notified(self, hass: HomeAssistant):
+        """Test an update only wakes the listeners whose device's point changed."""
+        coordinator = SungrowDeviceCoordinator(hass, MagicMock(), MagicMock())
+        inverter, meter = MagicMock(), MagicMock()
+        unsubs = [
+            coordinator.async_add_listener(inverter, ("1_1_1_1", "power")),
+            coordinator.async_add_listener(meter, ("1_7_1_1", "power")),
+        ]
+
+        coordinator.async_set_updated_data(
+            {"1_1_1_1": parse_points({"power": {"value": "1"}}), "1_7_1_1": parse_points({"power": {"value": "5"}})}
+        )
+        coordinator.async_set_updated_data(
+            {"1_1_1_1": parse_points({"power": {"value": "2"}}), "1_7_1_1": parse_points({"power": {"value": "5"}})}
+        )
+
+        assert inverter.call_count == 2
+        assert meter.call_count == 1
+        for unsub in unsubs:
+            unsub()
@@ -0,0 +1,90 @@
+"""Tests for device-level data."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pysolarcloud import PySolarCloudException
+from pysolarcloud.plants import DeviceType
+
+from custom_components.sungrow.devices import Devices, device_record
+
+
+def _auth(response: dict) -> MagicMock:
+    """Return an auth whose requests answer with the given JSON."""
+    auth = MagicMock()
+    auth.request = AsyncMock(return_value=MagicMock(json=AsyncMock(return_value=response)))
+    return auth
+
+
+def test_device_record_from_device_list():
+    """Test a device from the plant's device list is catalogued with its type as a number."""
+    device = {
+        "ps_key": "12345_14_1_1",
+        "device_sn": "A2190000001",
+        "device_name": "SH5.0RS",
+        "device_type": DeviceType.ENERGY_STORAGE_SYSTEM,
+        "type_name": "Energy Storage System",
+    }
+
+    assert device_record(device) == {
+        "name": "SH5.0RS",
+        "type": 14,
+        "model": "Energy Storage System",
+        "serial": "A2190000001",
+    }
+
+
+async def test_realtime_data_parsed_by_device():
+    """Test every device in the batch is fetched in one request and keyed by ps_key, then point code."""
+    auth = _auth(
+        {
+            "result_code": "1",
+            "result_data": {
+                "device_point_list": [
+                    {"device_point": {"ps_key": "12345_1_1_1", "device_sn": "A1", "p24": "4890", "p1": "12400"}},
+                    {"device_point": {"ps_key": "12345_1_1_2", "device_sn": "A2", "p24": None, "p99": "1"}},
+                ],
+                "point_dict": [
+                    {"point_id": 24, "point_name": "Total Active Power", "point_unit": "W"},
+                    {"point_id": 1, "point_name": "Daily Yield", "point_unit": "Wh"},
+                ],
+            },
+        }
+    )
+
+    data = await Devices(auth).async_get_realtime_data(1, ["12345_1_1_1", "12345_1_1_2"])
+
+    auth.request.assert_awaited_once()
+    request = auth.request.await_args.args[1]
+    assert request["device_type"] == 1
+    assert request["ps_key_list"] == ["12345_1_1_1", "12345_1_1_2"]
+    assert "24" in request["point_id_list"]
+    assert data == {
+        "12345_1_1_1": {
+            "total_active_power": {
+                "id": "24",
+                "code": "total_active_power",
+                "value": "4890",
+                "unit": "W",
+                "name": "Total Active Power",
+            },
+            "daily_yield": {"id": "1", "code": "daily_yield", "value": "12400", "unit": "Wh", "name": "Daily Yield"},
+        },
+        "12345_1_1_2": {
+            "total_active_power": {
+                "id": "24",
+                "code": "total_active_power",
+                "value": None,
+                "unit": "W",
+                "name": "Total Active Power",
+            },
+        },
+    }
+
+
+async def test_realtime_data_error_response():
+    """Test an error response raises PySolarCloudException."""
+    auth = _auth({"result_code": "E900", "result_msg": "Access denied"})
+
+    with pytest.raises(PySolarCloudException, match="E900: Access denied"):
+        await Devices(auth).async_get_realtime_data(7, ["12345_7_1_1"])
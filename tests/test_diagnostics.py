@@ -0,0 +1,80 @@
+"""Tests for diagnostics and the API performance statistics behind them."""
+
+import time
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.sungrow.const import DOMAIN, LATENCY_BUCKETS, REALTIME_ENDPOINT
+from custom_components.sungrow.diagnostics import async_get_config_entry_diagnostics
+from custom_components.sungrow.sensor import HEALTH_SENSORS
+from custom_components.sungrow.stats import DATA_STATS, SungrowStats
+
+from .conftest import MOCK_CONFIG_DATA
+from .fake_gateway import PLANT_LIST_PATH, REALTIME_PATH, FakeGateway
+
+
+def test_latency_histogram():
+    """Test request latencies are counted in the bucket of their upper bound, with anything slower in the last."""
+    stats = SungrowStats()
+    stats.async_record_request(REALTIME_ENDPOINT, 0.05, 100, 200)
+    stats.async_record_request(REALTIME_ENDPOINT, 0.1, 300, 200)
+    stats.async_record_request(REALTIME_ENDPOINT, 60, 200, 500)
+    stats.async_record_error(REALTIME_ENDPOINT)
+    stats.async_record_retry(REALTIME_ENDPOINT)
+
+    endpoint = stats.as_dict()["endpoints"][REALTIME_ENDPOINT]
+
+    assert endpoint["latency_histogram"]["<=0.1s"] == 2
+    assert endpoint["latency_histogram"][f">{LATENCY_BUCKETS[-1]}s"] == 1
+    assert sum(endpoint["latency_histogram"].values()) == 3
+    assert endpoint["calls"] == 4
+    assert endpoint["errors"] == 2
+    assert endpoint["retries"] == 1
+    assert endpoint["mean_payload_bytes"] == 200
+    assert endpoint["max_payload_bytes"] == 300
+
+
+async def test_diagnostics_redacted(hass: HomeAssistant):
+    """Test credentials, tokens and inverter hosts are redacted from an entry that isn't set up."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=MOCK_CONFIG_DATA.copy(),
+        options={"local": {"12345": {"host": "192.168.1.50", "port": 502}}},
+    )
+    entry.add_to_hass(hass)
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"]["app_secret"] == "**REDACTED**"
+    assert diagnostics["entry"]["data"]["tokens"] == "**REDACTED**"
+    assert diagnostics["entry"]["data"]["gateway"] == "Europe"
+    assert diagnostics["entry"]["options"]["local"]["12345"] == {"host": "**REDACTED**", "port": 502}
+    assert diagnostics["scheduler"] is None
+    assert diagnostics["stats"] is None
+
+
+async def test_diagnostics_end_to_end(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test every request, parse, entity write and token refresh against the gateway shows up in diagnostics."""
+    tokens = fake_gateway.issue_tokens() | {"expires_at": int(time.time()) - 60}
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA | {"tokens": tokens})
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    endpoints = diagnostics["stats"]["endpoints"]
+    assert endpoints[PLANT_LIST_PATH]["calls"] == 1
+    assert endpoints[REALTIME_PATH]["calls"] == 1
+    assert endpoints[REALTIME_PATH]["parses"] == 1
+    assert endpoints[REALTIME_PATH]["payload_bytes"] > 0
+    assert [refresh["error"] for refresh in diagnostics["stats"]["token_refreshes"]] == [None]
+    assert diagnostics["stats"]["entities_written_per_cycle"]
+    assert diagnostics["scheduler"]["throttled_count"] == 0
+    # The plants' diagnostic sensors are registered, but disabled
+    assert diagnostics["entities"] == len(hass.states.async_entity_ids("sensor")) + 2 * len(HEALTH_SENSORS)
+    assert tokens["access_token"] not in str(diagnostics)
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    assert entry.entry_id not in hass.data[DATA_STATS]
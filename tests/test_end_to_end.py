@@ -0,0 +1,198 @@
+"""End-to-end tests of the integration against a fake iSolarCloud gateway, over real HTTP."""
+
+import asyncio
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import REQUEST_REFRESH_DEFAULT_COOLDOWN
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pysolarcloud.plants import Plants
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.sungrow.const import DOMAIN
+from custom_components.sungrow.session import DATA_SESSIONS
+
+from .conftest import MOCK_CONFIG_DATA
+from .fake_gateway import DEVICE_LIST_PATH, PLANT_LIST_PATH, REALTIME_PATH, REFRESH_TOKEN_PATH, FakeGateway
+
+
+async def _async_setup_entry(hass: HomeAssistant, gateway: FakeGateway, tokens: dict | None = None) -> MockConfigEntry:
+    """Set up an entry whose tokens were issued by the gateway, and wait for its plants to be discovered."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA | {"tokens": tokens or gateway.issue_tokens()})
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    return entry
+
+
+async def _async_update_entity(hass: HomeAssistant, entity_id: str) -> None:
+    """Ask for a refresh of the entity's plant, and wait out the refresh cooldown."""
+    await async_setup_component(hass, "homeassistant", {})
+    await hass.services.async_call("homeassistant", "update_entity", {"entity_id": entity_id}, blocking=True)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=REQUEST_REFRESH_DEFAULT_COOLDOWN))
+    await hass.async_block_till_done()
+
+
+async def test_setup_end_to_end(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test every plant and point the gateway serves gets an entity, fetched in one realtime request."""
+    entry = await _async_setup_entry(hass, fake_gateway)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert len(hass.states.async_entity_ids("sensor")) == 2 * len(Plants.measure_points)
+    assert float(hass.states.get("sensor.plant_0_daily_yield").state) == (100000 + 83022) % 1000
+    assert fake_gateway.requests.count(PLANT_LIST_PATH) == 1
+    assert fake_gateway.requests.count(REALTIME_PATH) == 1
+    assert fake_gateway.requests.count(DEVICE_LIST_PATH) == 2
+
+    # Every request went over the gateway's own session, which is closed with the entry
+    session = hass.data[DATA_SESSIONS][fake_gateway.url].session
+    assert len(fake_gateway.connections) == 1
+    await hass.config_entries.async_unload(entry.entry_id)
+    assert session.closed
+
+
+async def test_setup_does_not_wait_for_gateway(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test setup finishes before a slow gateway answers, with entities added once discovery does."""
+    fake_gateway.latency = 0.1
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA | {"tokens": fake_gateway.issue_tokens()})
+    entry.add_to_hass(hass)
+
+    started = time.monotonic()
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    assert time.monotonic() - started < fake_gateway.latency
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.async_entity_ids("sensor") == []
+
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(hass.states.async_entity_ids("sensor")) == 2 * len(Plants.measure_points)
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_unload_cancels_discovery(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test unloading an entry while its plants are being discovered cancels the discovery."""
+    fake_gateway.latency = 2
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA | {"tokens": fake_gateway.issue_tokens()})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    session = hass.data[DATA_SESSIONS][fake_gateway.url].session
+    async with asyncio.timeout(1):
+        while not fake_gateway.requests:
+            await asyncio.sleep(0.01)
+
+    started = time.monotonic()
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert time.monotonic() - started < 1
+    assert entry.state is ConfigEntryState.NOT_LOADED
+    assert fake_gateway.requests == [PLANT_LIST_PATH]
+    assert hass.states.async_entity_ids("sensor") == []
+    assert session.closed
+
+
+async def test_gateway_errors_mark_entities_unavailable(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test a failing gateway makes a plant's entities unavailable until it answers again."""
+    entry = await _async_setup_entry(hass, fake_gateway)
+
+    fake_gateway.inject(500)
+    await _async_update_entity(hass, "sensor.plant_0_daily_yield")
+    assert hass.states.get("sensor.plant_0_daily_yield").state == STATE_UNAVAILABLE
+
+    fake_gateway.advance()
+    await _async_update_entity(hass, "sensor.plant_0_daily_yield")
+    assert float(hass.states.get("sensor.plant_0_daily_yield").state) == (100000 + 83022 + 1) % 1000
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_plant_health_sensors(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test a plant's diagnostic sensors follow its updates, and stay available while it fails."""
+    entity_registry = er.async_get(hass)
+    for key in ("last_update", "consecutive_failures", "api_calls"):
+        entity_registry.async_get_or_create("sensor", DOMAIN, f"100000_{key}", suggested_object_id=f"plant_0_{key}")
+    entry = await _async_setup_entry(hass, fake_gateway)
+
+    assert hass.states.get("sensor.plant_0_last_update").state != STATE_UNKNOWN
+    assert hass.states.get("sensor.plant_0_consecutive_failures").state == "0"
+    assert hass.states.get("sensor.plant_0_api_calls").state == "1"
+
+    fake_gateway.inject(500)
+    await _async_update_entity(hass, "sensor.plant_0_daily_yield")
+    assert hass.states.get("sensor.plant_0_daily_yield").state == STATE_UNAVAILABLE
+    assert hass.states.get("sensor.plant_0_consecutive_failures").state == "1"
+    assert hass.states.get("sensor.plant_0_api_calls").state == "2"
+
+    await _async_update_entity(hass, "sensor.plant_0_daily_yield")
+    assert hass.states.get("sensor.plant_0_consecutive_failures").state == "0"
+    assert hass.states.get("sensor.plant_0_api_calls").state == "3"
+    # Only the plant's own requests count
+    assert fake_gateway.requests.count(REALTIME_PATH) == 3
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_throttled_request_retried(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test a throttled request is retried after backing off, honouring Retry-After."""
+    fake_gateway.retry_after = 0.05
+    fake_gateway.inject(429, 2)
+
+    with patch("custom_components.sungrow.ratelimit.RATE_LIMIT_BACKOFF", 0.01):
+        entry = await _async_setup_entry(hass, fake_gateway)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert fake_gateway.responses[429] == 2
+    assert fake_gateway.requests[:3] == [PLANT_LIST_PATH] * 3
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_expired_token_refreshed(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test an expired access token is refreshed before the first request, and the new tokens stored."""
+    tokens = fake_gateway.issue_tokens() | {"expires_at": int(time.time()) - 60}
+    fake_gateway.access_tokens.discard(tokens["access_token"])
+
+    entry = await _async_setup_entry(hass, fake_gateway, tokens)
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert fake_gateway.requests[0] == REFRESH_TOKEN_PATH
+    assert entry.data["tokens"]["access_token"] in fake_gateway.access_tokens
+    assert entry.data["tokens"]["refresh_token"] != tokens["refresh_token"]
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_slow_gateway_times_out(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test realtime requests slower than the request timeout are abandoned, leaving discovery to retry."""
+    fake_gateway.latency = 0.2
+
+    with patch("custom_components.sungrow.coordinator.REQUEST_TIMEOUT", 0.05):
+        entry = await _async_setup_entry(hass, fake_gateway)
+
+    assert hass.states.async_entity_ids("sensor") == []
+    # The batch, then each plant on its own
+    assert fake_gateway.requests.count(REALTIME_PATH) == 3
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.benchmark
+async def test_large_account(hass: HomeAssistant, fake_gateway: FakeGateway):
+    """Test a large account with large payloads is fetched in batches over a few reused connections."""
+    # pysolarcloud only reads the first page of the plant list, of 100 plants
+    fake_gateway.plants = FakeGateway(100).plants
+    fake_gateway.extra_points = 20
+
+    entry = await _async_setup_entry(hass, fake_gateway)
+
+    assert len(hass.states.async_entity_ids("sensor")) == 100 * (len(Plants.measure_points) + 20)
+    assert fake_gateway.requests.count(REALTIME_PATH) == 2
+    assert len(fake_gateway.connections) < len(fake_gateway.requests)
+
+    await hass.config_entries.async_unload(entry.entry_id)
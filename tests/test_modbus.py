@@ -0,0 +1,152 @@
+"""Tests for the local Modbus TCP data source."""
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.sungrow.coordinator import SungrowPlantCoordinator
+from custom_components.sungrow.modbus import (
+    READ_INPUT_REGISTERS,
+    REGISTERS,
+    ModbusClient,
+    ModbusError,
+    ModbusPlants,
+    ModbusRegister,
+    register_ranges,
+)
+from custom_components.sungrow.models import PointSelection
+
+from .modbus_simulator import SAMPLE_VALUES, ModbusSimulator
+
+
+def _register(code: str) -> ModbusRegister:
+    return next(register for register in REGISTERS if register.code == code)
+
+
+def test_decode_signed_and_32_bit_values():
+    """Test registers are decoded low word first, with signs and scaling applied."""
+    assert _register("total_yield").decode([0x0002, 0x0001]) == 65538000
+    assert _register("meter_ac_power").decode([0xFB1E, 0xFFFF]) == -1250
+    assert _register("internal_temperature").decode([0xFFF6]) == -1.0
+    assert _register("grid_frequency").decode([500]) == 50.0
+
+
+def test_register_ranges_join_neighbours():
+    """Test neighbouring registers are read together, across small gaps but not large ones."""
+    registers = [_register(code) for code in ("inverter_ac_power", "daily_yield", "total_yield", "grid_frequency")]
+
+    ranges = register_ranges(registers, max_gap=4, max_count=100)
+
+    assert [(address, count) for address, count, _ in ranges] == [(5002, 3), (5030, 6)]
+    assert [register.code for register in ranges[1][2]] == ["inverter_ac_power", "grid_frequency"]
+
+
+def test_register_ranges_split_at_max_count():
+    """Test a read never asks for more registers than the limit."""
+    registers = [_register(code) for code in ("daily_yield", "total_yield", "internal_temperature")]
+
+    ranges = register_ranges(registers, max_gap=10, max_count=4)
+
+    assert [(address, count) for address, count, _ in ranges] == [(5002, 3), (5007, 1)]
+
+
+async def test_realtime_data_from_simulator(modbus_simulator: ModbusSimulator):
+    """Test every point is read from the inverter in a few batched reads."""
+    client = ModbusClient("127.0.0.1", modbus_simulator.port)
+    plants = ModbusPlants(client, "12345")
+
+    data = await plants.async_get_realtime_data(["12345"])
+    await client.async_close()
+
+    points = data["12345"]
+    assert {code: point["value"] for code, point in points.items()} == SAMPLE_VALUES
+    assert points["daily_yield"] == {"code": "daily_yield", "value": 12400, "unit": "Wh", "name": "Daily Yield"}
+    assert modbus_simulator.requests == [(address, count) for address, count, _ in register_ranges(REGISTERS)]
+    assert len(modbus_simulator.requests) < len(REGISTERS)
+
+
+async def test_realtime_data_only_requested_points(modbus_simulator: ModbusSimulator):
+    """Test only the registers of the requested points are read."""
+    client = ModbusClient("127.0.0.1", modbus_simulator.port)
+    plants = ModbusPlants(client, "12345")
+
+    data = await plants.async_get_realtime_data(["12345", "67890"], measure_points=["battery_soc"])
+    await client.async_close()
+
+    assert data == {
+        "12345": {"battery_soc": {"code": "battery_soc", "value": 76.5, "unit": "%", "name": "Battery SOC"}}
+    }
+    assert modbus_simulator.requests == [(13022, 1)]
+
+
+async def test_exception_response(modbus_simulator: ModbusSimulator):
+    """Test an exception response from the inverter raises ModbusError."""
+    modbus_simulator.max_address = 10000
+    client = ModbusClient("127.0.0.1", modbus_simulator.port)
+
+    with pytest.raises(ModbusError, match="exception code 2"):
+        await client.async_read_input_registers(13022, 1)
+
+    # The connection is still usable
+    assert await client.async_read_input_registers(5035, 1) == [500]
+    await client.async_close()
+
+
+@pytest.mark.parametrize(
+    ("length", "pdu"),
+    [
+        (0, b""),
+        (2, bytes([READ_INPUT_REGISTERS])),
+        (4, bytes([READ_INPUT_REGISTERS, 2, 0x01])),
+        (5, bytes([READ_INPUT_REGISTERS, 4, 0x01, 0xF4])),
+    ],
+    ids=["empty", "function-only", "short-registers", "wrong-byte-count"],
+)
+async def test_malformed_reply(modbus_simulator: ModbusSimulator, length: int, pdu: bytes):
+    """Test a short or inconsistent reply raises ModbusError, and the next request reconnects."""
+    modbus_simulator.garble(length, pdu)
+    client = ModbusClient("127.0.0.1", modbus_simulator.port)
+
+    with pytest.raises(ModbusError):
+        await client.async_read_input_registers(5035, 1)
+
+    assert await client.async_read_input_registers(5035, 1) == [500]
+    await client.async_close()
+
+
+async def test_reconnects_after_connection_lost(modbus_simulator: ModbusSimulator):
+    """Test a dropped connection fails the request in flight, and the next request reconnects."""
+    client = ModbusClient("127.0.0.1", modbus_simulator.port)
+    assert await client.async_read_input_registers(5035, 1) == [500]
+
+    port = modbus_simulator.port
+    await modbus_simulator.async_stop()
+    with pytest.raises(ModbusError):
+        await client.async_read_input_registers(5035, 1)
+
+    await modbus_simulator.async_start(port)
+    assert await client.async_read_input_registers(5035, 1) == [500]
+    await client.async_close()
+
+
+async def test_plant_coordinator_polls_locally(hass: HomeAssistant, modbus_simulator: ModbusSimulator):
+    """Test a plant coordinator reads its selected points from the inverter."""
+    client = ModbusClient("127.0.0.1", modbus_simulator.port)
+    coordinator = SungrowPlantCoordinator(
+        hass,
+        None,
+        ModbusPlants(client, "12345"),
+        "12345",
+        "Test Plant",
+        PointSelection(include=frozenset({"inverter_ac_power", "daily_yield"})),
+    )
+
+    data = await coordinator._async_update_data()
+
+    assert set(data) == {"inverter_ac_power", "daily_yield"}
+    assert data["inverter_ac_power"].value == 4890
+
+    await client.async_close()
+    await modbus_simulator.async_stop()
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
@@ -0,0 +1,109 @@
+"""Tests for parsing realtime point data."""
+
+import pytest
+
+from custom_components.sungrow.models import (
+    PointSelection,
+    parse_point,
+    parse_points,
+    point_in_group,
+    point_selections,
+    point_tier,
+)
+
+from .conftest import MOCK_REALTIME_DATA
+
+
+@pytest.mark.parametrize(
+    ("raw", "value", "status"),
+    [
+        ("5.23", 5.23, None),
+        (12, 12.0, None),
+        ("Running", None, "Running"),
+        ("Unknown", None, "Unknown"),
+        (None, None, None),
+        ("  ", None, None),
+    ],
+)
+def test_parse_point_value(raw, value, status):
+    """Test numeric readings are parsed to floats and anything else is kept as a status."""
+    point = parse_point({"code": "x", "value": raw, "unit": "kW", "name": "X"})
+
+    assert point.value == value
+    assert point.status == status
+    assert point.native_value == (status if value is None else value)
+
+
+def test_parse_points_keeps_metadata():
+    """Test the unit, name and the point data as returned are kept alongside the reading."""
+    points = parse_points(MOCK_REALTIME_DATA["12345"])
+
+    power = points["total_active_power"]
+    assert power.unit == "kW"
+    assert power.name == "Total Active Power"
+    assert power.attributes == MOCK_REALTIME_DATA["12345"]["total_active_power"]
+
+
+def test_point_selection_default_allows_everything():
+    """Test a plant with nothing chosen fetches every point."""
+    selection = PointSelection()
+
+    assert selection.allows("total_active_power")
+    assert selection.measure_points(["b", "a"]) == ("a", "b")
+
+
+def test_point_selection_groups_and_lists():
+    """Test points are selected by group or allowlist, and the denylist always wins."""
+    selection = PointSelection.from_options(
+        {"groups": ["battery"], "include": ["daily_yield"], "exclude": ["battery_soc"]}
+    )
+
+    assert selection.allows("battery_level_soc")
+    assert selection.allows("daily_yield")
+    assert not selection.allows("battery_soc")
+    assert not selection.allows("grid_active_power")
+    assert selection.measure_points(["grid_active_power", "daily_yield", "battery_soc", "energy_storage_soc_ems"]) == (
+        "daily_yield",
+        "energy_storage_soc_ems",
+    )
+
+
+def test_point_in_group():
+    """Test group membership matches whole words of the point code."""
+    assert point_in_group("plant_pr", "production")
+    assert not point_in_group("energy_purchased_today", "production")
+    assert point_in_group("energy_purchased_today", "grid")
+    assert not point_in_group("total_load_consumption", "no_such_group")
+
+
+def test_parse_points_skips_deselected():
+    """Test points that aren't selected aren't parsed."""
+    points = parse_points(MOCK_REALTIME_DATA["12345"], PointSelection(exclude=frozenset({"device_status"})))
+
+    assert set(points) == {"total_active_power", "daily_energy"}
+
+
+def test_point_selections_from_options():
+    """Test selections are read per plant from the options."""
+    selections = point_selections({"points": {"12345": {"include": ["daily_energy"]}}})
+
+    assert selections == {"12345": PointSelection(include=frozenset({"daily_energy"}))}
+    assert point_selections({}) == {}
+
+
+@pytest.mark.parametrize(
+    ("point_code", "tier"),
+    [
+        ("total_active_power", "fast"),
+        ("battery_level_soc", "fast"),
+        ("daily_yield", "normal"),
+        ("device_status", "normal"),
+        ("total_yield", "slow"),
+        ("energy_storage_cumulative_charge", "slow"),
+        ("accumulative_power_consumption_by_meter", "slow"),
+        ("total_field_energy_storage_active_power", "fast"),
+    ],
+)
+def test_point_tier(point_code, tier):
+    """Test instantaneous readings poll fast and lifetime totals poll slowly."""
+    assert point_tier(point_code) == tier
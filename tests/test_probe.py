@@ -0,0 +1,180 @@
+"""Tests for gateway probing and failover."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.sungrow.const import CONF_GATEWAY, CONF_PROBE_GATEWAYS, DOMAIN, GATEWAY_PROBE_INTERVAL
+from custom_components.sungrow.probe import (
+    GatewayFailover,
+    GatewayProbe,
+    _rejects_app_key,
+    async_probe_gateways,
+    fastest,
+)
+from custom_components.sungrow.session import async_release_session
+
+from .conftest import MOCK_CONFIG_DATA
+from .fake_gateway import FakeGateway
+
+
+@pytest.fixture
+async def gateways(socket_enabled):
+    """Run a slow, a fast and a broken fake gateway, as the only gateways probed."""
+    slow, fast, broken = FakeGateway(latency=0.05), FakeGateway(), FakeGateway()
+    for gateway in (slow, fast, broken):
+        await gateway.async_start()
+    broken.inject(500, 10)
+    with patch.dict(
+        "custom_components.sungrow.probe.GATEWAYS",
+        {"Europe": slow.url, "Australia": fast.url, "China": broken.url},
+        clear=True,
+    ):
+        yield {"Europe": slow, "Australia": fast, "China": broken}
+    for gateway in (slow, fast, broken):
+        await gateway.async_stop()
+
+
+def test_fastest_picks_lowest_latency_working_gateway():
+    """Test the fastest working gateway is picked, and none if no gateway works."""
+    probes = [
+        GatewayProbe("Europe", 0.1, 0.2, True),
+        GatewayProbe("Australia", 0.05, 0.1, True),
+        GatewayProbe("China", 0.01, 0.01, False, "rejected the credentials"),
+    ]
+
+    assert fastest(probes).gateway == "Australia"
+    assert fastest(probes[2:]) is None
+    assert GatewayProbe("China", error="timed out").latency == float("inf")
+
+
+def test_rejects_app_key():
+    """Test only errors naming the app key count against a gateway."""
+    assert not _rejects_app_key({"error": "invalid_grant", "error_description": "Invalid code"})
+    assert _rejects_app_key({"error": "invalid_client", "error_description": "AppKey does not exist"})
+    assert _rejects_app_key({"result_code": "E911", "result_msg": "invalid app_key"})
+    assert _rejects_app_key(["not", "an", "object"])
+
+
+async def test_probe_gateways_without_tokens(hass: HomeAssistant, gateways):
+    """Test every gateway is probed at once, and only those answering properly work."""
+    probes = {probe.gateway: probe for probe in await async_probe_gateways(hass, "flow", "key", "secret")}
+
+    assert set(probes) == {"Europe", "Australia", "China"}
+    assert probes["Europe"].works and probes["Australia"].works
+    assert not probes["China"].works
+    assert probes["China"].error == "HTTP 500"
+    assert probes["Europe"].api_seconds >= 0.05
+    assert probes["Europe"].handshake_seconds is not None
+    assert fastest(list(probes.values())).gateway == "Australia"
+    assert all(gateway.requests for gateway in gateways.values())
+
+    await async_release_session(hass, "flow")
+
+
+async def test_probe_gateways_with_token(hass: HomeAssistant, gateways):
+    """Test with an access token, only a gateway that issued it works."""
+    access_token = gateways["Europe"].issue_tokens()["access_token"]
+
+    probes = {probe.gateway: probe for probe in await async_probe_gateways(hass, "flow", "key", "secret", access_token)}
+
+    assert probes["Europe"].works
+    assert probes["Australia"].error == "rejected the credentials"
+    assert not probes["China"].works
+
+    await async_release_session(hass, "flow")
+
+
+async def test_probe_unreachable_gateway(hass: HomeAssistant, socket_enabled):
+    """Test a gateway that can't be connected to doesn't work, with the reason given."""
+    gateway = FakeGateway()
+    await gateway.async_start()
+    url = gateway.url
+    await gateway.async_stop()
+
+    with patch.dict("custom_components.sungrow.probe.GATEWAYS", {"Europe": url}, clear=True):
+        (probe,) = await async_probe_gateways(hass, "flow", "key", "secret")
+
+    assert not probe.works
+    assert probe.error
+    assert probe.latency == float("inf")
+
+    await async_release_session(hass, "flow")
+
+
+def _failover_entry(hass: HomeAssistant, gateway: str) -> MockConfigEntry:
+    """Return a config entry that chose its gateway by probing."""
+    entry = MockConfigEntry(domain=DOMAIN, data={**MOCK_CONFIG_DATA, CONF_GATEWAY: gateway, CONF_PROBE_GATEWAYS: True})
+    entry.add_to_hass(hass)
+    return entry
+
+
+async def test_failover_moves_entry_off_broken_gateway(hass: HomeAssistant, gateways):
+    """Test an entry whose gateway stopped working is moved to a working one and reloaded."""
+    entry = _failover_entry(hass, "China")
+    auth = MagicMock(
+        async_get_access_token=AsyncMock(return_value=gateways["Australia"].issue_tokens()["access_token"])
+    )
+
+    with patch.object(hass.config_entries, "async_schedule_reload") as mock_reload:
+        moved_to = await GatewayFailover(hass, entry, auth).async_reprobe()
+
+    assert moved_to == "Australia"
+    assert entry.data[CONF_GATEWAY] == "Australia"
+    mock_reload.assert_called_once_with(entry.entry_id)
+
+    await async_release_session(hass, entry.entry_id)
+
+
+async def test_failover_keeps_working_gateway(hass: HomeAssistant, gateways):
+    """Test an entry whose gateway works stays on it, even if another gateway is faster."""
+    entry = _failover_entry(hass, "Europe")
+    token = gateways["Europe"].issue_tokens()["access_token"]
+    gateways["Australia"].access_tokens.add(token)
+    auth = MagicMock(async_get_access_token=AsyncMock(return_value=token))
+
+    with patch.object(hass.config_entries, "async_schedule_reload") as mock_reload:
+        assert await GatewayFailover(hass, entry, auth).async_reprobe() is None
+
+    assert entry.data[CONF_GATEWAY] == "Europe"
+    mock_reload.assert_not_called()
+
+    await async_release_session(hass, entry.entry_id)
+
+
+async def test_failover_without_working_gateway(hass: HomeAssistant, gateways):
+    """Test an entry stays put when no gateway works, or there is no access token to probe with."""
+    entry = _failover_entry(hass, "China")
+    auth = MagicMock(async_get_access_token=AsyncMock(return_value="unknown"))
+
+    with patch.object(hass.config_entries, "async_schedule_reload") as mock_reload:
+        assert await GatewayFailover(hass, entry, auth).async_reprobe() is None
+        auth.async_get_access_token.side_effect = Exception("refresh failed")
+        assert await GatewayFailover(hass, entry, auth).async_reprobe() is None
+
+    assert entry.data[CONF_GATEWAY] == "China"
+    mock_reload.assert_not_called()
+
+    await async_release_session(hass, entry.entry_id)
+
+
+async def test_failover_reprobes_on_interval(hass: HomeAssistant):
+    """Test the gateways are re-probed every GATEWAY_PROBE_INTERVAL until the entry is unloaded."""
+    entry = _failover_entry(hass, "Europe")
+    failover = GatewayFailover(hass, entry, MagicMock())
+
+    with patch.object(failover, "async_reprobe", AsyncMock(return_value=None)) as mock_reprobe:
+        failover.async_start()
+        async_fire_time_changed(hass, dt_util.utcnow() + GATEWAY_PROBE_INTERVAL + timedelta(seconds=1))
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert mock_reprobe.await_count == 1
+
+        entry.runtime_data = None
+        await entry._async_process_on_unload(hass)
+        async_fire_time_changed(hass, dt_util.utcnow() + 3 * GATEWAY_PROBE_INTERVAL)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert mock_reprobe.await_count == 1
@@ -0,0 +1,140 @@
+"""Tests for the shared gateway request scheduler."""
+
+import asyncio
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.sungrow.ratelimit import (
+    GatewayScheduler,
+    RequestPriority,
+    async_get_scheduler,
+    current_priority,
+    request_priority,
+)
+
+
+def _stop(scheduler: GatewayScheduler) -> None:
+    """Cancel the scheduler's pending wakeup so the test doesn't leave a timer behind."""
+    if scheduler._wakeup is not None:
+        scheduler._wakeup.cancel()
+
+
+async def test_scheduler_shared_per_gateway_and_app_key(hass: HomeAssistant):
+    """Test entries using the same app key on the same gateway share a scheduler."""
+    scheduler = async_get_scheduler(hass, "https://gateway.isolarcloud.eu", "key")
+
+    assert async_get_scheduler(hass, "https://gateway.isolarcloud.eu", "key") is scheduler
+    assert async_get_scheduler(hass, "https://gateway.isolarcloud.eu", "other") is not scheduler
+    assert async_get_scheduler(hass, "https://gateway.isolarcloud.com.hk", "key") is not scheduler
+
+
+async def test_burst_then_rate_limited(hass: HomeAssistant):
+    """Test requests beyond the burst wait for the bucket to refill."""
+    scheduler = GatewayScheduler(hass, rate=0.001, burst=2)
+
+    await scheduler.async_acquire()
+    await scheduler.async_acquire()
+    waiter = hass.async_create_task(scheduler.async_acquire())
+    await asyncio.sleep(0)
+
+    assert not waiter.done()
+    assert scheduler.queued == 1
+
+    waiter.cancel()
+    _stop(scheduler)
+
+
+async def test_queue_drains_in_priority_order(hass: HomeAssistant):
+    """Test queued requests are released highest priority first, whatever order they arrived in."""
+    scheduler = GatewayScheduler(hass, rate=0.001, burst=1)
+    await scheduler.async_acquire()
+
+    released = []
+
+    async def _request(priority):
+        await scheduler.async_acquire(priority)
+        released.append(priority)
+
+    for priority in (RequestPriority.BACKGROUND, RequestPriority.POLL, RequestPriority.AUTH):
+        hass.async_create_task(_request(priority))
+    await asyncio.sleep(0)
+
+    for _ in range(3):
+        scheduler._tokens = 1
+        scheduler._async_dispatch()
+        await asyncio.sleep(0)
+
+    assert released == [RequestPriority.AUTH, RequestPriority.POLL, RequestPriority.BACKGROUND]
+    _stop(scheduler)
+
+
+async def test_cancelled_waiter_skipped(hass: HomeAssistant):
+    """Test a request that gave up waiting doesn't use up a token."""
+    scheduler = GatewayScheduler(hass, rate=0.001, burst=1)
+    await scheduler.async_acquire()
+
+    cancelled = hass.async_create_task(scheduler.async_acquire(RequestPriority.AUTH))
+    waiting = hass.async_create_task(scheduler.async_acquire(RequestPriority.POLL))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    scheduler._tokens = 1
+    scheduler._async_dispatch()
+    await asyncio.sleep(0)
+
+    assert waiting.done()
+    _stop(scheduler)
+
+
+async def test_throttle_backs_off_exponentially(hass: HomeAssistant):
+    """Test each throttled response doubles the backoff until a request succeeds."""
+    scheduler = GatewayScheduler(hass)
+
+    with patch("custom_components.sungrow.ratelimit.random.uniform", side_effect=lambda low, high: high):
+        scheduler.async_record_throttled()
+        first = scheduler._blocked_until - hass.loop.time()
+        scheduler._blocked_until = 0
+        scheduler.async_record_throttled()
+        second = scheduler._blocked_until - hass.loop.time()
+        scheduler._blocked_until = 0
+
+        scheduler.async_record_success()
+        scheduler.async_record_throttled()
+        reset = scheduler._blocked_until - hass.loop.time()
+
+    assert 1.9 < first <= 2
+    assert 3.9 < second <= 4
+    assert 1.9 < reset <= 2
+    assert scheduler.throttled_count == 3
+    _stop(scheduler)
+
+
+async def test_throttle_honours_retry_after(hass: HomeAssistant):
+    """Test requests are held back for at least as long as the gateway asks."""
+    scheduler = GatewayScheduler(hass)
+    scheduler.async_record_throttled(retry_after=120)
+
+    waiter = hass.async_create_task(scheduler.async_acquire())
+    await asyncio.sleep(0)
+
+    assert not waiter.done()
+    assert scheduler._blocked_until - hass.loop.time() > 119
+
+    waiter.cancel()
+    _stop(scheduler)
+
+
+async def test_request_priority_context(hass: HomeAssistant):
+    """Test request_priority applies to requests made inside it, and to tasks it creates."""
+    assert current_priority() == RequestPriority.POLL
+
+    async def _priority():
+        return current_priority()
+
+    with request_priority(RequestPriority.BACKGROUND):
+        assert current_priority() == RequestPriority.BACKGROUND
+        assert await hass.async_create_task(_priority()) == RequestPriority.BACKGROUND
+
+    assert current_priority() == RequestPriority.POLL
@@ -1,34 +1,69 @@
 """Tests for the Sungrow sensor platform."""
 
+import asyncio
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import UpdateFailed
-from pytest_homeassistant_custom_component.common import MockConfigEntry
-
-from custom_components.sungrow.const import DOMAIN
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+
+from custom_components.sungrow.catalogue import describe_point
+from custom_components.sungrow.const import (
+    DISCOVERY_RETRY,
+    DISCOVERY_RETRY_MAX,
+    DOMAIN,
+    LOCAL_SCAN_INTERVAL,
+)
+from custom_components.sungrow.models import parse_point, parse_points
 from custom_components.sungrow.sensor import (
-    SungrowPlantCoordinator,
+    SungrowDataSourceSensor,
+    SungrowDeviceSensor,
     SungrowSensor,
     async_setup_entry,
 )
 
-from .conftest import MOCK_CONFIG_DATA, MOCK_REALTIME_DATA
+from .conftest import MOCK_CONFIG_DATA, MOCK_DEVICE_LIST, MOCK_PLANT_LIST, MOCK_REALTIME_DATA
+from .modbus_simulator import SAMPLE_VALUES, ModbusSimulator
 
 
 @pytest.fixture(autouse=True)
 def mock_client_session():
-    """Mock async_get_clientsession to prevent background thread creation."""
+    """Mock the gateway session to prevent background thread creation."""
     with patch(
-        "custom_components.sungrow.sensor.async_get_clientsession",
+        "custom_components.sungrow.sensor.async_get_session",
         return_value=MagicMock(),
     ):
         yield
 
 
+def _capture_sensors(added_entities: list) -> Any:
+    """Return an async_add_entities that collects the point sensors, leaving out the diagnostic ones."""
+    return lambda entities: added_entities.extend(e for e in entities if isinstance(e, SungrowSensor))
+
+
+def _platform_entities(hass: HomeAssistant) -> list:
+    """Return every entity the sensor platform added, in the order it added them."""
+    return [entity for platform in async_get_platforms(hass, DOMAIN) for entity in platform.entities.values()]
+
+
+def _point_sensors(entities: list) -> list:
+    """Return the point sensors among entities, leaving out the diagnostic ones."""
+    return [entity for entity in entities if isinstance(entity, SungrowSensor)]
+
+
+async def _async_setup_entry(hass: HomeAssistant, entry: MockConfigEntry) -> list:
+    """Set up an entry through Home Assistant, wait for discovery, and return the entities it added."""
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    return _platform_entities(hass)
+
+
 # ---------------------------------------------------------------------------
 # SungrowSensor unit tests
 # ---------------------------------------------------------------------------
@@ -40,14 +75,16 @@ class TestSungrowSensor:
     def _make_coordinator(self, data=None):
         """Create a minimal mock coordinator."""
         coordinator = MagicMock()
-        coordinator.data = data or {}
+        coordinator.data = parse_points(data or {})
         return coordinator
 
     def test_sensor_name_from_code(self):
         """Test sensor name is derived from the point code."""
         coordinator = self._make_coordinator()
         init_data = {"code": "total_active_power", "value": "5.0", "unit": "kW", "name": "Total"}
-        sensor = SungrowSensor(coordinator, "total_active_power", "123", "My Plant", init_data, "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "total_active_power", "123", "My Plant", describe_point(parse_point(init_data)), "test_entry"
+        )
 
         assert sensor._attr_name == "Total Active Power"
         assert sensor._attr_unique_id == "123_total_active_power"
@@ -56,7 +93,9 @@ class TestSungrowSensor:
         """Test sensor with a numeric code falls back to init_data name."""
         coordinator = self._make_coordinator()
         init_data = {"code": "12345", "value": "99", "unit": "W", "name": "Some Sensor"}
-        sensor = SungrowSensor(coordinator, "12345", "123", "My Plant", init_data, "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "12345", "123", "My Plant", describe_point(parse_point(init_data)), "test_entry"
+        )
 
         assert sensor._attr_name == "Some Sensor"
 
@@ -64,7 +103,9 @@ class TestSungrowSensor:
         """Test kW unit infers POWER device class."""
         coordinator = self._make_coordinator()
         init_data = {"code": "power", "value": "5.0", "unit": "kW", "name": "Power"}
-        sensor = SungrowSensor(coordinator, "power", "123", "Plant", init_data, "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "power", "123", "Plant", describe_point(parse_point(init_data)), "test_entry"
+        )
 
         assert sensor._attr_device_class == SensorDeviceClass.POWER
         assert sensor._attr_state_class == SensorStateClass.MEASUREMENT
@@ -73,7 +114,9 @@ class TestSungrowSensor:
         """Test W unit infers POWER device class."""
         coordinator = self._make_coordinator()
         init_data = {"code": "power", "value": "5000", "unit": "W", "name": "Power"}
-        sensor = SungrowSensor(coordinator, "power", "123", "Plant", init_data, "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "power", "123", "Plant", describe_point(parse_point(init_data)), "test_entry"
+        )
 
         assert sensor._attr_device_class == SensorDeviceClass.POWER
         assert sensor._attr_state_class == SensorStateClass.MEASUREMENT
@@ -82,7 +125,9 @@ class TestSungrowSensor:
         """Test kWh unit infers ENERGY device class."""
         coordinator = self._make_coordinator()
         init_data = {"code": "energy", "value": "12.0", "unit": "kWh", "name": "Energy"}
-        sensor = SungrowSensor(coordinator, "energy", "123", "Plant", init_data, "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "energy", "123", "Plant", describe_point(parse_point(init_data)), "test_entry"
+        )
 
         assert sensor._attr_device_class == SensorDeviceClass.ENERGY
         assert sensor._attr_state_class == SensorStateClass.TOTAL_INCREASING
@@ -91,7 +136,9 @@ class TestSungrowSensor:
         """Test unknown unit doesn't set device class."""
         coordinator = self._make_coordinator()
         init_data = {"code": "status", "value": "OK", "unit": "", "name": "Status"}
-        sensor = SungrowSensor(coordinator, "status", "123", "Plant", init_data, "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "status", "123", "Plant", describe_point(parse_point(init_data)), "test_entry"
+        )
 
         assert not hasattr(sensor, "_attr_device_class") or sensor._attr_device_class is None
 
@@ -99,7 +146,7 @@ class TestSungrowSensor:
         """Test all sensors use the solar icon."""
         coordinator = self._make_coordinator()
         init_data = {"code": "x", "value": "1", "unit": "", "name": "X"}
-        sensor = SungrowSensor(coordinator, "x", "123", "Plant", init_data, "test_entry")
+        sensor = SungrowSensor(coordinator, "x", "123", "Plant", describe_point(parse_point(init_data)), "test_entry")
 
         assert sensor._attr_icon == "mdi:solar-power-variant"
 
@@ -107,7 +154,9 @@ class TestSungrowSensor:
         """Test sensor has device_info grouping it under its plant."""
         coordinator = self._make_coordinator()
         init_data = {"code": "power", "value": "5.0", "unit": "kW", "name": "Power"}
-        sensor = SungrowSensor(coordinator, "power", "456", "My Solar Plant", init_data, "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "power", "456", "My Solar Plant", describe_point(parse_point(init_data)), "test_entry"
+        )
 
         assert sensor._attr_device_info is not None
         assert sensor._attr_device_info["identifiers"] == {("sungrow", "456")}
@@ -120,29 +169,31 @@ class TestSungrowSensor:
 
         # Test None
         init_none = {"code": "x", "value": None, "unit": "", "name": "X"}
-        s1 = SungrowSensor(coordinator, "x", "123", "Plant", init_none, "entry")
+        s1 = SungrowSensor(coordinator, "x", "123", "Plant", describe_point(parse_point(init_none)), "entry")
         assert s1.entity_registry_enabled_default is False
 
         # Test empty string
         init_empty = {"code": "y", "value": "  ", "unit": "", "name": "Y"}
-        s2 = SungrowSensor(coordinator, "y", "123", "Plant", init_empty, "entry")
+        s2 = SungrowSensor(coordinator, "y", "123", "Plant", describe_point(parse_point(init_empty)), "entry")
         assert s2.entity_registry_enabled_default is False
 
         # Test "Unknown" literal
         init_unk = {"code": "z", "value": "Unknown", "unit": "", "name": "Z"}
-        s3 = SungrowSensor(coordinator, "z", "123", "Plant", init_unk, "entry")
+        s3 = SungrowSensor(coordinator, "z", "123", "Plant", describe_point(parse_point(init_unk)), "entry")
         assert s3.entity_registry_enabled_default is False
 
         # Test valid value is NOT disabled
         init_val = {"code": "v", "value": "1.2", "unit": "", "name": "V"}
-        s4 = SungrowSensor(coordinator, "v", "123", "Plant", init_val, "entry")
+        s4 = SungrowSensor(coordinator, "v", "123", "Plant", describe_point(parse_point(init_val)), "entry")
         assert s4.entity_registry_enabled_default is True
 
     def test_native_value_float_conversion(self):
         """Test native_value converts string numbers to float."""
         data = {"power": {"code": "power", "value": "5.23", "unit": "kW", "name": "Power"}}
         coordinator = self._make_coordinator(data)
-        sensor = SungrowSensor(coordinator, "power", "123", "Plant", data["power"], "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "power", "123", "Plant", describe_point(parse_point(data["power"])), "test_entry"
+        )
 
         assert sensor.native_value == 5.23
 
@@ -150,7 +201,9 @@ class TestSungrowSensor:
         """Test native_value returns raw string for non-numeric values."""
         data = {"status": {"code": "status", "value": "Running", "unit": "", "name": "Status"}}
         coordinator = self._make_coordinator(data)
-        sensor = SungrowSensor(coordinator, "status", "123", "Plant", data["status"], "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "status", "123", "Plant", describe_point(parse_point(data["status"])), "test_entry"
+        )
 
         assert sensor.native_value == "Running"
 
@@ -158,7 +211,9 @@ class TestSungrowSensor:
         """Test native_value returns None when data is missing."""
         coordinator = self._make_coordinator({})
         init_data = {"code": "missing", "value": "0", "unit": "", "name": "Missing"}
-        sensor = SungrowSensor(coordinator, "missing", "123", "Plant", init_data, "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "missing", "123", "Plant", describe_point(parse_point(init_data)), "test_entry"
+        )
 
         assert sensor.native_value is None
 
@@ -166,7 +221,7 @@ class TestSungrowSensor:
         """Test native_value returns None when coordinator.data is None."""
         coordinator = self._make_coordinator(None)
         init_data = {"code": "x", "value": "0", "unit": "", "name": "X"}
-        sensor = SungrowSensor(coordinator, "x", "123", "Plant", init_data, "test_entry")
+        sensor = SungrowSensor(coordinator, "x", "123", "Plant", describe_point(parse_point(init_data)), "test_entry")
 
         assert sensor.native_value is None
 
@@ -175,62 +230,39 @@ class TestSungrowSensor:
         point_data = {"code": "power", "value": "5.0", "unit": "kW", "name": "Power"}
         data = {"power": point_data}
         coordinator = self._make_coordinator(data)
-        sensor = SungrowSensor(coordinator, "power", "123", "Plant", point_data, "test_entry")
+        sensor = SungrowSensor(
+            coordinator, "power", "123", "Plant", describe_point(parse_point(point_data)), "test_entry"
+        )
 
         assert sensor.extra_state_attributes == point_data
 
+    def test_extra_state_attributes_unrecorded(self):
+        """Test the point's data is kept out of the recorder."""
+        coordinator = self._make_coordinator()
+        sensor = SungrowSensor(coordinator, "power", "123", "Plant", describe_point(parse_point({})), "test_entry")
+
+        assert {"id", "code", "name", "unit", "value"} <= sensor._unrecorded_attributes
+
+    def test_extra_state_attributes_minimal(self):
+        """Test minimal attributes mode exposes only the state."""
+        point_data = {"code": "power", "value": "5.0", "unit": "kW", "name": "Power"}
+        coordinator = self._make_coordinator({"power": point_data})
+        sensor = SungrowSensor(
+            coordinator, "power", "123", "Plant", describe_point(parse_point(point_data)), "test_entry", True
+        )
+
+        assert sensor.native_value == 5.0
+        assert sensor.extra_state_attributes is None
+
     def test_extra_state_attributes_empty_when_missing(self):
         """Test extra_state_attributes returns {} when data is missing."""
         coordinator = self._make_coordinator({})
         init_data = {"code": "x", "value": "0", "unit": "", "name": "X"}
-        sensor = SungrowSensor(coordinator, "x", "123", "Plant", init_data, "test_entry")
+        sensor = SungrowSensor(coordinator, "x", "123", "Plant", describe_point(parse_point(init_data)), "test_entry")
 
         assert sensor.extra_state_attributes == {}
 
 
-# ---------------------------------------------------------------------------
-# SungrowPlantCoordinator unit tests
-# ---------------------------------------------------------------------------
-
-
-class TestSungrowPlantCoordinator:
-    """Unit tests for the data update coordinator."""
-
-    async def test_update_data_success(self, hass: HomeAssistant):
-        """Test successful data fetch returns plant data."""
-        mock_plants = MagicMock()
-        mock_plants.async_get_realtime_data = AsyncMock(return_value=MOCK_REALTIME_DATA)
-        mock_entry = MagicMock()
-
-        coordinator = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "12345", "Test Plant")
-        data = await coordinator._async_update_data()
-
-        assert "total_active_power" in data
-        assert data["total_active_power"]["value"] == "5.23"
-
-    async def test_update_data_missing_plant(self, hass: HomeAssistant):
-        """Test returns empty dict when plant_id is not in response."""
-        mock_plants = MagicMock()
-        mock_plants.async_get_realtime_data = AsyncMock(return_value={"99999": {}})
-        mock_entry = MagicMock()
-
-        coordinator = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "12345", "Test Plant")
-        data = await coordinator._async_update_data()
-
-        assert data == {}
-
-    async def test_update_data_api_error(self, hass: HomeAssistant):
-        """Test API error raises UpdateFailed."""
-        mock_plants = MagicMock()
-        mock_plants.async_get_realtime_data = AsyncMock(side_effect=Exception("API down"))
-        mock_entry = MagicMock()
-
-        coordinator = SungrowPlantCoordinator(hass, mock_entry, mock_plants, "12345", "Test Plant")
-
-        with pytest.raises(UpdateFailed, match="Error communicating with API"):
-            await coordinator._async_update_data()
-
-
 # ---------------------------------------------------------------------------
 # async_setup_entry integration test
 # ---------------------------------------------------------------------------
@@ -240,18 +272,8 @@ async def test_sensor_setup_creates_entities(hass: HomeAssistant, mock_sensor_au
     """Test async_setup_entry creates sensors for each data point."""
     entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
     entry.add_to_hass(hass)
-    # Set state to SETUP_IN_PROGRESS so the coordinator refresh is allowed
-    entry.mock_state(hass, ConfigEntryState.SETUP_IN_PROGRESS)
 
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
-
-    added_entities = []
-
-    def capture_entities(entities):
-        added_entities.extend(entities)
-
-    await async_setup_entry(hass, entry, capture_entities)
+    added_entities = _point_sensors(await _async_setup_entry(hass, entry))
 
     # Plant 12345 has 3 data points, plant 67890 has 1
     assert len(added_entities) == 4
@@ -264,6 +286,110 @@ async def test_sensor_setup_creates_entities(hass: HomeAssistant, mock_sensor_au
     # Second plant also has Total Active Power — check we have 2
     assert names.count("Total Active Power") == 2
 
+    # Both plants were fetched in a single batched request
+    mock_plants_service.async_get_realtime_data.assert_awaited_once_with(["12345", "67890"], measure_points=None)
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_sensor_setup_only_selected_points(hass: HomeAssistant, mock_sensor_auth, mock_plants_service):
+    """Test only the points selected in the options are requested and get entities."""
+    mock_plants_service.measure_points = {"83033": "total_active_power", "83022": "daily_energy"}
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=MOCK_CONFIG_DATA.copy(),
+        options={"points": {"12345": {"include": ["total_active_power"]}}},
+    )
+    entry.add_to_hass(hass)
+
+    # An entity for a point that has since been deselected, and the data source of a plant no longer read locally
+    entity_registry = er.async_get(hass)
+    stale = entity_registry.async_get_or_create("sensor", DOMAIN, "12345_daily_energy", config_entry=entry)
+    stale_source = entity_registry.async_get_or_create("sensor", DOMAIN, "67890_data_source", config_entry=entry)
+    kept = entity_registry.async_get_or_create("sensor", DOMAIN, "67890_total_active_power", config_entry=entry)
+
+    added_entities = _point_sensors(await _async_setup_entry(hass, entry))
+
+    assert sorted((e.plant_id, e.point_code) for e in added_entities) == [
+        ("12345", "total_active_power"),
+        ("67890", "total_active_power"),
+    ]
+    calls = [
+        (c.args[0], c.kwargs["measure_points"]) for c in mock_plants_service.async_get_realtime_data.await_args_list
+    ]
+    assert sorted(calls, key=str) == [(["12345"], ["total_active_power"]), (["67890"], None)]
+    assert entity_registry.async_get(stale.entity_id) is None
+    assert entity_registry.async_get(stale_source.entity_id) is None
+    assert entity_registry.async_get(kept.entity_id) is not None
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_sensor_setup_local_plant(
+    hass: HomeAssistant, mock_sensor_auth, mock_plants_service, modbus_simulator: ModbusSimulator
+):
+    """Test a plant with a local host is read from its inverter, and the rest from iSolarCloud."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data=MOCK_CONFIG_DATA.copy(),
+        options={"local": {"12345": {"host": "127.0.0.1", "port": modbus_simulator.port}}},
+    )
+    entry.add_to_hass(hass)
+
+    added_entities = await _async_setup_entry(hass, entry)
+
+    sensors = [e for e in added_entities if isinstance(e, SungrowSensor)]
+    local_entities = {e.point_code: e for e in sensors if e.plant_id == "12345"}
+    assert set(local_entities) == set(SAMPLE_VALUES)
+    assert local_entities["inverter_ac_power"].native_value == 4890
+    assert local_entities["inverter_ac_power"].coordinator.update_interval == LOCAL_SCAN_INTERVAL
+    assert [(e.plant_id, e.point_code) for e in sensors if e.plant_id != "12345"] == [("67890", "total_active_power")]
+    mock_plants_service.async_get_realtime_data.assert_awaited_once_with(["67890"], measure_points=None)
+
+    # The plant also gets a sensor showing which source served it
+    [data_source] = [e for e in added_entities if isinstance(e, SungrowDataSourceSensor)]
+    assert data_source.unique_id == "12345_data_source"
+    assert data_source.native_value == "local"
+    assert set(data_source.extra_state_attributes) == {"local_latency"}
+
+    # Closes the connection to the inverter
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_sensor_setup_devices(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_sensor_auth, mock_plants_service, mock_devices_service
+):
+    """Test each inverter and meter gets its own device under the plant, fetched in one request per type."""
+    mock_plants_service.async_get_plant_devices = AsyncMock(
+        side_effect=lambda plant_id, device_types: MOCK_DEVICE_LIST if plant_id == "12345" else []
+    )
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+
+    added_entities = await _async_setup_entry(hass, entry)
+
+    devices = {(e.ps_key, e.point_code): e for e in added_entities if isinstance(e, SungrowDeviceSensor)}
+    assert set(devices) == {
+        ("12345_1_1_1", "total_active_power"),
+        ("12345_1_1_1", "daily_yield"),
+        ("12345_7_1_1", "meter_active_power"),
+    }
+    inverter_power = devices["12345_1_1_1", "total_active_power"]
+    assert inverter_power.unique_id == "device_12345_1_1_1_total_active_power"
+    assert inverter_power.native_value == 4890
+    assert inverter_power.device_info["identifiers"] == {(DOMAIN, "12345_1_1_1")}
+    assert inverter_power.device_info["serial_number"] == "A2190000001"
+    assert inverter_power.device_info["via_device"] == (DOMAIN, "12345")
+    assert devices["12345_7_1_1", "meter_active_power"].native_value == -1250
+    assert sorted(call.args[0] for call in mock_devices_service.async_get_realtime_data.await_args_list) == [1, 7]
+
+    # The devices are catalogued for the next start
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_stop(force=True)
+    plant = hass_storage[f"{DOMAIN}.{entry.entry_id}"]["data"]["plants"]["12345"]
+    assert plant["devices"]["12345_1_1_1"]["type"] == 1
+    assert set(plant["devices"]["12345_1_1_1"]["points"]) == {"total_active_power", "daily_yield"}
+
 
 async def test_sensor_setup_no_tokens(hass: HomeAssistant, mock_sensor_auth, mock_plants_service):
     """Test async_setup_entry returns early when no tokens in config."""
@@ -281,7 +407,7 @@ async def test_sensor_setup_no_tokens(hass: HomeAssistant, mock_sensor_auth, moc
 
 
 async def test_sensor_setup_plant_fetch_fails(hass: HomeAssistant, mock_sensor_auth, mock_plants_service):
-    """Test async_setup_entry handles plant fetch failure gracefully."""
+    """Test a failed discovery adds nothing and is retried later, until the entry is unloaded."""
     mock_plants_service.async_get_plants = AsyncMock(side_effect=Exception("Network error"))
 
     entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
@@ -291,12 +417,44 @@ async def test_sensor_setup_plant_fetch_fails(hass: HomeAssistant, mock_sensor_a
 
     added_entities = []
     await async_setup_entry(hass, entry, lambda entities: added_entities.extend(entities))
+    await hass.async_block_till_done(wait_background_tasks=True)
 
     assert len(added_entities) == 0
 
+    async_fire_time_changed(hass, dt_util.utcnow() + DISCOVERY_RETRY)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_plants_service.async_get_plants.await_count == 2
 
-async def test_sensor_setup_skips_plant_with_no_data(hass: HomeAssistant, mock_sensor_auth, mock_plants_service):
-    """Test that plants returning empty data are skipped without creating entities."""
+    # Unloading cancels the next retry
+    await entry._async_process_on_unload(hass)
+    async_fire_time_changed(hass, dt_util.utcnow() + DISCOVERY_RETRY_MAX)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert mock_plants_service.async_get_plants.await_count == 2
+
+
+async def test_sensor_setup_discovery_times_out(
+    hass: HomeAssistant, mock_sensor_auth, mock_plants_service, caplog: pytest.LogCaptureFixture
+):
+    """Test a discovery taking longer than DISCOVERY_TIMEOUT is abandoned, and retried later."""
+    mock_plants_service.async_get_plants = AsyncMock(side_effect=asyncio.Event().wait)
+
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+
+    with patch("custom_components.sungrow.sensor.DISCOVERY_TIMEOUT", 0.01):
+        await async_setup_entry(hass, entry, lambda entities: None)
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert "Discovering plants timed out" in caplog.text
+    assert "Retrying plant discovery in 0:00:30" in caplog.text
+
+    await entry._async_process_on_unload(hass)
+
+
+async def test_sensor_setup_skips_plant_with_no_data(
+    hass: HomeAssistant, mock_sensor_auth, mock_plants_service, caplog: pytest.LogCaptureFixture
+):
+    """Test that plants returning empty data are skipped without creating entities, and discovery retried."""
     # Return empty data for all plants — covers the `if not coordinator.data: continue` branch
     mock_plants_service.async_get_realtime_data = AsyncMock(
         return_value={
@@ -315,6 +473,165 @@ async def test_sensor_setup_skips_plant_with_no_data(hass: HomeAssistant, mock_s
 
     added_entities = []
     await async_setup_entry(hass, entry, lambda entities: added_entities.extend(entities))
+    await hass.async_block_till_done(wait_background_tasks=True)
 
     # Both plants had empty data, so no sensors should be created
     assert len(added_entities) == 0
+    assert "Retrying plant discovery in 0:00:30" in caplog.text
+
+    await entry._async_process_on_unload(hass)
+
+
+async def test_sensor_setup_discovery_recovers_from_failed_refresh(
+    hass: HomeAssistant, mock_sensor_auth, mock_plants_service
+):
+    """Test sensors are created once realtime data comes back after failing during discovery."""
+    failures = 3
+
+    async def _realtime(plant_ids, measure_points=None):
+        nonlocal failures
+        if failures:
+            failures -= 1
+            raise Exception("Gateway error")
+        return {plant_id: MOCK_REALTIME_DATA[plant_id] for plant_id in plant_ids}
+
+    mock_plants_service.async_get_realtime_data = AsyncMock(side_effect=_realtime)
+
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+    entry.mock_state(hass, ConfigEntryState.SETUP_IN_PROGRESS)
+
+    added_entities = []
+    await async_setup_entry(hass, entry, _capture_sensors(added_entities))
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    # The batched call and both single-plant retries failed
+    assert mock_plants_service.async_get_realtime_data.await_count == 3
+    assert not added_entities
+
+    async_fire_time_changed(hass, dt_util.utcnow() + DISCOVERY_RETRY)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert {e.plant_id for e in added_entities} == {"12345", "67890"}
+
+    await entry._async_process_on_unload(hass)
+
+
+async def test_sensor_setup_failing_plant_does_not_block_others(
+    hass: HomeAssistant, mock_sensor_auth, mock_plants_service
+):
+    """Test a plant that keeps failing is skipped while the other plant's entities are created."""
+
+    async def _realtime(plant_ids, measure_points=None):
+        if "67890" in plant_ids:
+            raise Exception("Gateway error")
+        return {plant_id: MOCK_REALTIME_DATA[plant_id] for plant_id in plant_ids}
+
+    mock_plants_service.async_get_realtime_data = AsyncMock(side_effect=_realtime)
+
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+
+    added_entities = _point_sensors(await _async_setup_entry(hass, entry))
+
+    # The batched call failed, then each plant was retried on its own
+    assert mock_plants_service.async_get_realtime_data.await_count == 3
+    assert {e.plant_id for e in added_entities} == {"12345"}
+    assert len(added_entities) == 3
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_sensor_setup_saves_catalogue(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_sensor_auth, mock_plants_service
+):
+    """Test a cold start catalogues every discovered plant and point."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+
+    await _async_setup_entry(hass, entry)
+    await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_stop(force=True)
+
+    plants = hass_storage[f"{DOMAIN}.{entry.entry_id}"]["data"]["plants"]
+    assert plants["12345"]["name"] == "Test Solar Plant"
+    assert set(plants["12345"]["points"]) == {"total_active_power", "daily_energy", "device_status"}
+    assert plants["12345"]["points"]["total_active_power"]["device_class"] == "power"
+
+
+async def test_sensor_setup_from_catalogue(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_sensor_auth, mock_plants_service
+):
+    """Test a warm start creates entities from the catalogue, then reconciles in the background."""
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}",
+        "data": {
+            "plants": {
+                "12345": {
+                    "name": "Test Solar Plant",
+                    "points": {
+                        "total_active_power": describe_point(
+                            parse_point(MOCK_REALTIME_DATA["12345"]["total_active_power"])
+                        ),
+                    },
+                },
+                "99999": {"name": "Sold Plant", "points": {}},
+            }
+        },
+    }
+
+    # Hold the cloud back until the catalogued entities exist
+    release = asyncio.Event()
+
+    async def _slow_plants():
+        await release.wait()
+        return MOCK_PLANT_LIST
+
+    mock_plants_service.async_get_plants = AsyncMock(side_effect=_slow_plants)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+
+    assert [e.point_code for e in _point_sensors(_platform_entities(hass))] == ["total_active_power"]
+    mock_plants_service.async_get_realtime_data.assert_not_awaited()
+
+    release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    added_entities = _point_sensors(_platform_entities(hass))
+
+    # Only the points and plants not already catalogued get new entities
+    assert len(added_entities) == 4
+    assert sorted((e.plant_id, e.point_code) for e in added_entities[1:]) == [
+        ("12345", "daily_energy"),
+        ("12345", "device_status"),
+        ("67890", "total_active_power"),
+    ]
+    assert added_entities[0].coordinator.data == parse_points(MOCK_REALTIME_DATA["12345"])
+
+    await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_sensor_setup_from_catalogue_cloud_down(
+    hass: HomeAssistant, hass_storage: dict[str, Any], mock_sensor_auth, mock_plants_service
+):
+    """Test catalogued entities are still created when the gateway is unreachable."""
+    mock_plants_service.async_get_plants = AsyncMock(side_effect=Exception("Network error"))
+    mock_plants_service.async_get_realtime_data = AsyncMock(side_effect=Exception("Network error"))
+
+    entry = MockConfigEntry(domain=DOMAIN, data=MOCK_CONFIG_DATA.copy())
+    entry.add_to_hass(hass)
+    hass_storage[f"{DOMAIN}.{entry.entry_id}"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}",
+        "data": {"plants": {"12345": {"name": "Test Solar Plant", "points": {"daily_energy": {"unit": "kWh"}}}}},
+    }
+
+    added_entities = _point_sensors(await _async_setup_entry(hass, entry))
+
+    assert len(added_entities) == 1
+    assert added_entities[0].available is False
+
+    await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,69 @@
+"""Tests for the gateway sessions."""
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant
+
+from custom_components.sungrow.const import (
+    GATEWAY_CONNECT_TIMEOUT,
+    GATEWAY_CONNECTIONS,
+    GATEWAY_KEEPALIVE,
+    GATEWAY_READ_TIMEOUT,
+    GATEWAYS,
+)
+from custom_components.sungrow.session import DATA_SESSIONS, async_get_session, async_release_session
+
+EUROPE = GATEWAYS["Europe"]
+AUSTRALIA = GATEWAYS["Australia"]
+
+
+async def test_session_shared_per_gateway(hass: HomeAssistant):
+    """Test entries on the same gateway share a session, and other gateways get their own."""
+    first = async_get_session(hass, EUROPE, "entry_1")
+    second = async_get_session(hass, EUROPE, "entry_2")
+    other = async_get_session(hass, AUSTRALIA, "entry_3")
+
+    assert first is second
+    assert other is not first
+
+    for user in ("entry_1", "entry_2", "entry_3"):
+        await async_release_session(hass, user)
+
+
+async def test_session_tuned_for_gateway(hass: HomeAssistant):
+    """Test the session keeps connections alive, caches DNS, asks for gzip and has its own timeouts."""
+    session = async_get_session(hass, EUROPE, "entry_1")
+
+    assert session.connector.limit_per_host == GATEWAY_CONNECTIONS
+    assert session.connector._keepalive_timeout == GATEWAY_KEEPALIVE
+    assert session.connector.use_dns_cache
+    assert "gzip" in session.headers["Accept-Encoding"]
+    assert session.timeout.connect == GATEWAY_CONNECT_TIMEOUT
+    assert session.timeout.sock_read == GATEWAY_READ_TIMEOUT
+
+    await async_release_session(hass, "entry_1")
+
+
+async def test_session_closed_when_last_user_released(hass: HomeAssistant):
+    """Test a gateway's session stays open until nothing uses it."""
+    session = async_get_session(hass, EUROPE, "entry_1")
+    async_get_session(hass, EUROPE, "flow_1")
+
+    await async_release_session(hass, "flow_1")
+    assert not session.closed
+
+    await async_release_session(hass, "entry_1")
+    assert session.closed
+    assert hass.data[DATA_SESSIONS] == {}
+    assert async_get_session(hass, EUROPE, "entry_1") is not session
+
+    await async_release_session(hass, "entry_1")
+
+
+async def test_sessions_closed_on_stop(hass: HomeAssistant):
+    """Test every session is closed when Home Assistant stops."""
+    session = async_get_session(hass, EUROPE, "entry_1")
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+
+    assert session.closed
@@ -0,0 +1,107 @@
+"""Tests for request coalescing."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+
+from custom_components.sungrow.const import REQUEST_REUSE_WINDOW
+from custom_components.sungrow.singleflight import SingleFlight, SingleFlightPlants
+
+from .conftest import MOCK_PLANT_LIST, MOCK_REALTIME_DATA
+
+
+def _plants() -> MagicMock:
+    """Return a Plants mock whose realtime calls wait to be released."""
+    plants = MagicMock()
+    plants.release = asyncio.Event()
+
+    async def _realtime(plant_ids, measure_points=None):
+        await plants.release.wait()
+        return MOCK_REALTIME_DATA
+
+    plants.async_get_realtime_data = AsyncMock(side_effect=_realtime)
+    plants.async_get_plants = AsyncMock(return_value=MOCK_PLANT_LIST)
+    return plants
+
+
+async def test_concurrent_identical_calls_share_request(hass: HomeAssistant):
+    """Test identical calls made while one is in flight wait for it rather than making their own."""
+    plants = _plants()
+    service = SingleFlightPlants(plants, SingleFlight(hass))
+
+    calls = [
+        hass.async_create_task(service.async_get_realtime_data(["12345", "67890"])),
+        hass.async_create_task(service.async_get_realtime_data(["67890", "12345"])),
+        hass.async_create_task(service.async_get_realtime_data(["12345"])),
+    ]
+    await asyncio.sleep(0)
+    plants.release.set()
+    results = await asyncio.gather(*calls)
+
+    assert results == [MOCK_REALTIME_DATA] * 3
+    # The single plant isn't the same request as the pair
+    assert plants.async_get_realtime_data.await_count == 2
+
+
+async def test_result_reused_within_window(hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+    """Test a result is reused by identical calls for REQUEST_REUSE_WINDOW seconds, then fetched again."""
+    plants = _plants()
+    plants.release.set()
+    service = SingleFlightPlants(plants, SingleFlight(hass))
+
+    await service.async_get_plants()
+    await service.async_get_plants()
+    assert plants.async_get_plants.await_count == 1
+
+    freezer.tick(timedelta(seconds=REQUEST_REUSE_WINDOW))
+    assert await service.async_get_plants() == MOCK_PLANT_LIST
+    assert plants.async_get_plants.await_count == 2
+
+
+async def test_failure_not_reused(hass: HomeAssistant):
+    """Test a failed call is shared by its waiters, but the next call tries again."""
+    plants = _plants()
+    plants.async_get_plants = AsyncMock(side_effect=[Exception("Gateway error"), MOCK_PLANT_LIST])
+    service = SingleFlightPlants(plants, SingleFlight(hass))
+
+    with pytest.raises(Exception, match="Gateway error"):
+        await service.async_get_plants()
+    assert await service.async_get_plants() == MOCK_PLANT_LIST
+
+
+async def test_cancelled_caller_leaves_request_for_others(hass: HomeAssistant):
+    """Test a caller giving up doesn't cancel the request for the others, but the last one to give up does."""
+    plants = _plants()
+    flights = SingleFlight(hass)
+    service = SingleFlightPlants(plants, flights)
+
+    first = hass.async_create_task(service.async_get_realtime_data(["12345"]))
+    second = hass.async_create_task(service.async_get_realtime_data(["12345"]))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    plants.release.set()
+
+    assert await second == MOCK_REALTIME_DATA
+    assert first.cancelled()
+
+    plants.release.clear()
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.01):
+            await service.async_get_realtime_data(["67890"])
+    await asyncio.sleep(0)
+    # Nobody is left waiting, so the request was cancelled and is tried again next time
+    assert not flights._flights.keys() - {("realtime", frozenset({"12345"}), None)}
+
+
+def test_other_attributes_passed_through():
+    """Test everything other than the shared calls comes straight from the wrapped Plants."""
+    plants = MagicMock(measure_points={"83022": "daily_yield"})
+    service = SingleFlightPlants(plants, MagicMock())
+
+    assert service.measure_points == {"83022": "daily_yield"}
+    assert service.async_get_plant_devices is plants.async_get_plant_devices
@@ -0,0 +1,97 @@
+"""Tests for the OAuth callback view."""
+
+from unittest.mock import AsyncMock, patch
+
+from aiohttp.test_utils import make_mocked_request
+from homeassistant.core import HomeAssistant
+
+from custom_components.sungrow.view import SungrowAuthCallbackView, async_register_callback_view
+
+
+def test_register_callback_view_once(hass: HomeAssistant):
+    """Test the view is registered on first use only."""
+    async_register_callback_view(hass)
+    async_register_callback_view(hass)
+
+    hass.http.register_view.assert_called_once()
+    assert isinstance(hass.http.register_view.call_args[0][0], SungrowAuthCallbackView)
+
+
+# ---------------------------------------------------------------------------
+# SungrowAuthCallbackView
+# ---------------------------------------------------------------------------
+
+
+class TestSungrowAuthCallbackView:
+    """Tests for the OAuth callback HTTP view."""
+
+    def setup_method(self):
+        self.view = SungrowAuthCallbackView()
+
+    def test_view_properties(self):
+        """Test view URL, name, and auth requirement."""
+        assert self.view.url == "/api/sungrow_hass/callback"
+        assert self.view.name == "api:sungrow_hass:callback"
+        assert self.view.requires_auth is False
+
+    async def test_callback_missing_code(self, hass: HomeAssistant):
+        """Test callback returns 400 when code is missing."""
+        mock_request = make_mocked_request("GET", "/api/sungrow_hass/callback?flow_id=abc")
+        mock_request.app["hass"] = hass
+
+        response = await self.view.get(mock_request)
+
+        assert response.status == 400
+        assert "Missing code or flow_id" in response.text
+
+    async def test_callback_missing_flow_id(self, hass: HomeAssistant):
+        """Test callback returns 400 when flow_id is missing."""
+        mock_request = make_mocked_request("GET", "/api/sungrow_hass/callback?code=abc")
+        mock_request.app["hass"] = hass
+
+        response = await self.view.get(mock_request)
+
+        assert response.status == 400
+        assert "Missing code or flow_id" in response.text
+
+    async def test_callback_missing_both_params(self, hass: HomeAssistant):
+        """Test callback returns 400 when both params are missing."""
+        mock_request = make_mocked_request("GET", "/api/sungrow_hass/callback")
+        mock_request.app["hass"] = hass
+
+        response = await self.view.get(mock_request)
+
+        assert response.status == 400
+
+    async def test_callback_success(self, hass: HomeAssistant):
+        """Test a successful callback configures the flow."""
+        mock_request = make_mocked_request("GET", "/api/sungrow_hass/callback?code=auth_code_123&flow_id=flow_abc")
+        mock_request.app["hass"] = hass
+
+        with patch.object(
+            hass.config_entries.flow,
+            "async_configure",
+            new_callable=AsyncMock,
+            return_value={"type": "create_entry"},
+        ) as mock_configure:
+            response = await self.view.get(mock_request)
+
+        assert response.status == 200
+        assert "Authorization successful" in response.text
+        mock_configure.assert_called_once_with(flow_id="flow_abc", user_input={"code": "auth_code_123"})
+
+    async def test_callback_flow_error(self, hass: HomeAssistant):
+        """Test callback returns 500 when flow configuration fails."""
+        mock_request = make_mocked_request("GET", "/api/sungrow_hass/callback?code=auth_code&flow_id=bad_flow")
+        mock_request.app["hass"] = hass
+
+        with patch.object(
+            hass.config_entries.flow,
+            "async_configure",
+            new_callable=AsyncMock,
+            side_effect=Exception("Flow not found"),
+        ):
+            response = await self.view.get(mock_request)
+
+        assert response.status == 500
+        assert "Error occurred" in response.text